@@ -0,0 +1,436 @@
+"""
+DB Benchmarking Application
+===========================
+
+Async_runner.py
+
+This file houses the asyncio runner, which is used instead of the thread pool
+when `--concurrency=<n>` is given.  A single event loop keeps `n` operations in
+flight at once.  DB modules that implement the async functions of
+`BenchmarkDatabase` (`async_setup()`, `async_write()` and `async_read()`) are
+awaited directly and share a single client, while modules that only implement
+the blocking functions are run in a thread pool executor, whose threads take
+turns with a few blocking clients.
+
+NOTE: This file requires Python 3.5+, and is only imported when the runner is
+actually used.
+
+"""
+from __future__ import absolute_import
+from __future__ import print_function
+
+import asyncio
+
+from sys import exit
+from operator import methodcaller
+from concurrent.futures import ThreadPoolExecutor
+from six.moves import queue
+
+from timer import clock_ns, to_seconds
+
+
+ASYNC_FUNCTIONS = [
+    'async_setup',
+    'async_write',
+    'async_read',
+]
+
+
+def supports_async(client, updates=False):
+    """ Checks whether a DB module implements all of the async functions of
+    `BenchmarkDatabase` as coroutine functions.  This is checked before the
+    run starts, so that a module missing a function is run in the thread
+    pool instead of failing partway through a phase.
+
+    :param client: the `Benchmark` instance of the DB module
+    :param bool updates: True if the workload updates entries, which also
+                needs `async_update()`
+
+    :return bool: True if the module can be awaited directly
+    """
+
+    names = ASYNC_FUNCTIONS + (['async_update'] if updates else [])
+
+    return all(
+        asyncio.iscoroutinefunction(getattr(client, name, None))
+        for name in names
+    )
+
+
+class AsyncRunner():
+    """ Runs the phases of a benchmark on an event loop.  Each `Worker` of the
+    pool is one in-flight slot, which issues its operations one after another,
+    so the number of workers is the number of operations in flight.
+    """
+
+    def __init__(self, benchmark):
+        """ __init__() creates the event loop, which is kept for the whole run
+        since async clients are usually bound to the loop they were set up on.
+
+        :param Benchmark benchmark: the benchmark being run
+        """
+
+        self.benchmark = benchmark
+
+        self.loop = asyncio.new_event_loop()
+        self.executor = None
+
+        # The blocking clients that are free, when the module is not async
+        self.clients = None
+
+        self.native = False
+
+    def setup(self, client, collection):
+        """ Awaits the `async_setup()` function of a DB module, after which all
+        operations will be awaited directly on the client.
+
+        :param client: the `Benchmark` instance of the DB module
+        :param collection: the collection that all benchmarks will be run with
+        """
+
+        self.loop.run_until_complete(client.async_setup(collection))
+
+        self.native = True
+
+    def share(self, clients):
+        """ Shares some blocking clients between every in-flight slot.  The
+        executor has one thread for each client, and each operation takes
+        whichever client is free, so no client is ever used by two threads
+        at once.
+
+        :param list clients: the set up `Benchmark` instances of the DB module
+        """
+
+        self.clients = queue.Queue()
+
+        for client in clients:
+            self.clients.put(client)
+
+        self.executor = ThreadPoolExecutor(max_workers=len(clients))
+
+    def run(self, phase, batches):
+        """ Runs one phase of the benchmark with every slot in flight at once.
+
+        :param str phase: the phase to run ('writes', 'reads', 'total' or
+                    'mixed')
+        :param list batches: a list of `(worker, batches)` tuples, one for each
+                    in-flight slot
+
+        :return float elapsed: the wall-clock time taken by the phase
+        """
+
+        targets = {
+            'writes': self.write_all,
+            'reads': self.read_all,
+            'total': self.alternate,
+            'mixed': self.mixed_all,
+        }
+
+        slots = [
+            targets[phase](worker, worker_batches)
+            for worker, worker_batches in batches
+        ]
+
+        self.benchmark.start_schedule()
+
+        start_time = self.benchmark.phase_start_time
+
+        try:
+
+            self.loop.run_until_complete(self.gather(slots))
+
+        except Exception as error:
+
+            exit('Error! Async runner failed: {error}'.format(error=error))
+
+        elapsed = to_seconds(clock_ns() - start_time)
+
+        return elapsed
+
+    @staticmethod
+    async def gather(slots):
+        """ Awaits every slot at once, on the runner's own event loop
+
+        :param list slots: the coroutines of each in-flight slot
+        """
+
+        await asyncio.gather(*slots)
+
+    async def run_blocking(self, function, *args):
+        """ Runs a function on one of the shared blocking clients, in the
+        executor
+
+        :param function: a function whose first argument is the client
+        :param args: the other arguments of the function
+
+        :return result: what the function returned
+        """
+
+        return await self.loop.run_in_executor(
+            self.executor, self.borrow, function, args
+        )
+
+    def borrow(self, function, args):
+        """ Takes a free client for as long as a function runs on it
+
+        :param function: a function whose first argument is the client
+        :param tup args: the other arguments of the function
+
+        :return result: what the function returned
+        """
+
+        client = self.clients.get()
+
+        try:
+
+            return function(client, *args)
+
+        finally:
+
+            self.clients.put(client)
+
+    async def alternate(self, worker, batches):
+        """ Alternates writes and reads for every batch handled by a slot
+
+        :param Worker worker: the slot issuing the operations
+        :param batches: the batches of indexes handled by the slot
+        """
+
+        for batch in batches:
+
+            entries = self.benchmark.batch_entries(batch)
+
+            intended_start = await self.pace(worker, 2 * batch[0])
+
+            await self.write(entries, worker, intended_start)
+            await self.sleep()
+
+            intended_start = await self.pace(worker, 2 * batch[0] + 1)
+
+            await self.read(batch, worker, intended_start)
+
+    async def write_all(self, worker, batches):
+        """ Writes a new entry for every index handled by a slot
+
+        :param Worker worker: the slot issuing the writes
+        :param batches: the batches of indexes handled by the slot
+        """
+
+        for batch in batches:
+
+            entries = self.benchmark.batch_entries(batch)
+
+            intended_start = await self.pace(worker, batch[0])
+
+            await self.write(entries, worker, intended_start)
+            await self.sleep()
+
+    async def read_all(self, worker, batches):
+        """ Reads back every index handled by a slot
+
+        :param Worker worker: the slot issuing the reads
+        :param batches: the batches of indexes handled by the slot
+        """
+
+        for batch in batches:
+
+            intended_start = await self.pace(worker, batch[0])
+
+            indexes = self.benchmark.batch_indexes(batch)
+
+            await self.read(indexes, worker, intended_start)
+            await self.sleep()
+
+    async def mixed_all(self, worker, batches):
+        """ Runs every operation of the workload handled by a slot
+
+        :param Worker worker: the slot issuing the operations
+        :param batches: the batches of operations handled by the slot
+        """
+
+        for batch in batches:
+
+            for sequence in batch:
+
+                intended_start = await self.pace(worker, sequence)
+
+                await self.mixed_operation(sequence, worker, intended_start)
+                await self.sleep()
+
+    async def mixed_operation(self, sequence, worker, intended_start=None):
+        """ Issues and times a single operation of the workload.  Natively,
+        a scan is sent as concurrent reads, and updates are awaited with
+        `async_update()`, which `supports_async()` checked for up front.
+
+        :param int sequence: the position of the operation in the workload
+        :param Worker worker: the slot issuing the operation
+        :param int intended_start: the time (in ns) the operation was
+                    scheduled to start at in open-loop mode
+        """
+
+        client = worker.client
+
+        operation_start_time = clock_ns()
+
+        if self.native:
+
+            operation = await self.native_call(client, sequence)
+
+        else:
+
+            operation, _ = await self.run_blocking(
+                self.benchmark.workload_call, sequence
+            )
+
+        operation_stop_time = clock_ns()
+
+        self.benchmark.record_operation(
+            worker, operation, operation_start_time, operation_stop_time,
+            intended_start,
+            keys=[self.benchmark.workload.operation(sequence)[1]],
+        )
+
+    async def native_call(self, client, sequence):
+        """ Awaits one operation of the workload on a native async client
+
+        :param client: the `Benchmark` instance of the DB module
+        :param int sequence: the position of the operation in the workload
+
+        :return str operation: the name of the operation
+        """
+
+        benchmark = self.benchmark
+
+        operation, index, scan_length = benchmark.workload.operation(sequence)
+
+        if operation == 'read':
+
+            await client.async_read(index)
+
+        elif operation == 'update':
+
+            await client.async_update(index, benchmark.payloads.entry(sequence))
+
+        elif operation == 'insert':
+
+            entry = benchmark.payloads.entry(index)
+            entry.update(Index=index)
+
+            await client.async_write(entry)
+
+        elif operation == 'scan':
+
+            await asyncio.gather(*[
+                client.async_read(scan_index)
+                for scan_index in range(index, index + scan_length)
+            ])
+
+        else:
+
+            await client.async_read(index)
+            await client.async_update(index, benchmark.payloads.entry(sequence))
+
+        return operation
+
+    async def write(self, entries, worker, intended_start=None):
+        """ Issues and times a single write, or a batch of writes with
+        `--batch-size`.  A native batch is sent as concurrent writes.
+
+        :param list entries: the entries to be written to the DB
+        :param Worker worker: the slot issuing the write
+        :param int intended_start: the time (in ns) the write was scheduled to
+                    start at in open-loop mode
+        """
+
+        client = worker.client
+        batched = self.benchmark.batch_size > 1
+
+        write_start_time = clock_ns()
+
+        if self.native:
+
+            await asyncio.gather(*[
+                client.async_write(entry) for entry in entries
+            ])
+
+        elif batched:
+
+            await self.run_blocking(methodcaller('write_many', entries))
+
+        else:
+
+            await self.run_blocking(methodcaller('write', entries[0]))
+
+        write_stop_time = clock_ns()
+
+        self.benchmark.record_operation(
+            worker, 'write', write_start_time, write_stop_time, intended_start,
+            batch_size=len(entries) if batched else None,
+            keys=[entry['Index'] for entry in entries],
+        )
+
+    async def read(self, indexes, worker, intended_start=None):
+        """ Issues and times a single read, or a batch of reads with
+        `--batch-size`.  A native batch is sent as concurrent reads.
+
+        :param list indexes: the indexes of the entries to be read from the DB
+        :param Worker worker: the slot issuing the read
+        :param int intended_start: the time (in ns) the read was scheduled to
+                    start at in open-loop mode
+        """
+
+        client = worker.client
+        batched = self.benchmark.batch_size > 1
+
+        read_start_time = clock_ns()
+
+        if self.native:
+
+            await asyncio.gather(*[
+                client.async_read(index) for index in indexes
+            ])
+
+        elif batched:
+
+            await self.run_blocking(methodcaller('read_many', indexes))
+
+        else:
+
+            await self.run_blocking(methodcaller('read', indexes[0]))
+
+        read_stop_time = clock_ns()
+
+        self.benchmark.record_operation(
+            worker, 'read', read_start_time, read_stop_time, intended_start,
+            batch_size=len(indexes) if batched else None, keys=list(indexes),
+        )
+
+    async def pace(self, worker, sequence):
+        """ In open-loop mode (`--rate`), waits for the intended start time of
+        the next operation of a slot without blocking the other slots.
+
+        :param Worker worker: the slot issuing the operation
+        :param int sequence: the position of the operation in the phase
+
+        :return int intended_start: the intended start time in ns, or None if
+                    not in open-loop mode
+        """
+
+        if not self.benchmark.rate:
+
+            return None
+
+        intended_start = self.benchmark.next_start_time(worker, sequence)
+
+        delay = intended_start - clock_ns()
+
+        if delay > 0:
+            await asyncio.sleep(to_seconds(delay))
+
+        return intended_start
+
+    async def sleep(self):
+        """ Honours sleep mode (`-s`) without blocking the other slots """
+
+        if self.benchmark.options.get('-s'):
+            await asyncio.sleep(1/20)
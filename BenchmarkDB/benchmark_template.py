@@ -23,6 +23,15 @@ Now any settings defined there can be accessed from the `Benchmark` class.
 
 class BenchmarkDatabase():
 
+    # Set by `main.py` when `--commit-every` is given, in which case the
+    # writes should be left uncommitted until `commit_pending()` is called
+    group_commit = False
+
+    # Set by `main.py` before any instance is created, to whether `--preload`
+    # was given, in which case the documents are loaded with `preload()`
+    # instead of being written one at a time
+    preloading = False
+
     def __init__(self, collection, setup=False, trials=0):
         """ `__init__()` is the entry point of the module, and is where the
         module is set up and prepared for benchmarking.  This class is
@@ -42,6 +51,15 @@ class BenchmarkDatabase():
         if setup:
             self.setup(collection)
 
+    @classmethod
+    def check_settings(cls):
+        """ OPTIONAL - This function should raise a `ValueError` if the
+        settings of `local.py` (as overridden with `--set`) are invalid, or do
+        not suit the options of the run (e.g. `preloading`).  `main.py` calls
+        it once the module is imported, before any instance is created, and
+        exits with the error.
+        """
+
     def setup(self, collection):
         """ This function handles all of the setup operations for the database
         reads and writes.  It is typically called from `__init__()`, although
@@ -76,4 +94,186 @@ class BenchmarkDatabase():
             'Info': 'asdflkjh',
         }
 
-        return example_document
\ No newline at end of file
+        return example_document
+
+    def write_many(self, entries):
+        """ This function should write a whole batch of documents to the
+        database, and is used instead of `write()` when `--batch-size` is
+        given.  By default it simply writes each document in turn, so it only
+        needs to be overridden if the database has a native bulk write.
+
+        :param entries: a list of dictionary-type documents that will be
+                    written to the db
+        """
+
+        for data in entries:
+
+            self.write(data)
+
+    def read_many(self, indexes):
+        """ This function should read a whole batch of documents from the
+        database, and is used instead of `read()` when `--batch-size` is given.
+        By default it simply reads each document in turn, so it only needs to
+        be overridden if the database has a native bulk read.
+
+        :param indexes: a list of integers describing the indexes of the
+                    documents to find
+
+        :return documents: a list of the documents that were just pulled from
+                    the database
+        """
+
+        documents = [self.read(index) for index in indexes]
+
+        return documents
+
+    def update(self, index, data):
+        """ This function should replace the fields of an existing document
+        with the fields of `data`, and is used by the mixed workloads
+        (`--workload` or `--mix`).  By default it simply writes the document
+        again, which is only correct if a write replaces the document that
+        has the same index.
+
+        :param index: an integer describing the index of the document to update
+        :param data: a dictionary-type document with the new fields
+        """
+
+        document = dict(data)
+        document.update(Index=index)
+
+        self.write(document)
+
+    def scan(self, start, count):
+        """ This function should read `count` documents in order of their
+        index, starting from the index `start`, and is used by the mixed
+        workloads.  By default it reads each index in turn with `read_many()`,
+        so it only needs to be overridden if the database has a native range
+        query.
+
+        :param start: an integer describing the index of the first document
+        :param count: the number of documents to read
+
+        :return documents: a list of the documents that were just pulled from
+                    the database
+        """
+
+        documents = self.read_many(list(range(start, start + count)))
+
+        return documents
+
+    def preload(self, count, entry):
+        """ This function should load `count` documents as fast as the
+        database allows, and is used instead of timing a write of each
+        document when `--preload` is given, so that the reads (or a workload)
+        can be measured against a large data set.  By default it writes the
+        documents in batches with `write_many()`, so it only needs to be
+        overridden if the database has a faster bulk load.
+
+        :param count: the number of documents to load, which have the indexes
+                    `0` to `count - 1`
+        :param entry: a function that returns the document of an index
+        """
+
+        batch = []
+
+        for index in range(count):
+
+            batch.append(entry(index))
+
+            if len(batch) == 1000:
+
+                self.write_many(batch)
+
+                batch = []
+
+        if batch:
+
+            self.write_many(batch)
+
+        self.commit_pending()
+
+    def reset(self, collection, trials=0):
+        """ This function should empty the collection or table, so that the
+        next run of a sweep starts from nothing, over the connection that is
+        already open.  By default it simply runs `setup()` again, which
+        reconnects, so it only needs to be overridden to keep the connection.
+
+        :param collection: The collection or table with which all benchmarks
+                    will be run
+        :param trials: The number of trials of the next run
+        """
+
+        self.trials = trials
+
+        self.setup(collection)
+
+    def node_select(self, index):
+        """ OPTIONAL - This function should return the number of the node that
+        the document with the given index is stored on, which is recorded for
+        every operation in the raw data and summarized for each node in the
+        report.  It is only needed for DB's that split the documents between
+        nodes themselves, which can use one of the routers of `router.py`.
+
+        :param index: an integer describing the index of the document
+
+        :return node: the number of the node the document is stored on
+        """
+
+        return -1
+
+    def commit_pending(self):
+        """ OPTIONAL - This function should commit every write that was left
+        uncommitted because `group_commit` is set, and is called by `main.py`
+        after every `--commit-every` writes (and at the end of each phase), so
+        that the commit is timed as its own operation.  It is only needed for
+        DB's with transactions, and by default there is nothing to commit.
+        """
+
+    def end_transaction(self):
+        """ OPTIONAL - This function should end any transaction the client
+        left open (e.g. with its reads), so that it holds no locks between the
+        runs of a sweep.  `main.py` calls it on every kept client before any of
+        them is reset, since a reset may need to lock the whole table.  It is
+        only needed for DB's with transactions.
+        """
+
+    def async_setup(self, collection):
+        """ OPTIONAL - This function is the asynchronous counterpart of
+        `setup()`, and is only used by the asyncio runner (`--concurrency`).
+        To opt in, define it along with `async_write()` and `async_read()` as
+        coroutine functions (`async def`).  The module is then created with
+        `setup=False` and this coroutine is awaited once on the runner's event
+        loop instead.  Modules that only implement the blocking functions are
+        still run by the asyncio runner, but in a thread pool.
+
+        :param collection: The collection or table with which all benchmarks
+                    will be run
+        """
+
+    def async_write(self, data):
+        """ OPTIONAL - The asynchronous counterpart of `write()`.  A single
+        instance of the module is shared by every operation in flight, so this
+        coroutine must be safe to await many times at once.
+
+        :param data: a dictionary-type document that will be written to the db
+        """
+
+    def async_read(self, index):
+        """ OPTIONAL - The asynchronous counterpart of `read()`.  A single
+        instance of the module is shared by every operation in flight, so this
+        coroutine must be safe to await many times at once.
+
+        :param index: an integer describing the index of the document to find
+
+        :return document: the document that was just pulled from the database
+        """
+
+    def async_update(self, index, data):
+        """ OPTIONAL - The asynchronous counterpart of `update()`, which is
+        only needed to run workloads with updates on the asyncio runner.  A
+        single instance of the module is shared by every operation in flight,
+        so this coroutine must be safe to await many times at once.
+
+        :param index: an integer describing the index of the document to update
+        :param data: a dictionary-type document with the new fields
+        """
@@ -0,0 +1,143 @@
+"""
+DB Benchmarking Application
+===========================
+
+Bootstrap.py
+
+This file houses the bootstrap confidence intervals shown in the report.  The
+recorded latencies are resampled from the buckets of their histogram rather
+than from the raw samples, so every resample is a single multinomial draw over
+the buckets.  The cost depends only on the number of buckets in use, not on the
+number of samples, so the intervals stay fast at millions of samples and work
+without the raw samples as well.  The same resamples also give the interval of
+the difference between the percentiles of two runs, which is how `--baseline`
+decides whether a run is significantly slower than an earlier one.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+
+import math
+
+import numpy as np
+
+
+def bootstrap_intervals(histogram, percentile=99, resamples=1000,
+                        confidence=0.95, seed=None):
+    """ Computes percentile bootstrap confidence intervals on the mean and on
+    one percentile of the values recorded in a histogram
+
+    :param LatencyHistogram histogram: the histogram of the latencies
+    :param float percentile: the percentile to find an interval for
+    :param int resamples: the number of bootstrap resamples
+    :param float confidence: the confidence level of the intervals
+    :param int seed: the seed of the random generator
+
+    :return dict intervals: the `(low, high)` interval of the 'mean' and of
+                the percentile, or None for each if there are too few values
+    """
+
+    intervals = {
+        'mean': None,
+        'percentile': None,
+    }
+
+    total_count = histogram.total_count
+
+    if total_count < 2 or resamples < 1:
+
+        return intervals
+
+    random_state = np.random.RandomState(seed)
+
+    values, resampled = _resample(histogram, resamples, random_state)
+
+    means = resampled.dot(values) / total_count
+
+    percentiles = _percentiles(values, resampled, percentile)
+
+    for name, estimates in [('mean', means), ('percentile', percentiles)]:
+
+        intervals[name] = _interval(estimates, confidence)
+
+    return intervals
+
+
+def bootstrap_difference(baseline, current, percentile=99, resamples=1000,
+                         confidence=0.95, seed=None):
+    """ Computes a percentile bootstrap confidence interval on the difference
+    between one percentile of two histograms, e.g. to find whether the p99 of
+    a run is significantly higher than that of an earlier run.  Each
+    histogram is resampled on its own.
+
+    :param LatencyHistogram baseline: the histogram of the earlier latencies
+    :param LatencyHistogram current: the histogram of the later latencies
+    :param float percentile: the percentile to compare
+    :param int resamples: the number of bootstrap resamples
+    :param float confidence: the confidence level of the interval
+    :param int seed: the seed of the random generator
+
+    :return tup interval: the `(low, high)` interval of the current minus the
+                baseline percentile, or None if there are too few values
+    """
+
+    if baseline.total_count < 2 or current.total_count < 2 or resamples < 1:
+
+        return None
+
+    random_state = np.random.RandomState(seed)
+
+    estimates = []
+
+    for histogram in [baseline, current]:
+
+        values, resampled = _resample(histogram, resamples, random_state)
+
+        estimates.append(_percentiles(values, resampled, percentile))
+
+    return _interval(estimates[1] - estimates[0], confidence)
+
+
+def _resample(histogram, resamples, random_state):
+    """ Resamples the values recorded in a histogram from its buckets
+
+    :return tup resamples: the midpoint value of each bucket, and the count
+                of every bucket in each resample (one row per resample)
+    """
+
+    values, counts = histogram.buckets()
+
+    values = np.array(values, dtype=np.float64)
+    counts = np.array(counts, dtype=np.float64)
+
+    resampled = random_state.multinomial(
+        histogram.total_count, counts / counts.sum(), size=resamples,
+    )
+
+    return values, resampled
+
+
+def _percentiles(values, resampled, percentile):
+    """ :return ndarray percentiles: the value at a percentile of each
+                resample
+    """
+
+    total_count = resampled[0].sum()
+
+    target = max(int(math.ceil(percentile / 100 * total_count)), 1)
+
+    positions = (np.cumsum(resampled, axis=1) >= target).argmax(axis=1)
+
+    return values[positions]
+
+
+def _interval(estimates, confidence):
+    """ :return tup interval: the `(low, high)` percentile interval of the
+                bootstrap estimates
+    """
+
+    tail = (1 - confidence) / 2 * 100
+
+    low, high = np.percentile(estimates, [tail, 100 - tail])
+
+    return float(low), float(high)
@@ -6,6 +6,7 @@ from __future__ import absolute_import
 from cassandra.cqlengine import connection
 from cassandra.cqlengine import management
 from cassandra.cqlengine import columns, models
+from cassandra.cqlengine.query import BatchQuery
 
 from benchmark_template import BenchmarkDatabase
 
@@ -62,6 +63,39 @@ class Benchmark(BenchmarkDatabase):
 
         return dict(document)
 
+    def write_many(self, entries):
+        """ Writes a whole batch of entries as a single CQL batch
+
+        :param entries: The list of entries to be written
+        """
+
+        with BatchQuery() as batch:
+
+            for data in entries:
+
+                TestModel.batch(batch).create(**data)
+
+    def read_many(self, indexes):
+        """ Reads a whole batch of entries with a single `IN` query
+
+        :param indexes: The indexes of the entries to be read
+
+        :return documents: The entries that were read
+        """
+
+        documents = TestModel.filter(Index__in=list(indexes))
+
+        return [dict(document) for document in documents]
+
+    def update(self, index, data):
+        """ Replaces the fields of an existing entry
+
+        :param index: The index of the entry to be updated
+        :param data: The new fields of the entry
+        """
+
+        TestModel.objects(Index=index).update(**data)
+
 
 class TestModel(models.Model):
     Index = columns.Integer(primary_key=True)
@@ -0,0 +1,564 @@
+"""
+DB Benchmarking Application
+===========================
+
+Comparison.py
+
+This file houses the comparison of several DB modules, which is run by giving
+`main.py` a comma-separated list of modules instead of a single one:
+
+    main.py mongodb,postgreSQLdb,riak2db [<report_title>] [options]
+
+Every module is benchmarked in turn with exactly the same options and seed,
+so that the same entries are written and the same keys are read from each of
+them.  When the modules run in the parent process, the entries, keys and
+workload generated for the first module are reused by the others, so they are
+only generated once.  Every module keeps its own report, and the comparison
+adds one report with the percentiles of every module side by side, their
+speedups relative to the first module, and overlaid plots of their latency
+distributions and rolling averages.  With `--headless`, the comparison only
+writes a `summary.json` of the speedups and percentiles, so that none of the
+report or plotting libraries are loaded.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import json
+import time
+import random
+
+import numpy as np
+
+from sys import exit
+
+from main import Benchmark, PERCENTILES, WORKLOAD_LABELS, \
+    retrieve_module_list
+from plots import downsample, render_plots
+from timer import NANOSECONDS
+
+
+# The operations compared between the modules, as (label, histogram prefix)
+OPERATIONS = [('writes', 'write'), ('reads', 'read')] + WORKLOAD_LABELS
+
+
+class Comparison():
+    """ Runs the same benchmark against several DB modules, and compares the
+    results of all of them in one report.
+    """
+
+    def __init__(self, options):
+        """ __init__() checks every module before any of them is run, so that
+        a typo in the last module does not waste the runs of the others.
+
+        :param dict options: the runtime options, as parsed by docopt, with a
+                    comma-separated list of modules as the `<database>`
+        """
+
+        self.options = options
+
+        self.databases = [
+            database.strip()
+            for database in options.get('<database>').split(',')
+            if database.strip()
+        ]
+
+        module_list = retrieve_module_list()
+
+        for database in self.databases:
+
+            if database not in module_list:
+
+                exit('Error! {database} is not a DB module!'.format(
+                    database=database,
+                ))
+
+        if len(set(self.databases)) != len(self.databases):
+
+            exit('Error! Each DB module can only be compared once!')
+
+        # Every module is run with the same seed, so that the same entries
+        # and keys are used for each of them
+        if not options.get('--seed'):
+            options['--seed'] = random.randint(0, 2 ** 31 - 1)
+
+        self.no_report = options.get('--no-report')
+        self.headless = options.get('--headless')
+
+        self.time_and_date = time.strftime("%a, %d %b, %Y at %H:%M:%S")
+
+        self.title = options.get('<report_title>')
+
+        if not self.title:
+
+            self.title = 'comparison-{date}'.format(
+                date=time.strftime("%b%d-%Y--%H-%M-%S"),
+            )
+
+        self.reports_dir = None
+        self.images_dir = None
+
+        # The results kept from the run of each module, in order
+        self.results = []
+
+    def run(self):
+        """ Benchmarks every module in turn, and then compares them """
+
+        self.__create_reports_dir()
+
+        inputs = None
+
+        for number, database in enumerate(self.databases, 1):
+
+            print('\nBenchmarking {database} ({number} of {total})\n'.format(
+                database=database,
+                number=number,
+                total=len(self.databases),
+            ))
+
+            options = dict(self.options)
+            options.update({
+                '<database>': database,
+                '<report_title>': database,
+            })
+
+            benchmark = Benchmark(
+                options=options,
+                reports_root=self.reports_dir,
+                inputs=inputs,
+            )
+            benchmark.setup()
+
+            inputs = {
+                'payloads': benchmark.payloads,
+                'read_keys': benchmark.read_keys,
+                'workload': benchmark.workload,
+            }
+
+            self.results.append(self.__keep_results(database, benchmark))
+
+        self.generate_report()
+
+    def generate_report(self):
+        """ Writes the comparison report, with the tables of every module side
+        by side and the plots that overlay them.  With `--headless`, only the
+        summary is written.
+        """
+
+        if self.headless:
+
+            self.generate_summary()
+
+            return
+
+        speedup_table, speedup_table_md = self.__generate_speedup_tables()
+
+        percentile_table, percentile_table_md = \
+            self.__generate_percentile_tables()
+
+        print('\n\n' + speedup_table + '\n\n' + percentile_table + '\n\n')
+
+        if self.no_report:
+
+            return
+
+        plots = self.__generate_all_plots()
+
+        report = [
+            'DATABASE COMPARISON REPORT - {databases}'.format(
+                databases=', '.join(self.databases),
+            ),
+            '=========================================',
+            '',
+            'TIME AND DATE',
+            '=============',
+            '',
+            self.time_and_date,
+            '',
+            'RESULTS',
+            '=======',
+            '',
+            'Every database was benchmarked with the same options and seed '
+            '({seed}), and so with the same entries and keys.  The report of '
+            'each database is in its own directory next to this report.  The '
+            'speedups are relative to {baseline}, and are above 1 when a '
+            'database was faster:'.format(
+                seed=self.options.get('--seed'),
+                baseline=self.databases[0],
+            ),
+            '',
+            speedup_table_md,
+            '',
+            'With these latency percentiles (in seconds):',
+            '',
+            percentile_table_md,
+            '',
+        ]
+
+        for title, plot in plots:
+
+            report += [title, '', plot, '']
+
+        report_name = '{parent_dir}/{title}.md'.format(
+            parent_dir=self.reports_dir,
+            title=self.title,
+        )
+
+        with open(report_name, 'w+') as outfile:
+
+            outfile.write('\n'.join(report))
+
+    def generate_summary(self):
+        """ Writes the speedups and percentiles of every module to
+        `summary.json` in the comparison directory, for scripts to read
+        """
+
+        speedup_header, speedup_values = self.__speedup_values()
+
+        summary = {
+            'databases': self.databases,
+            'time_and_date': self.time_and_date,
+            'seed': self.options.get('--seed'),
+            'speedups': [
+                dict(zip(speedup_header, values)) for values in speedup_values
+            ],
+            'percentiles': dict(
+                (results['database'], dict(
+                    (operation, dict(
+                        ('p{percentile:g}'.format(percentile=percentile), value)
+                        for percentile, value in zip(
+                            PERCENTILES, results['percentiles'].get(operation),
+                        )
+                    ))
+                    for operation in self.__operations()
+                ))
+                for results in self.results
+            ),
+        }
+
+        summary_path = '{parent_dir}/summary.json'.format(
+            parent_dir=self.reports_dir,
+        )
+
+        with open(summary_path, 'w') as outfile:
+
+            json.dump(summary, outfile, indent=2, sort_keys=True)
+
+        print('\nThe comparison summary was written to {path}'.format(
+            path=summary_path,
+        ))
+
+    def __keep_results(self, database, benchmark):
+        """ Picks out the results of one module that are compared, so that
+        the rest of its benchmark can be let go of
+
+        :param str database: the name of the module
+        :param Benchmark benchmark: the benchmark that ran the module
+
+        :return dict results: the results of the module
+        """
+
+        compiled_data = benchmark.compiled_data
+
+        rolling_avgs = {}
+
+        if compiled_data.get('time_series'):
+
+            for label, name in [('writes', 'write_metrics'),
+                                ('reads', 'read_metrics')]:
+
+                rolling_avgs[label] = \
+                    compiled_data.get(name).get('rolling_avg').data
+
+        histograms = dict(
+            (label, benchmark.histograms[operation + '_times'])
+            for label, operation in OPERATIONS
+            if benchmark.histograms[operation + '_times'].total_count
+        )
+
+        results = {
+            'database': database,
+            'operation_metrics': dict(compiled_data.get('operation_metrics')),
+            'percentiles': dict(compiled_data.get('percentiles')),
+            'histograms': histograms,
+            'rolling_avgs': rolling_avgs,
+        }
+
+        return results
+
+    def __create_reports_dir(self):
+        """ Creates the directory of the comparison, which holds the report of
+        every module as well as its own
+        """
+
+        reports_dir = 'generated_reports/{title}'.format(title=self.title)
+
+        self.reports_dir = reports_dir
+        number = 1
+
+        while os.path.exists(self.reports_dir):
+
+            number += 1
+
+            self.reports_dir = '{reports_dir}-{number}'.format(
+                reports_dir=reports_dir,
+                number=number,
+            )
+
+        self.images_dir = self.reports_dir + '/images'
+
+        os.makedirs(self.reports_dir if self.headless else self.images_dir)
+
+    def __operations(self):
+        """ :return list operations: the operations recorded by every module,
+                    e.g. `['writes', 'reads']`
+        """
+
+        return [
+            label for label, _ in OPERATIONS
+            if all(label in results['histograms'] for results in self.results)
+        ]
+
+    def __speedup_values(self):
+        """ Picks out the throughput, mean and p99 of every module, with the
+        speedup of each relative to the first module
+
+        :return list speedup_header: the name of each value
+        :return list speedup_values: a row of values for every operation of
+                    every module
+        """
+
+        speedup_header = [
+            'Operation',
+            'Database',
+            'Ops/Sec',
+            'Average',
+            'p99',
+            'Ops/Sec Speedup',
+            'Average Speedup',
+            'p99 Speedup',
+        ]
+
+        baseline = self.results[0]
+
+        speedup_values = []
+
+        for operation in self.__operations():
+
+            baseline_metrics = baseline['operation_metrics'].get(operation)
+
+            for results in self.results:
+
+                metrics = results['operation_metrics'].get(operation)
+
+                speedup_values.append([
+                    operation,
+                    results['database'],
+                    metrics.get('throughput'),
+                    metrics.get('avg'),
+                    metrics.get('p99'),
+                    self.__ratio(metrics.get('throughput'),
+                                 baseline_metrics.get('throughput')),
+                    self.__ratio(baseline_metrics.get('avg'),
+                                 metrics.get('avg')),
+                    self.__ratio(baseline_metrics.get('p99'),
+                                 metrics.get('p99')),
+                ])
+
+        return speedup_header, speedup_values
+
+    def __generate_speedup_tables(self):
+        """ Creates the tables of the throughput, mean and p99 of every module,
+        with the speedup of each relative to the first module
+
+        :return tabulate_obj speedup_table: the table for viewing in the
+                    terminal
+        :return tabulate_obj speedup_table_md: the table for viewing in the
+                    markdown report
+        """
+
+        from tabulate import tabulate
+
+        speedup_header, speedup_values = self.__speedup_values()
+
+        speedup_table = tabulate(
+            tabular_data=speedup_values,
+            headers=speedup_header,
+            tablefmt='grid',
+            floatfmt='.5f',
+        )
+
+        speedup_table_md = tabulate(
+            tabular_data=speedup_values,
+            headers=speedup_header,
+            tablefmt='pipe',
+            floatfmt='.5f',
+        )
+
+        return speedup_table, speedup_table_md
+
+    def __generate_percentile_tables(self):
+        """ Creates the tables of the latency percentiles, with a column for
+        each module and a row for each percentile of each operation
+
+        :return tabulate_obj percentile_table: the table for viewing in the
+                    terminal
+        :return tabulate_obj percentile_table_md: the table for viewing in the
+                    markdown report
+        """
+
+        from tabulate import tabulate
+
+        percentile_header = ['Operation', 'Percentile'] + self.databases
+
+        percentile_values = []
+
+        for operation in self.__operations():
+
+            for position, percentile in enumerate(PERCENTILES):
+
+                percentile_values.append(
+                    [operation, 'p{percentile:g}'.format(percentile=percentile)]
+                    + [results['percentiles'].get(operation)[position]
+                       for results in self.results]
+                )
+
+        percentile_table = tabulate(
+            tabular_data=percentile_values,
+            headers=percentile_header,
+            tablefmt='grid',
+            floatfmt='.5f',
+        )
+
+        percentile_table_md = tabulate(
+            tabular_data=percentile_values,
+            headers=percentile_header,
+            tablefmt='pipe',
+            floatfmt='.5f',
+        )
+
+        return percentile_table, percentile_table_md
+
+    def __generate_all_plots(self):
+        """ Draws the CDF of the latencies of every operation, and the rolling
+        averages of the writes and reads, with a line for each module.  The
+        plots are drawn in parallel, like those of each module's report.
+
+        :return list plots: a `(title, image)` tuple for each plot, in the
+                    order they appear in the report
+        """
+
+        plots = []
+        images = []
+
+        for operation in self.__operations():
+
+            name = 'cdf-' + operation.replace(' ', '-')
+
+            images.append({
+                'path': self.__image_path(name),
+                'lines': [
+                    (results['database'],)
+                    + self.__cdf(results['histograms'][operation])
+                    for results in self.results
+                ],
+                'title': 'CDF of {operation} Times'.format(
+                    operation=operation.title(),
+                ),
+                'x_label': 'Time (s)',
+                'y_label': 'Fraction of Operations',
+                'logx': True,
+            })
+
+            plots.append((
+                'This plot shows the fraction of {operation} that took at '
+                'most a given time, for each database.'.format(
+                    operation=operation,
+                ),
+                self.__image(name),
+            ))
+
+        for operation in ['writes', 'reads']:
+
+            if not all(operation in results['rolling_avgs']
+                       for results in self.results):
+                continue
+
+            name = 'running_avg-' + operation
+
+            images.append({
+                'path': self.__image_path(name),
+                'lines': [
+                    (results['database'],) + downsample(
+                        results['rolling_avgs'][operation].index.values,
+                        results['rolling_avgs'][operation].values,
+                    )
+                    for results in self.results
+                ],
+                'title': 'Plot of Rolling Averages for {operation}'.format(
+                    operation=operation.title(),
+                ),
+                'x_label': 'Trial Number',
+                'y_label': 'Time (s)',
+            })
+
+            plots.append((
+                'This plot shows the running average of the {operation} over '
+                'the course of the benchmark, for each database.'.format(
+                    operation=operation,
+                ),
+                self.__image(name),
+            ))
+
+        render_plots(images)
+
+        return plots
+
+    def __image_path(self, name):
+        """ :return str path: the path a plot is saved to """
+
+        return '{parent_dir}/{name}.png'.format(
+            parent_dir=self.images_dir,
+            name=name,
+        )
+
+    @staticmethod
+    def __cdf(histogram):
+        """ Builds the cumulative distribution of the latencies recorded in a
+        histogram
+
+        :param LatencyHistogram histogram: the histogram of the latencies
+
+        :return tup cdf: the middle of each bucket in seconds, and the
+                    fraction of latencies at or below it
+        """
+
+        values, counts = histogram.buckets()
+
+        cdf = (
+            np.array(values) / NANOSECONDS,
+            np.cumsum(counts) / histogram.total_count,
+        )
+
+        return cdf
+
+    @staticmethod
+    def __image(name):
+        """ :return str image: the markdown that shows a plot in the report """
+
+        return '![Alt text](images/{name}.png "{name}")'.format(name=name)
+
+    @staticmethod
+    def __ratio(numerator, denominator):
+        """ :return float ratio: the ratio of two results, or None if it
+                    cannot be computed
+        """
+
+        if not numerator or not denominator:
+
+            return None
+
+        return numerator / denominator
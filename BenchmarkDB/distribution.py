@@ -0,0 +1,185 @@
+"""
+DB Benchmarking Application
+===========================
+
+Distribution.py
+
+This file houses the key distributions used to pick which entries are read in
+random mode.  Real traffic is rarely uniform, so besides a uniform distribution
+the skewed distributions of YCSB are available, which make the caches of the DB
+visible in the latency distribution.  Every key is drawn up front, in a single
+vectorized pass, so picking a key during the run is only a lookup.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+
+import numpy as np
+
+
+class KeyDistribution():
+    """ Draws keys from `0` to `item_count - 1` according to one of:
+
+    - uniform: every key is equally likely
+    - zipfian: a few keys are very popular, with key 0 the most popular
+    - scrambled-zipfian: zipfian, but with the popular keys spread over the
+      whole key space instead of clustered at the start
+    - hotspot: a fraction of the operations go to a small set of hot keys, and
+      the rest are spread uniformly over the other keys
+    - latest: zipfian, with the most recently written keys the most popular
+    """
+
+    NAMES = [
+        'uniform',
+        'zipfian',
+        'scrambled-zipfian',
+        'hotspot',
+        'latest',
+    ]
+
+    # The number of terms of the zeta constant summed at a time
+    ZETA_CHUNK_SIZE = 1000000
+
+    def __init__(self, name, item_count, theta=0.99, hot_keys=0.2,
+                 hot_ops=0.8, seed=None):
+        """ __init__() validates the distribution and precomputes the
+        constants it needs.
+
+        :param str name: the name of the distribution
+        :param int item_count: the number of keys to draw from
+        :param float theta: the skew of the zipfian distributions, from 0
+                    (uniform) up to, but not including, 1
+        :param float hot_keys: the fraction of keys that are hot in the hotspot
+                    distribution
+        :param float hot_ops: the fraction of operations that go to the hot
+                    keys in the hotspot distribution
+        :param int seed: the seed of the random generator
+        """
+
+        if name not in self.NAMES:
+
+            raise ValueError('The distribution must be one of {names}'.format(
+                names=', '.join(self.NAMES),
+            ))
+
+        if item_count < 1:
+
+            raise ValueError('There must be at least one key to draw from')
+
+        if not 0 <= theta < 1:
+
+            raise ValueError('The zipfian theta must be from 0 up to 1')
+
+        if not 0 < hot_keys <= 1 or not 0 <= hot_ops <= 1:
+
+            raise ValueError('The hot keys and hot operations must be '
+                             'fractions')
+
+        self.name = name
+        self.item_count = item_count
+        self.theta = theta
+        self.hot_keys = hot_keys
+        self.hot_ops = hot_ops
+
+        self.random_state = np.random.RandomState(seed)
+
+        if name in ['zipfian', 'scrambled-zipfian', 'latest']:
+
+            self.__compute_zipfian_constants()
+
+        if name == 'scrambled-zipfian':
+
+            self.permutation = self.random_state.permutation(item_count)
+
+    def sample(self, count):
+        """ Draws keys from the distribution
+
+        :param int count: the number of keys to draw
+
+        :return ndarray keys: the keys that were drawn
+        """
+
+        if self.name == 'uniform':
+
+            return self.random_state.randint(0, self.item_count, size=count)
+
+        if self.name == 'zipfian':
+
+            return self.__zipfian(count)
+
+        if self.name == 'scrambled-zipfian':
+
+            return self.permutation[self.__zipfian(count)]
+
+        if self.name == 'hotspot':
+
+            return self.__hotspot(count)
+
+        # latest
+        return self.item_count - 1 - self.__zipfian(count)
+
+    def __compute_zipfian_constants(self):
+        """ Precomputes the constants of the zipfian generator described in
+        Gray et al., "Quickly Generating Billion-Record Synthetic Databases",
+        which is the generator used by YCSB.
+        """
+
+        n = self.item_count
+        theta = self.theta
+
+        # The sum is taken a chunk at a time, so that a billion items never
+        # need a billion floats
+        self.zeta_n = 0.0
+
+        for low in range(1, n + 1, self.ZETA_CHUNK_SIZE):
+
+            self.zeta_n += np.sum(np.arange(
+                low, min(low + self.ZETA_CHUNK_SIZE, n + 1), dtype=np.float64,
+            ) ** -theta)
+        self.zeta_2 = 1 + 0.5 ** theta
+
+        self.alpha = 1 / (1 - theta)
+        self.eta = (
+            (1 - (2 / n) ** (1 - theta)) /
+            (1 - self.zeta_2 / self.zeta_n)
+        ) if n > 2 else 0
+
+    def __zipfian(self, count):
+        """ :return ndarray keys: `count` zipfian keys, where key 0 is the
+                    most popular
+        """
+
+        n = self.item_count
+
+        u = self.random_state.random_sample(count)
+        uz = u * self.zeta_n
+
+        keys = (n * (self.eta * u - self.eta + 1) ** self.alpha).astype(np.int64)
+
+        keys = np.where(uz < self.zeta_2, 1, keys)
+        keys = np.where(uz < 1, 0, keys)
+
+        return np.clip(keys, 0, n - 1)
+
+    def __hotspot(self, count):
+        """ :return ndarray keys: `count` keys, with `hot_ops` of them drawn
+                    from the first `hot_keys` of the key space
+        """
+
+        n = self.item_count
+
+        hot_count = max(int(n * self.hot_keys), 1)
+
+        hot = self.random_state.random_sample(count) < self.hot_ops
+
+        hot_keys = self.random_state.randint(0, hot_count, size=count)
+
+        if hot_count < n:
+
+            cold_keys = self.random_state.randint(hot_count, n, size=count)
+
+        else:
+
+            cold_keys = hot_keys
+
+        return np.where(hot, hot_keys, cold_keys)
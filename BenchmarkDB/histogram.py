@@ -0,0 +1,435 @@
+"""
+DB Benchmarking Application
+===========================
+
+Histogram.py
+
+This file houses a compact, log-bucketed latency histogram in the style of
+HdrHistogram.  Values are recorded as integers (nanoseconds) into buckets whose
+width grows with the magnitude of the value, so that every value is kept to a
+fixed number of significant digits while the memory used stays constant no
+matter how many values are recorded.  Histograms with the same settings can be
+merged, which is how the latencies of every worker are combined.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+
+import math
+import array
+
+import numpy as np
+
+
+class LatencyHistogram():
+    """ A fixed-size histogram of integer latencies.  Alongside the buckets,
+    the exact count, sum, sum of squares, minimum and maximum are kept, so the
+    mean and standard deviation are exact and only the percentiles are
+    rounded to the configured number of significant digits.
+    """
+
+    def __init__(self, significant_digits=3, highest_trackable=3600 * 10 ** 9):
+        """ __init__() sizes the histogram so that every value from 0 up to
+        `highest_trackable` can be recorded with the given precision.
+
+        :param int significant_digits: the number of significant digits each
+                    recorded value is kept to (1-5)
+        :param int highest_trackable: the highest value that can be recorded.
+                    Larger values are counted in the highest bucket.  Defaults
+                    to one hour in nanoseconds.
+        """
+
+        if not 1 <= significant_digits <= 5:
+
+            raise ValueError('significant_digits must be between 1 and 5')
+
+        self.significant_digits = significant_digits
+        self.highest_trackable = highest_trackable
+
+        largest_single_unit = 2 * 10 ** significant_digits
+        magnitude = int(math.ceil(math.log(largest_single_unit, 2)))
+
+        self.sub_bucket_half_count_magnitude = magnitude - 1
+        self.sub_bucket_count = 2 ** magnitude
+        self.sub_bucket_half_count = self.sub_bucket_count // 2
+        self.sub_bucket_mask = self.sub_bucket_count - 1
+
+        # Each bucket covers twice the range of the one before it
+        self.bucket_count = 1
+        smallest_untrackable = self.sub_bucket_count
+
+        while smallest_untrackable <= highest_trackable:
+
+            smallest_untrackable <<= 1
+            self.bucket_count += 1
+
+        counts_length = (self.bucket_count + 1) * self.sub_bucket_half_count
+        self.counts = array.array('l', [0]) * counts_length
+
+        self.total_count = 0
+        self.total = 0
+        self.total_squares = 0
+        self.min = None
+        self.max = None
+
+    def record(self, value, count=1):
+        """ Records a value into the histogram
+
+        :param int value: the value to be recorded, e.g. a latency in ns
+        :param int count: the number of times the value should be recorded
+        """
+
+        value = max(int(value), 0)
+
+        index = self.__counts_index(min(value, self.highest_trackable))
+        self.counts[index] += count
+
+        self.total_count += count
+        self.total += value * count
+        self.total_squares += value * value * count
+
+        if self.min is None or value < self.min:
+            self.min = value
+
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def record_many(self, values):
+        """ Records a whole array of values at once, which is how a histogram
+        is rebuilt from the raw data.  The buckets of all the values are found
+        in a single vectorized pass.
+
+        :param values: the values to be recorded, e.g. latencies in ns
+        """
+
+        values = np.maximum(np.asarray(values, dtype=np.int64), 0)
+
+        if not len(values):
+
+            return
+
+        clipped = np.minimum(values, self.highest_trackable)
+
+        # The bit length of a value is the exponent of its float, which is
+        # exact for any value below 2 ** 53
+        bucket_indexes = (
+            np.frexp((clipped | self.sub_bucket_mask).astype(np.float64))[1] -
+            (self.sub_bucket_half_count_magnitude + 1)
+        )
+        sub_bucket_indexes = clipped >> bucket_indexes
+
+        indexes = (
+            ((bucket_indexes + 1) << self.sub_bucket_half_count_magnitude) +
+            sub_bucket_indexes - self.sub_bucket_half_count
+        )
+
+        bucket_counts = np.bincount(indexes, minlength=len(self.counts))
+
+        for index in np.flatnonzero(bucket_counts):
+
+            self.counts[index] += int(bucket_counts[index])
+
+        self.total_count += len(values)
+        self.total += int(values.sum())
+        self.total_squares += self.__sum_squares(values)
+
+        for value in [int(values.min()), int(values.max())]:
+
+            if self.min is None or value < self.min:
+                self.min = value
+
+            if self.max is None or value > self.max:
+                self.max = value
+
+    def merge(self, other):
+        """ Adds all of the values recorded in another histogram to this one.
+        Both histograms must have been created with the same settings.
+
+        :param LatencyHistogram other: the histogram to be merged
+        """
+
+        if len(other.counts) != len(self.counts):
+
+            raise ValueError('Only histograms with the same settings can be '
+                             'merged')
+
+        for index, count in enumerate(other.counts):
+
+            if count:
+                self.counts[index] += count
+
+        self.total_count += other.total_count
+        self.total += other.total
+        self.total_squares += other.total_squares
+
+        for value in [other.min, other.max]:
+
+            if value is None:
+                continue
+
+            if self.min is None or value < self.min:
+                self.min = value
+
+            if self.max is None or value > self.max:
+                self.max = value
+
+    def to_dict(self):
+        """ Describes the histogram with plain values, so that it can be saved
+        as JSON and loaded again with `from_dict()`.  Only the buckets that
+        have values counted in them are kept.
+
+        :return dict state: the settings, totals and counts of the histogram
+        """
+
+        state = {
+            'significant_digits': self.significant_digits,
+            'highest_trackable': self.highest_trackable,
+            'counts': [
+                [index, count] for index, count in enumerate(self.counts)
+                if count
+            ],
+            'total_count': self.total_count,
+            'total': self.total,
+            'total_squares': self.total_squares,
+            'min': self.min,
+            'max': self.max,
+        }
+
+        return state
+
+    @classmethod
+    def from_dict(cls, state):
+        """ Rebuilds a histogram described by `to_dict()`
+
+        :param dict state: the settings, totals and counts of the histogram
+
+        :return LatencyHistogram histogram: the rebuilt histogram
+        """
+
+        histogram = cls(
+            significant_digits=state['significant_digits'],
+            highest_trackable=state['highest_trackable'],
+        )
+
+        for index, count in state['counts']:
+
+            histogram.counts[index] = count
+
+        histogram.total_count = state['total_count']
+        histogram.total = state['total']
+        histogram.total_squares = state['total_squares']
+        histogram.min = state['min']
+        histogram.max = state['max']
+
+        return histogram
+
+    def mean(self):
+        """ :return float mean: the exact mean of all recorded values """
+
+        if not self.total_count:
+
+            return None
+
+        return self.total / self.total_count
+
+    def stdev(self):
+        """ :return float stdev: the exact sample standard deviation of all
+                    recorded values
+        """
+
+        if self.total_count < 2:
+
+            return None
+
+        n = self.total_count
+
+        variance = (self.total_squares - self.total * self.total / n) / (n - 1)
+
+        return math.sqrt(max(variance, 0))
+
+    def percentile(self, percentile):
+        """ Finds the value below which the given percentage of recorded values
+        fall.  The result is the highest value that is equivalent (to the
+        configured precision) to the value at that percentile.
+
+        :param float percentile: the percentile to find, from 0 to 100
+
+        :return int value: the value at the percentile
+        """
+
+        return self.percentiles([percentile])[0]
+
+    def percentiles(self, percentiles):
+        """ Finds several percentiles in a single pass over the buckets
+
+        :param list percentiles: the percentiles to find, each from 0 to 100
+
+        :return list values: the value at each percentile
+        """
+
+        if not self.total_count:
+
+            return [None] * len(percentiles)
+
+        targets = sorted(
+            (max(int(math.ceil(p / 100 * self.total_count)), 1), position)
+            for position, p in enumerate(percentiles)
+        )
+
+        values = [None] * len(percentiles)
+        target = 0
+        running_count = 0
+
+        for index, count in enumerate(self.counts):
+
+            running_count += count
+
+            while target < len(targets) and running_count >= targets[target][0]:
+
+                value = self.__highest_equivalent_value(index)
+                values[targets[target][1]] = min(value, self.max)
+                target += 1
+
+            if target == len(targets):
+                break
+
+        return values
+
+    def buckets(self):
+        """ Lists every bucket that has values counted in it, which is all that
+        is needed to resample the recorded values
+
+        :return tup buckets: the midpoint value of each bucket and the count of
+                    values in each bucket
+        """
+
+        values = []
+        counts = []
+
+        for index, count in enumerate(self.counts):
+
+            if not count:
+                continue
+
+            lowest = self.__lowest_equivalent_value(index)
+            highest = self.__highest_equivalent_value(index)
+
+            values.append((lowest + highest) / 2)
+            counts.append(count)
+
+        return values, counts
+
+    def linear_bins(self, low, high, bin_count):
+        """ Re-bins the recorded values into evenly spaced bins, which is used
+        to draw a histogram plot without the raw values.  Each bucket is
+        counted in the bin its midpoint falls into.
+
+        :param int low: the lowest value of the first bin
+        :param int high: the highest value of the last bin
+        :param int bin_count: the number of bins
+
+        :return list bins: the count of values in each bin
+        """
+
+        bins = [0] * bin_count
+        width = max(high - low, 1) / bin_count
+
+        for index, count in enumerate(self.counts):
+
+            if not count:
+                continue
+
+            lowest = self.__lowest_equivalent_value(index)
+            highest = self.__highest_equivalent_value(index)
+            midpoint = (lowest + highest) / 2
+
+            bin_index = int((midpoint - low) / width)
+            bin_index = min(max(bin_index, 0), bin_count - 1)
+
+            bins[bin_index] += count
+
+        return bins
+
+    def __sum_squares(self, values, chunk_size=65536):
+        """ Sums the squares of an array of values exactly, without boxing
+        every value as a Python integer.  Each value is split into three 21
+        bit limbs, whose products fit in int64 even when summed over a whole
+        chunk, and only the sums of the products are combined as Python
+        integers.
+
+        :param ndarray values: the (non-negative int64) values
+        :param int chunk_size: the number of values summed at a time
+
+        :return int total: the sum of the squares of the values
+        """
+
+        mask = (1 << 21) - 1
+
+        total = 0
+
+        for low in range(0, len(values), chunk_size):
+
+            chunk = values[low:low + chunk_size]
+
+            high_limbs = chunk >> 42
+            middle_limbs = (chunk >> 21) & mask
+            low_limbs = chunk & mask
+
+            products = [
+                (84, high_limbs * high_limbs),
+                (63, 2 * high_limbs * middle_limbs),
+                (42, 2 * high_limbs * low_limbs + middle_limbs * middle_limbs),
+                (21, 2 * middle_limbs * low_limbs),
+                (0, low_limbs * low_limbs),
+            ]
+
+            for shift, product in products:
+
+                total += int(product.sum()) << shift
+
+        return total
+
+    def __counts_index(self, value):
+        """ :return int index: the index of the bucket a value is counted in """
+
+        bucket_index = (
+            (value | self.sub_bucket_mask).bit_length() -
+            (self.sub_bucket_half_count_magnitude + 1)
+        )
+        sub_bucket_index = value >> bucket_index
+
+        bucket_base_index = (
+            (bucket_index + 1) << self.sub_bucket_half_count_magnitude
+        )
+
+        return bucket_base_index + sub_bucket_index - self.sub_bucket_half_count
+
+    def __bucket_indexes(self, counts_index):
+        """ :return tup indexes: the bucket and sub-bucket of a counts index """
+
+        bucket_index = (counts_index >> self.sub_bucket_half_count_magnitude) - 1
+        sub_bucket_index = (
+            (counts_index & (self.sub_bucket_half_count - 1)) +
+            self.sub_bucket_half_count
+        )
+
+        if bucket_index < 0:
+
+            sub_bucket_index -= self.sub_bucket_half_count
+            bucket_index = 0
+
+        return bucket_index, sub_bucket_index
+
+    def __lowest_equivalent_value(self, counts_index):
+        """ :return int value: the lowest value counted in a bucket """
+
+        bucket_index, sub_bucket_index = self.__bucket_indexes(counts_index)
+
+        return sub_bucket_index << bucket_index
+
+    def __highest_equivalent_value(self, counts_index):
+        """ :return int value: the highest value counted in a bucket """
+
+        bucket_index, sub_bucket_index = self.__bucket_indexes(counts_index)
+
+        return ((sub_bucket_index + 1) << bucket_index) - 1
@@ -9,6 +9,10 @@ read/write commands are issued from, timed, and all data is analyzed.  Results
 from the trials are printed to the console by default, and are also printed to
 a markdown file to keep a record of.
 
+Several modules can be compared in a single run by giving a comma-separated
+list of them as the `<database>`, e.g. `main.py mongodb,postgreSQLdb` (see
+`comparison.py`).
+
     Usage:
         main.py <database> [options]
         main.py --debug [options]
@@ -25,8 +29,13 @@ a markdown file to keep a record of.
         -r --random         Activates random mode, where reads are taken
                                 randomly from the DB instead of sequentially
         -l --list           Outputs a list of available DB modules
-        --no-csv            App will not generate a CSV file with the raw data
+        --csv               Also export the raw data to a CSV file, which is
+                                much larger and slower to load than the
+                                binary raw data
         --no-report         Option to disable the creation of the report file
+        --headless          Only write the raw data and summary.json, without
+                                the report, its tables or any plots, so that
+                                none of the plotting libraries are loaded
         --no-split          Alternate between reads and writes instead of all
                                 writes before reads
         --debug             Generates a random dataset instead of actually
@@ -35,30 +44,120 @@ a markdown file to keep a record of.
                                 [default: 10]
         --trials=<n>        Specify the number of reads and writes to make to
                                 the DB to collect data on [default: 1000]
+        --workers=<n>       Number of concurrent client threads, each with
+                                its own connection to the DB [default: 1]
+        --processes=<n>     Number of worker processes to fork, each running
+                                its own pool of workers [default: 1]
+        --concurrency=<n>   Use the asyncio runner, which keeps n operations
+                                in flight from a single thread (per process).
+                                DB modules without async functions instead
+                                share one blocking client per worker (or per
+                                CPU without --workers).  Needs Python 3.5+
+        --rate=<n>          Run open-loop, issuing n operations per second in
+                                total and measuring latency from the intended
+                                start of each operation
+        --arrival=<type>    The schedule used with --rate, either fixed or
+                                poisson [default: fixed]
+        --no-raw            Only record latency histograms, which use fixed
+                                memory, instead of every raw sample (disables
+                                the raw data and the time-series plots)
+        --precision=<n>     Significant digits kept by the latency histograms
+                                [default: 3]
+        --subtract-overhead  Subtract the calibrated overhead of the timing
+                                code from every measured latency
+        --batch-size=<n>    Number of entries written or read by each
+                                operation, using the bulk functions of the DB
+                                module [default: 1]
+        --commit-every=<n>  Commit the writes of each worker in groups of n,
+                                timing each commit as its own operation, for
+                                DB modules with transactions [default: 1]
+        --min-length=<n>    Vary the length of each entry field between n
+                                and --length instead of fixing it
+        --payload-pool=<n>  Number of distinct entries generated before the
+                                run, which are reused if there are more
+                                trials (defaults to one for every trial, up
+                                to 1000000)
+        --seed=<n>          Seed for the generated entries and read keys, so
+                                that every run is the same
+        --distribution=<d>  Key distribution of the reads in random mode, one
+                                of uniform, zipfian, scrambled-zipfian,
+                                hotspot or latest (implies --random)
+        --zipf-theta=<n>    Skew of the zipfian distributions, from 0 up to 1
+                                [default: 0.99]
+        --hot-keys=<n>      Fraction of keys that are hot with the hotspot
+                                distribution [default: 0.2]
+        --hot-ops=<n>       Fraction of reads that go to the hot keys with
+                                the hotspot distribution [default: 0.8]
+        --preload           Load every trial in bulk with the preload() of
+                                the DB module (e.g. COPY for PostgreSQL),
+                                instead of timing a write of each, so that
+                                only the reads or the workload are measured
+        --workload=<name>   Load every trial, then run one of the core YCSB
+                                workloads (a to f) against them
+        --mix=<spec>        Load every trial, then run a custom mix of read,
+                                update, insert, scan and rmw operations, e.g.
+                                read:0.7,update:0.2,insert:0.1
+        --operations=<n>    Number of operations run by the workload
+                                (defaults to the number of trials)
+        --scan-length=<n>   Longest scan of the workload, each scan reads
+                                between 1 and n entries [default: 100]
+        --warmup=<n>        Leave the start of each phase out of the
+                                statistics, either n operations, n seconds
+                                (e.g. 5s) or auto to detect when the
+                                latencies settle (needs the raw samples)
+        --duration=<s>      Run the reads (or the operations of a workload)
+                                for s seconds instead of once each, cycling
+                                through the trials.  Only histograms and
+                                windows are recorded, so memory stays constant
+        --window=<s>        Append the throughput and latency percentiles of
+                                every s seconds to timeseries.csv during the
+                                run (defaults to 1 with --duration)
+        --bootstrap=<n>     Number of bootstrap resamples behind the 95%
+                                confidence intervals of the mean and p99
+                                (0 leaves the intervals out) [default: 1000]
+        --baseline=<dir>    Compare the p50, p99 and throughput of every
+                                operation to the run reported in dir, and
+                                exit with an error if any of them regressed
+        --set=<settings>    Override settings of the DB module's local.py,
+                                e.g. POSTGRESQL_STATEMENTS=prepared (several
+                                are separated by commas)
+        --threshold=<n>     Fraction by which a result may get worse than the
+                                baseline before it counts as a regression
+                                [default: 0.1]
 """
 
 from __future__ import absolute_import
+from __future__ import division
 from __future__ import print_function
 
 import os
 import time
-import string
+import array
 import random
 import importlib
-import pylab
-import ipdb
-import seaborn
-import pandas as pd
+import threading
+import multiprocessing
+import json
 import numpy as np
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
 
 from os import getcwd, listdir, makedirs
-from sys import exit
-from tabulate import tabulate
+from sys import exit, version_info
 from docopt import docopt
 from clint.textui import progress
+from histogram import LatencyHistogram
+from payload import PayloadPool
+from distribution import KeyDistribution
+from workload import Workload, PROFILES, parse_mix
+from warmup import parse_warmup, steady_state_start
+from windows import WindowRecorder
+from bootstrap import bootstrap_intervals
+from regression import save_results, load_results, find_regressions
+from rawdata import RawLog, write_raw_data, operation_rows, export_csv, \
+    node_stats
+from resources import peak_rss
+from plots import downsample, bin_counts, render_plots
+from timer import NANOSECONDS, clock_ns, to_seconds, clock_resolution, \
+    calibrate_overhead
 import six
 
 
@@ -81,6 +180,172 @@ def retrieve_module_list():
     return mod_list
 
 
+def parse_settings(spec):
+    """ Parses the settings of a DB module given with `--set`
+
+    :param str spec: the settings, e.g. `POSTGRESQL_STATEMENTS=prepared`
+
+    :return list settings: the `(name, value)` of each setting, with the value
+                still a string
+    """
+
+    settings = []
+
+    for setting in (spec or '').split(','):
+
+        if not setting.strip():
+            continue
+
+        name, equals, value = setting.partition('=')
+
+        if not equals or not name.strip():
+
+            raise ValueError('{setting!r} is not of the form NAME=value'.format(
+                setting=setting,
+            ))
+
+        settings.append((name.strip(), value.strip()))
+
+    return settings
+
+
+# The percentiles of latency shown in the report
+PERCENTILES = [50, 90, 95, 99, 99.9, 99.99]
+
+# The statistics of each operation written to the JSON summary
+SUMMARY_METRICS = [
+    'avg',
+    'stdev',
+    'max',
+    'min',
+    'range',
+    'throughput',
+    'p99',
+    'mean_ci',
+    'p99_ci',
+]
+
+# The rows shown in the report for the other operations of a mixed workload
+WORKLOAD_LABELS = [
+    ('updates', 'update'),
+    ('inserts', 'insert'),
+    ('scans', 'scan'),
+    ('read-modify-writes', 'rmw'),
+]
+
+# The operations of a mixed workload that write, and so count towards
+# `--commit-every`
+WRITE_OPERATIONS = ['update', 'insert', 'rmw']
+
+# The number of distinct entries generated by default, which bounds the memory
+# of the payloads of very large runs (the entries are reused past it)
+PAYLOAD_POOL_SIZE = 10 ** 6
+
+# The typecode used to send raw latencies (integer ns) between processes
+LATENCY_TYPECODE = 'q' if 'q' in getattr(array, 'typecodes', '') else 'l'
+
+
+class Worker():
+    """ A single benchmarking client.  Each worker owns its own instance of
+    the DB module (and therefore its own connection) as well as its own
+    latency histograms and raw data, so that no locking is needed while trials
+    are running (apart from the window samples, which the window thread takes
+    over).  These are merged back together in `Benchmark.compile_data()`.
+    """
+
+    # The latencies of writes and reads, which are also kept as raw data.  The
+    # corrected buffers are only filled in open-loop mode (`--rate`), and
+    # measure latency from the intended start time of each operation instead
+    # of its actual start time.
+    BUFFERS = [
+        'write_times',
+        'read_times',
+        'write_times_corrected',
+        'read_times_corrected',
+    ]
+
+    # With `--batch-size`, the latency of each whole batch is also recorded,
+    # although only into a histogram
+    BATCH_HISTOGRAMS = [
+        'write_batch_times',
+        'read_batch_times',
+    ]
+
+    # The other operations of a mixed workload (`--workload` or `--mix`) are
+    # also only recorded into histograms.  Its reads use the read buffers.
+    WORKLOAD_HISTOGRAMS = [
+        'update_times',
+        'insert_times',
+        'scan_times',
+        'rmw_times',
+        'update_times_corrected',
+        'insert_times_corrected',
+        'scan_times_corrected',
+        'rmw_times_corrected',
+    ]
+
+    # With `--commit-every`, the latency of each commit of a group of writes,
+    # which is also only recorded into a histogram
+    COMMIT_HISTOGRAMS = [
+        'commit_times',
+    ]
+
+    HISTOGRAMS = BUFFERS + BATCH_HISTOGRAMS + WORKLOAD_HISTOGRAMS + \
+        COMMIT_HISTOGRAMS
+
+    def __init__(self, worker_id, client, significant_digits=3,
+                 raw_capacity=0):
+        """ __init__() creates an empty worker around a DB client
+
+        :param int worker_id: the position of this worker in the pool, which
+                    also determines the slice of the key space it handles
+        :param client: the `Benchmark` instance of the DB module
+        :param int significant_digits: the precision of the worker's latency
+                    histograms
+        :param int raw_capacity: the number of rows of raw data the worker is
+                    expected to record
+        """
+
+        self.worker_id = worker_id
+        self.client = client
+        self.significant_digits = significant_digits
+        self.raw_capacity = raw_capacity
+
+        self.clear()
+
+        self.intended_start = None
+        self.phase_operations = 0
+
+        # The writes left uncommitted, with `--commit-every`
+        self.pending_writes = 0
+
+        # Guards `window_samples`, which the window thread swaps out at the
+        # end of every window while the worker is still recording
+        self.window_lock = threading.Lock()
+
+        self.error = None
+
+    def clear(self):
+        """ Empties all of the histograms and raw data of the worker """
+
+        self.histograms = {}
+
+        # The number of operations of each buffer that were part of a warmup,
+        # which are kept in the raw data but not in the histograms
+        self.warmup_counts = {}
+
+        # The latencies of the current window, with `--window`
+        self.window_samples = {}
+
+        # A row for every operation, unless `--no-raw` was given
+        self.raw_log = RawLog(self.raw_capacity)
+
+        for histogram_name in self.HISTOGRAMS:
+
+            histogram = LatencyHistogram(self.significant_digits)
+            self.histograms[histogram_name] = histogram
+
+
 class Benchmark():
     """ The primary benchmark class of the application, which manages the whole
     process from start to finish.  After collecting user options, the
@@ -89,9 +354,19 @@ class Benchmark():
     comprehensive benchmark report.
     """
 
-    def __init__(self, setup=False, options=None):
+    def __init__(self, setup=False, options=None, clients=None,
+                 reports_root='generated_reports', inputs=None):
         """ __init__() prepares for benchmarking by collecting the user's
         runtime options and then managing the process.
+
+        :param bool setup: run the benchmarks straight away
+        :param dict options: the runtime options, as parsed by docopt
+        :param list clients: the clients of the DB module to reuse, which a
+                    sweep keeps from one run to the next
+        :param str reports_root: the directory the report is created in
+        :param dict inputs: the payloads, read keys and workload generated by
+                    an earlier run with the same options, which a comparison
+                    reuses instead of generating them again
         """
         if not options:
             options = {}
@@ -103,13 +378,27 @@ class Benchmark():
             self.__print_module_list()
 
         self.collection = 'test'
+        self.clients = clients
+        self.reports_root = reports_root
 
         # Retrieve command line self.options
         self.verbose = self.options.get('-v')
         self.really_verbose = self.options.get('-V')
         self.no_report = self.options.get('--no-report')
-        self.random = self.options.get('--random')
-        self.csv = not self.options.get('--no-csv')
+        self.headless = self.options.get('--headless')
+        # A run of fixed duration only keeps constant-size statistics
+        self.duration = self.options.get('--duration')
+        if self.duration:
+            self.duration = float(self.duration)
+
+        self.window = self.options.get('--window')
+        if self.window:
+            self.window = float(self.window)
+        elif self.duration:
+            self.window = 1.0
+
+        self.raw = not self.options.get('--no-raw') and not self.duration
+        self.csv = self.raw and self.options.get('--csv')
         self.report_title = self.options.get('<report_title>')
 
         if not options.get('--length'):
@@ -120,6 +409,211 @@ class Benchmark():
             options['--trials'] = 1000
         self.trials = int(options.get('--trials'))
 
+        self.min_length = self.options.get('--min-length')
+        if self.min_length is not None:
+            self.min_length = int(self.min_length)
+
+            # An empty field cannot be written to a typed column
+            if not 1 <= self.min_length <= self.entry_length:
+                exit('Error! The minimum length must be between 1 and '
+                     '--length!')
+
+        self.payload_pool_size = self.options.get('--payload-pool')
+        if self.payload_pool_size:
+            self.payload_pool_size = int(self.payload_pool_size)
+        else:
+            self.payload_pool_size = min(self.trials, PAYLOAD_POOL_SIZE)
+
+        # Worker processes are given the same seed, so that they all generate
+        # the same payloads, keys and workload
+        if not options.get('--seed'):
+            options['--seed'] = random.randint(0, 2 ** 31 - 1)
+        self.seed = int(options.get('--seed'))
+
+        if not options.get('--bootstrap'):
+            options['--bootstrap'] = 1000
+        self.bootstrap = int(options.get('--bootstrap'))
+
+        # The settings of the DB module overridden with `--set`
+        try:
+
+            self.module_settings = parse_settings(self.options.get('--set'))
+
+        except ValueError as error:
+
+            exit('Error! Invalid --set: {error}'.format(error=error))
+
+        # The earlier run to compare this one to, which is loaded in setup()
+        self.baseline_dir = self.options.get('--baseline')
+        self.baseline = None
+
+        if not options.get('--threshold'):
+            options['--threshold'] = 0.1
+        self.threshold = float(options.get('--threshold'))
+
+        self.workload_name = self.options.get('--workload')
+        self.mix = self.options.get('--mix')
+
+        if self.workload_name and self.mix:
+
+            exit('Error! Only one of --workload and --mix can be given!')
+
+        if self.workload_name:
+
+            self.workload_name = self.workload_name.lower()
+
+            if self.workload_name not in PROFILES:
+
+                exit('Error! The workload must be one of a, b, c, d, e or f!')
+
+            self.mix, workload_distribution = PROFILES[self.workload_name]
+
+            if not self.options.get('--distribution'):
+                self.options['--distribution'] = workload_distribution
+
+        elif self.mix:
+
+            try:
+
+                self.mix = parse_mix(self.mix)
+
+            except ValueError as error:
+
+                exit('Error! Invalid mix: {error}'.format(error=error))
+
+        if not options.get('--operations'):
+            options['--operations'] = self.trials
+        self.operations = int(options.get('--operations'))
+
+        if not options.get('--scan-length'):
+            options['--scan-length'] = 100
+        self.scan_length = int(options.get('--scan-length'))
+
+        self.distribution = self.options.get('--distribution')
+
+        # A workload draws its own keys, so it does not use random mode
+        self.random = not self.mix and (
+            self.options.get('--random') or bool(self.distribution)
+        )
+
+        if (self.random or self.mix) and not self.distribution:
+            self.distribution = 'uniform'
+
+        self.distribution_params = {}
+
+        for param, option, default in [('theta', '--zipf-theta', 0.99),
+                                       ('hot_keys', '--hot-keys', 0.2),
+                                       ('hot_ops', '--hot-ops', 0.8)]:
+
+            if not options.get(option):
+                options[option] = default
+            self.distribution_params[param] = float(options.get(option))
+
+        if not options.get('--workers'):
+            options['--workers'] = 1
+        self.workers = int(options.get('--workers'))
+
+        if not options.get('--processes'):
+            options['--processes'] = 1
+        self.processes = int(options.get('--processes'))
+
+        # The asyncio runner replaces the thread pool when this is given
+        self.concurrency = self.options.get('--concurrency')
+        if self.concurrency:
+            self.concurrency = int(self.concurrency)
+
+        self.pool_size = self.concurrency or self.workers
+
+        # The number of blocking clients shared by the in-flight operations,
+        # for DB modules without the async functions
+        self.executor_clients = self.workers if self.workers > 1 else \
+            multiprocessing.cpu_count()
+
+        if self.concurrency and version_info < (3, 5):
+            exit('Error! --concurrency needs Python 3.5 or later!')
+
+        # Every worker in every process takes every `stride`-th index
+        self.stride = self.pool_size * self.processes
+
+        # Open-loop mode is only used when a rate is given
+        self.rate = self.options.get('--rate')
+        if self.rate:
+            self.rate = float(self.rate)
+
+        self.arrival = self.options.get('--arrival') or 'fixed'
+
+        # The trials are loaded in bulk, and only the reads (or the workload)
+        # are measured
+        self.preload = self.options.get('--preload')
+
+        if not options.get('--batch-size'):
+            options['--batch-size'] = 1
+        self.batch_size = int(options.get('--batch-size'))
+
+        if not options.get('--commit-every'):
+            options['--commit-every'] = 1
+        self.commit_every = int(options.get('--commit-every'))
+
+        if not options.get('--precision'):
+            options['--precision'] = 3
+        self.precision = int(options.get('--precision'))
+
+        # The raw data of each worker is allocated up front, for its share of
+        # the writes and the reads (or the operations of a workload)
+        self.raw_capacity = 0
+
+        if self.raw:
+
+            rows = self.trials + (self.operations if self.mix else self.trials)
+
+            self.raw_capacity = rows // self.stride + self.batch_size
+
+        if self.arrival not in ['fixed', 'poisson']:
+
+            exit('Error! The arrival schedule must be fixed or poisson!')
+
+        try:
+
+            self.warmup_count, self.warmup_seconds, self.auto_warmup = \
+                parse_warmup(self.options.get('--warmup'))
+
+        except ValueError as error:
+
+            exit('Error! {error}!'.format(error=error))
+
+        if self.auto_warmup and not self.raw:
+
+            exit('Error! --warmup=auto needs the raw samples, so it cannot be '
+                 'used with --no-raw or --duration!')
+
+        if self.duration and self.options.get('--no-split') and not self.mix:
+
+            exit('Error! --duration can only be used with split reads/writes '
+                 'or a workload!')
+
+        if self.window is not None and self.window <= 0:
+
+            exit('Error! The window must be longer than 0 seconds!')
+
+        if self.mix and self.batch_size > 1:
+
+            exit('Error! --batch-size cannot be used with a workload!')
+
+        if self.preload and self.options.get('--no-split') and not self.mix:
+
+            exit('Error! --preload can only be used with split reads/writes '
+                 'or a workload!')
+
+        if self.commit_every < 1:
+
+            exit('Error! --commit-every must be at least 1!')
+
+        # The operations of the asyncio runner share a single client, so its
+        # writes cannot be committed in groups of their own
+        if self.concurrency and self.commit_every > 1:
+
+            exit('Error! --commit-every cannot be used with --concurrency!')
+
         if self.options.get('--no-split'):
 
             self.split = False
@@ -128,11 +622,58 @@ class Benchmark():
 
             self.split = True
 
+        # The raw data recorded without a pool of workers (in debug mode), and
+        # the columns of the raw data of the whole run once it is written
+        self.raw_log = RawLog()
+        self.raw_data = None
+
+        # The latencies of the writes and reads, taken from the raw data
         self.write_times = []
         self.read_times = []
 
+        self.write_times_corrected = []
+        self.read_times_corrected = []
+
+        self.histograms = Worker(None, None, self.precision).histograms
+
+        self.warmup_counts = {}
+        self.warmup_masks = {}
+        self.phase_operations = 0
+        self.pending_writes = 0
+        self.phase_start_time = None
+        self.phase_deadline = None
+        self.phase = None
+
+        # The latencies of the current window, and the file they are written
+        # to at the end of each window
+        self.window_samples = {}
+        self.window_lock = threading.Lock()
+        self.windows = None
+        self.conn = None
+
+        self.reports_dir = None
+
+        self.subtract_overhead = self.options.get('--subtract-overhead')
+        self.timer_overhead = None
+
+        if not inputs:
+            inputs = {}
+
+        self.payloads = inputs.get('payloads')
+        self.payload_stats = {}
+
+        self.read_keys = inputs.get('read_keys')
+        self.workload = inputs.get('workload')
+
+        self.pool = []
+        self.process_pool = []
+        self.runner = None
+        self.database_client = None
+        self.elapsed = {}
+        self.compiled_data = None
+
         self.time_and_date = time.strftime("%a, %d %b, %Y at %H:%M:%S")
-        self.report_date = time.strftime("%b%d-%Y--%H-%M")
+        self.report_date = time.strftime("%b%d-%Y--%H-%M-%S")
 
         if setup:
             self.setup()
@@ -143,6 +684,19 @@ class Benchmark():
         Benchmark() class can be used outside of the application for testing.
         """
 
+        # The baseline is loaded first, so that a wrong path fails straight away
+        if self.baseline_dir:
+
+            try:
+
+                self.baseline = load_results(self.baseline_dir)
+
+            except ValueError as error:
+
+                exit('Error! Could not load the baseline: {error}'.format(
+                    error=error,
+                ))
+
         if self.options.get('--debug'):
 
             self.feaux_run()
@@ -152,17 +706,42 @@ class Benchmark():
             self.db_name = self.options.get('<database>')
 
             self.module = self.__register_module(self.db_name)
-            self.database_client = self.module[0].Benchmark(
-                self.collection, setup=True, trials=self.trials
-            )
+
+            self.calibrate_timer()
+
+            if self.processes > 1:
+
+                self.__start_processes()
+
+            else:
+
+                self.generate_payloads()
+                self.generate_read_keys()
+                self.generate_workload()
+                self.__create_pool()
 
             module_settings = self.module[1]
             self.number_of_nodes = module_settings.NUMBER_OF_NODES
 
             self.db_name = self.db_name.replace('db', '').upper()
 
+            self.__create_reports_dir()
+
+            if self.window:
+
+                self.windows = WindowRecorder(
+                    path=self.reports_dir + '/timeseries.csv',
+                    percentiles=PERCENTILES,
+                    sources=self.processes,
+                    unit=NANOSECONDS,
+                )
+
             # Run the benchmarks!
-            if self.split:
+            if self.mix:
+
+                self.run_workload()
+
+            elif self.split:
 
                 self.run_split()
 
@@ -170,6 +749,47 @@ class Benchmark():
 
                 self.run()
 
+            self.__stop_processes()
+
+        self.__create_reports_dir()
+
+        self.package_dir = os.path.dirname(os.path.realpath(__file__))
+
+        data = self.compile_data()
+
+        # Kept for callers such as the sweep, which summarize many runs
+        self.compiled_data = data
+
+        self.generate_summary(data)
+
+        if not self.headless:
+
+            report_data = self.generate_report_data(data)
+
+            self.generate_report(report_data)
+
+        regressions = [
+            comparison for comparison in data.get('baseline') or []
+            if comparison.get('regression')
+        ]
+
+        if regressions:
+
+            exit('Error! {count} regression(s) were found against the baseline '
+                 '{baseline}!'.format(
+                     count=len(regressions),
+                     baseline=self.baseline_dir,
+                 ))
+
+    def __create_reports_dir(self):
+        """ Creates the directory of the report, which happens before the
+        benchmarks are run so that files can be written to it during the run.
+        """
+
+        if self.reports_dir:
+
+            return
+
         if not self.report_title:
 
             self.report_title = '{db}-{date}'.format(
@@ -177,25 +797,136 @@ class Benchmark():
                 date=self.report_date,
             )
 
-        self.reports_dir = 'generated_reports/{title}'.format(
+        reports_dir = '{root}/{title}'.format(
+            root=self.reports_root,
             title=self.report_title,
         )
 
-        # TODO - fix a bug where 2 reports cannot be made in the same minute,
-        # TODO - because the naming convention used here doesn't account for
-        # TODO - seconds anymore
+        # Reports made within the same second (or with the same title) are
+        # numbered, instead of overwriting each other
+        self.reports_dir = reports_dir
+        number = 1
+
+        while os.path.exists(self.reports_dir):
+
+            number += 1
+
+            self.reports_dir = '{reports_dir}-{number}'.format(
+                reports_dir=reports_dir,
+                number=number,
+            )
+
         makedirs(self.reports_dir)
 
         self.images_dir = self.reports_dir + '/images'
-        makedirs(self.images_dir)
 
-        self.package_dir = os.path.dirname(os.path.realpath(__file__))
+        if not self.headless:
+            makedirs(self.images_dir)
 
-        data = self.compile_data()
+    def calibrate_timer(self):
+        """ Measures the overhead of the timing code, which is reported and,
+        with `--subtract-overhead`, taken off every measured latency.
+        """
+
+        self.timer_overhead = calibrate_overhead()
+
+        print('Timer overhead: {overhead} ns'.format(
+            overhead=self.timer_overhead,
+        ))
+
+    def generate_payloads(self):
+        """ Generates the entries that will be written to the DB before the
+        run starts, so that none of the cost of building them is measured.
+        The time and memory this takes are reported separately.  Payloads
+        reused from an earlier run are reported as they were generated.
+        """
+
+        if self.payloads is not None:
+
+            self.payload_stats = self.payloads.stats()
+
+            return
+
+        try:
+
+            self.payloads = PayloadPool(
+                size=self.payload_pool_size,
+                length=self.entry_length,
+                min_length=self.min_length,
+                seed=self.seed,
+            )
+
+        except ValueError as error:
+
+            exit('Error! Could not generate the payloads: {error}'.format(
+                error=error,
+            ))
+
+        self.payload_stats = self.payloads.stats()
+
+        print('Generated {size} payloads ({mb:.2f} MB) in {wall:.3f} s '
+              '({cpu:.3f} s CPU)'.format(
+                  size=self.payload_stats['size'],
+                  mb=self.payload_stats['nbytes'] / 2 ** 20,
+                  wall=self.payload_stats['wall_time'],
+                  cpu=self.payload_stats['cpu_time'],
+              ))
+
+    def generate_read_keys(self):
+        """ In random mode, draws the key of every read up front from the
+        chosen distribution, so that none of the cost of drawing them is
+        measured.  Keys are drawn from all of the entries written in the writes
+        phase.
+        """
+
+        if not self.random or self.read_keys is not None:
+
+            return
+
+        try:
+
+            distribution = KeyDistribution(
+                name=self.distribution,
+                item_count=self.trials,
+                seed=self.seed,
+                **self.distribution_params
+            )
+
+        except ValueError as error:
+
+            exit('Error! Could not create the key distribution: {error}'.format(
+                error=error,
+            ))
+
+        self.read_keys = distribution.sample(self.trials)
+
+    def generate_workload(self):
+        """ With `--workload` or `--mix`, draws every operation of the mixed
+        workload up front, so that none of the cost of drawing them is
+        measured.
+        """
+
+        if not self.mix or self.workload is not None:
+
+            return
 
-        report_data = self.generate_report_data(data)
+        try:
+
+            self.workload = Workload(
+                mix=self.mix,
+                operation_count=self.operations,
+                record_count=self.trials,
+                distribution=self.distribution,
+                scan_length=self.scan_length,
+                seed=self.seed,
+                **self.distribution_params
+            )
+
+        except ValueError as error:
 
-        self.generate_report(report_data)
+            exit('Error! Could not create the workload: {error}'.format(
+                error=error,
+            ))
 
     def feaux_run(self):
         """ This function generates fake data to be used for testing purposes.
@@ -207,41 +938,27 @@ class Benchmark():
         self.db_name = 'feaux_db'
 
         r = np.random.normal(0.004, 0.001, self.trials)
-        self.read_times = r.tolist()
-
         w = np.random.normal(0.005, 0.0015, self.trials)
-        self.write_times = w.tolist()
-
-        for i in progress.bar(list(range(self.trials))):
-
-            pass
-
-    def random_entry(self):
-        """ This function generates a random sdata entry consisting of two
-        fields - a string and an integer.  The string is generated from all
-        ascii letters and the number is generated from numbers 0-9.
-
-        :return dict entry: the random data entry that was generated
-        """
 
-        entry = dict()
+        # The operations are laid out back to back, as if they had been run
+        start_time = 0
 
-        entry_fields = {
-            'Number': string.digits,
-            'Info': string.ascii_letters,
-        }
+        for index, (read_time, write_time) in enumerate(zip(r, w)):
 
-        for field, selection in entry_fields.items():
+            for operation, latency in [('write', write_time),
+                                       ('read', read_time)]:
 
-            field_val = str()
+                stop_time = start_time + max(int(latency * NANOSECONDS), 0)
 
-            for x in range(self.entry_length):
+                self.record_operation(
+                    self, operation, start_time, stop_time, keys=[index],
+                )
 
-                field_val += random.choice(selection)
+                start_time = stop_time
 
-            entry[field] = field_val
+        for i in progress.bar(list(range(self.trials))):
 
-        return entry
+            pass
 
     def run(self):
         """ This function keeps track of and calls the read/ write functions
@@ -254,20 +971,7 @@ class Benchmark():
             msg = 'Error! Random mode can ONLY be used with split reads/writes!'
             exit(msg)
 
-        for index in progress.bar(list(range(self.trials))):
-
-            entry = self.random_entry()
-            entry.update(Index=index)
-
-            self.write(entry)
-
-            if self.random:
-                index = random.randint(0, index)
-
-            if self.options.get('-s'):
-                time.sleep(1/20)
-
-            self.read(index)
+        self.elapsed['total'] = self.__run_phase('total')
 
     def run_split(self):
         """ This function performs the same actions as 'run()', with the key
@@ -275,133 +979,1767 @@ class Benchmark():
         instead of alternating reads and writes.
         """
 
-        print('\nWrite progress:\n')
+        if self.preload:
 
-        for index in progress.bar(list(range(self.trials))):
+            self.preload_entries()
 
-            entry = self.random_entry()
-            entry.update(Index=index)
+        else:
 
-            self.write(entry)
+            print('\nWrite progress:\n')
 
-            if self.options.get('-s'):
-                time.sleep(1/20)
+            self.elapsed['writes'] = self.__run_phase('writes')
 
         print('\nRead progress:\n')
 
-        for index in progress.bar(list(range(self.trials))):
+        self.elapsed['reads'] = self.__run_phase('reads')
 
-            if self.random:
-                index = random.randint(0, index)
-
-            self.read(index)
+    def run_workload(self):
+        """ This function loads an entry for every trial, just like the
+        writes of 'run_split()', and then runs the mixed workload against them.
+        """
 
-            if self.options.get('-s'):
-                time.sleep(1/20)
+        if self.preload:
 
-    def write(self, entry):
-        """ This function handles all DB write commands and times that action.
-        It takes a single parameter ('entry'), which is the data to
-        be written to the DB.
+            self.preload_entries()
 
-        :param dict entry: The entry to be recorded to the DB
-        """
+        else:
 
-        write_start_time = time.time()
+            print('\nLoad progress:\n')
 
-        self.database_client.write(entry)
+            self.elapsed['writes'] = self.__run_phase('writes')
 
-        write_stop_time = time.time()
+        print('\nWorkload progress:\n')
 
-        write_time = write_stop_time - write_start_time
+        self.elapsed['mixed'] = self.__run_phase('mixed')
 
-        self.write_times.append(write_time)
+    def preload_entries(self):
+        """ This function loads an entry for every trial in bulk, with the
+        `preload()` function of the module, instead of timing a write of each.
+        Only the time taken by the whole load is recorded, and its throughput
+        is reported on its own.
+        """
 
-        if self.really_verbose:
+        print('\nPreloading {trials} entries...'.format(trials=self.trials))
 
-            write_msg = 'Write time: {time}'.format(time=write_time)
+        self.elapsed['preload'] = self.__run_phase('preload')
 
-            print(write_msg)
+        print('Preloaded {trials} entries in {elapsed:.3f} s '
+              '({throughput:.1f} entries/s)'.format(
+                  trials=self.trials,
+                  elapsed=self.elapsed['preload'],
+                  throughput=self.__preload_throughput() or 0,
+              ))
 
-    def read(self, index):
-        """ This function handles all DB read commands, and times that action.
-        It takes a single parameter, which is the index of an entry
-        to retrieve from the DB.
+    def serve_process(self, process_id, setup_lock, conn):
+        """ The entry point of a forked worker process.  The process loads the
+        DB module, builds its own pool of workers and then waits for the parent
+        to tell it which phase to run.  After each phase the latencies are sent
+        back to the parent as compact arrays.
 
-        :param int index: The index of the item to be retrieved from the DB
+        :param int process_id: the position of this process in the process
+                    pool
+        :param Lock setup_lock: a lock that serializes client creation, since
+                    the DB modules reset the DB when they are set up
+        :param Connection conn: the pipe to the parent process
         """
 
-        read_start_time = time.time()
+        # Forked processes inherit the parent's random state
+        random.seed()
 
-        read_entry = self.database_client.read(index)
+        self.conn = conn
 
-        read_stop_time = time.time()
+        self.calibrate_timer()
 
-        read_time = read_stop_time - read_start_time
+        try:
 
-        self.read_times.append(read_time)
+            # Every process generates its own payloads, outside the lock
+            self.generate_payloads()
+            self.generate_read_keys()
+            self.generate_workload()
 
-        if self.verbose or self.really_verbose:
+            with setup_lock:
 
-            read_msg = 'Read data: {data}'.format(data=read_entry)
+                self.module = self.__register_module(
+                    self.options.get('<database>')
+                )
+                self.__create_pool(process_id * self.pool_size)
 
-            if self.really_verbose:
+            conn.send({'error': None, 'payload_stats': self.payload_stats})
 
-                read_msg += '\nRead time: {time}'.format(time=read_time)
+            for phase in iter(conn.recv, None):
 
-                read_msg += '\n--------------------------'
+                self.__run_phase(phase)
 
-            print(read_msg)
+                buffers = []
 
-    def compile_data(self):
-        """ This function takes all the data collected from the trials (read
-        and write times) and then calculates some important statistics about
-        said data.  Without altering functionality, a report will be generated
-        upon completion of analysis.
+                for worker in self.pool:
 
-        :return dict compiled_data: dict containing all read and w
-        """
+                    buffers.append((
+                        worker.worker_id, worker.raw_log, worker.histograms,
+                        worker.warmup_counts,
+                    ))
 
-        w = pd.DataFrame({'data': self.write_times})
-        r = pd.DataFrame({'data': self.read_times})
+                    worker.clear()
 
-        if self.csv:
-            self.__generate_csv()
+                conn.send({'error': None, 'buffers': buffers})
 
-        write_metrics = self.__compute_descriptive_stats(w)
-        read_metrics = self.__compute_descriptive_stats(r)
+        except BaseException as error:
 
-        rolling_avg_range = self.trials / 10
+            conn.send({'error': repr(error)})
 
-        writes_rolling_avg = self.__compute_rolling_avg(w, rolling_avg_range)
-        reads_rolling_avg = self.__compute_rolling_avg(r, rolling_avg_range)
+    def __create_pool(self, first_worker_id=0):
+        """ Creates this process's pool of workers, each with its own client.
+        With `--concurrency`, each worker is instead one in-flight slot of the
+        asyncio runner.  All slots share one client if the DB module
+        implements the async functions of `BenchmarkDatabase`, and otherwise
+        share a few blocking clients, which the runner's thread pool takes
+        turns with.
 
-        write_metrics.update(rolling_avg=writes_rolling_avg)
-        read_metrics.update(rolling_avg=reads_rolling_avg)
+        :param int first_worker_id: the id of the first worker in the pool
+        """
 
-        normalized_writes = self.__normalize_data(
-            w,
-            write_metrics.get('avg'),
-            write_metrics.get('stdev'),
+        # The clients kept from the last run of a sweep may still hold the
+        # locks of its reads, which would block the reset of the others
+        for client in self.clients or []:
+
+            end_transaction = getattr(client, 'end_transaction', None)
+
+            if end_transaction:
+                end_transaction()
+
+        if self.concurrency:
+
+            from async_runner import AsyncRunner, supports_async
+
+            self.runner = AsyncRunner(self)
+
+            # Made without connecting, to check which functions it has
+            client = self.module[0].Benchmark(
+                self.collection, setup=False, trials=self.trials
+            )
+
+            # A workload that updates entries also needs async_update()
+            updates = bool(
+                self.mix and (self.mix.get('update') or self.mix.get('rmw'))
+            )
+
+            if supports_async(client, updates):
+
+                self.runner.setup(client, self.collection)
+
+                for worker_id in range(self.pool_size):
+
+                    worker = Worker(
+                        first_worker_id + worker_id, client, self.precision,
+                        self.raw_capacity,
+                    )
+                    self.pool.append(worker)
+
+                self.database_client = client
+
+                return
+
+            # The blocking clients are bounded by the thread pool that runs
+            # them, not by the number of operations in flight, and the
+            # client made for the check is the first of them
+            unset_clients = [client] + [None] * (
+                min(self.concurrency, self.executor_clients) - 1
+            )
+
+            clients = [
+                self.__create_client(position, unset_client)
+                for position, unset_client in enumerate(unset_clients)
+            ]
+
+            self.runner.share(clients)
+
+            for worker_id in range(self.pool_size):
+
+                worker = Worker(
+                    first_worker_id + worker_id,
+                    clients[worker_id % len(clients)],
+                    self.precision,
+                    self.raw_capacity,
+                )
+                self.pool.append(worker)
+
+            self.database_client = clients[0]
+
+            return
+
+        for worker_id in range(self.pool_size):
+
+            client = self.__create_client(worker_id)
+
+            worker = Worker(
+                first_worker_id + worker_id, client, self.precision,
+                self.raw_capacity,
+            )
+            self.pool.append(worker)
+
+        self.database_client = self.pool[0].client
+
+    def __start_processes(self):
+        """ Forks the worker processes and waits for all of them to finish
+        setting up.  The parent keeps an empty `Worker` for every worker in
+        every process to collect the latencies that are sent back.
+        """
+
+        setup_lock = multiprocessing.Lock()
+
+        for process_id in range(self.processes):
+
+            parent_conn, child_conn = multiprocessing.Pipe()
+
+            process = multiprocessing.Process(
+                target=serve_process,
+                args=(self.options, process_id, setup_lock, child_conn),
+            )
+            process.daemon = True
+            process.start()
+
+            self.process_pool.append((process, parent_conn))
+
+        for process, conn in self.process_pool:
+
+            message = self.__receive(conn)
+
+            self.payload_stats = message.get('payload_stats')
+
+        self.pool = [
+            Worker(worker_id, None, self.precision, self.raw_capacity)
+            for worker_id in range(self.stride)
+        ]
+
+    def __stop_processes(self):
+        """ Tells every worker process to exit and waits for it to do so """
+
+        for process, conn in self.process_pool:
+
+            conn.send(None)
+            process.join()
+
+        self.process_pool = []
+
+    def __run_phase(self, phase):
+        """ Runs one phase of the benchmark ('writes', 'reads' or 'total' for
+        alternating writes and reads), either with the local pool of workers
+        or across all of the worker processes.
+
+        :param str phase: the phase to run
+
+        :return float elapsed: the wall-clock time taken by the phase
+        """
+
+        self.phase = phase
+
+        if self.process_pool:
+
+            return self.__run_processes(phase)
+
+        if phase == 'preload':
+
+            return self.__preload_pool()
+
+        count = self.operations if phase == 'mixed' else self.trials
+
+        watcher = self.__start_window_watcher(phase)
+
+        if self.runner:
+
+            batches = [
+                (worker, self.worker_batches(worker, count))
+                for worker in self.pool
+            ]
+
+            elapsed = self.runner.run(phase, batches)
+
+        else:
+
+            targets = {
+                'writes': self.__write_all,
+                'reads': self.__read_all,
+                'total': self.__alternate,
+                'mixed': self.__mixed_all,
+            }
+
+            elapsed = self.__run_pool(targets[phase])
+
+        self.__stop_window_watcher(watcher)
+
+        return elapsed
+
+    def __preload_pool(self):
+        """ Preloads every trial with the client of the first worker.  With
+        `--processes`, only the first process loads them, since every
+        process shares the same DB.
+
+        :return float elapsed: the wall-clock time taken by the load
+        """
+
+        start_time = clock_ns()
+
+        if self.pool[0].worker_id == 0:
+
+            self.pool[0].client.preload(self.trials, self.build_entry)
+
+        return to_seconds(clock_ns() - start_time)
+
+    def __start_window_watcher(self, phase):
+        """ With `--window`, starts a thread that hands the latencies of each
+        window over to be written while the phase runs
+
+        :param str phase: the phase being run
+
+        :return tup watcher: the thread and the event that stops it, or None
+        """
+
+        if not self.window:
+
+            return None
+
+        stop = threading.Event()
+
+        thread = threading.Thread(
+            target=self.__watch_windows, args=(phase, stop),
+        )
+        thread.daemon = True
+        thread.start()
+
+        return thread, stop
+
+    def __stop_window_watcher(self, watcher):
+        """ Stops the window thread, which hands over the last (partial)
+        window before it exits
+
+        :param tup watcher: the thread and the event that stops it
+        """
+
+        if not watcher:
+
+            return
+
+        thread, stop = watcher
+
+        stop.set()
+        thread.join()
+
+        if self.windows:
+
+            self.windows.flush()
+
+    def __watch_windows(self, phase, stop):
+        """ The window thread, which wakes at the end of every window and
+        hands over the latencies recorded by the pool since the last one
+
+        :param str phase: the phase being run
+        :param Event stop: set once the phase has finished
+        """
+
+        interval = int(self.window * NANOSECONDS)
+
+        start_time = clock_ns()
+
+        index = 0
+
+        while True:
+
+            window_start = start_time + index * interval
+
+            stopped = stop.wait(
+                max(to_seconds(window_start + interval - clock_ns()), 0)
+            )
+
+            samples = {}
+
+            for worker in self.pool:
+
+                with worker.window_lock:
+
+                    worker_samples, worker.window_samples = \
+                        worker.window_samples, {}
+
+                for name, latencies in worker_samples.items():
+
+                    samples.setdefault(name, []).extend(latencies)
+
+            self.__publish_window(
+                phase, index,
+                to_seconds(window_start - start_time),
+                to_seconds(clock_ns() - window_start),
+                samples,
+            )
+
+            if stopped:
+
+                return
+
+            index += 1
+
+    def __publish_window(self, phase, index, start, length, samples):
+        """ Hands the latencies of a window over to be written, or, in a
+        worker process, sends them to the parent to be written
+
+        :param str phase: the phase the window belongs to
+        :param int index: the position of the window in the phase
+        :param float start: the start of the window in seconds
+        :param float length: the length of the window in seconds
+        :param dict samples: the latencies of each buffer
+        """
+
+        if self.conn:
+
+            samples = dict(
+                (name, array.array(LATENCY_TYPECODE, latencies))
+                for name, latencies in samples.items()
+            )
+
+            self.conn.send({
+                'error': None,
+                'window': (phase, index, start, length, samples),
+            })
+
+        else:
+
+            self.windows.add(phase, index, start, length, samples)
+
+    def __run_processes(self, phase):
+        """ Runs a phase in every worker process at once and collects the
+        latencies each process sends back.
+
+        :param str phase: the phase to run
+
+        :return float elapsed: the wall-clock time taken by all processes
+        """
+
+        start_time = clock_ns()
+
+        for process, conn in self.process_pool:
+
+            conn.send(phase)
+
+        for message in self.__receive_phase():
+
+            for worker_id, raw_log, histograms, warmup_counts in \
+                    message['buffers']:
+
+                worker = self.pool[worker_id]
+
+                for name, count in warmup_counts.items():
+
+                    worker.warmup_counts[name] = \
+                        worker.warmup_counts.get(name, 0) + count
+
+                worker.raw_log.merge(raw_log)
+
+                for name, histogram in histograms.items():
+
+                    worker.histograms[name].merge(histogram)
+
+        elapsed = to_seconds(clock_ns() - start_time)
+
+        if self.windows:
+
+            self.windows.flush()
+
+        return elapsed
+
+    def __receive_phase(self):
+        """ Waits for every worker process to finish a phase.  Until then,
+        the windows sent by every process are written as they arrive.
+
+        :return generator messages: the final message of each process
+        """
+
+        pending = list(self.process_pool)
+
+        while pending:
+
+            for process, conn in list(pending):
+
+                if not conn.poll(0.01):
+
+                    continue
+
+                message = self.__receive(conn)
+
+                if 'window' in message:
+
+                    self.windows.add(*message['window'])
+
+                    continue
+
+                pending.remove((process, conn))
+
+                yield message
+
+    @staticmethod
+    def __receive(conn):
+        """ Receives a message from a worker process, exiting if the process
+        reported an error or died.
+
+        :param Connection conn: the pipe to the worker process
+
+        :return dict message: the message sent by the worker process
+        """
+
+        try:
+
+            message = conn.recv()
+
+        except EOFError:
+
+            message = {'error': 'process exited unexpectedly'}
+
+        if message.get('error'):
+
+            error = 'Error! Worker process failed: {error}'.format(
+                error=message.get('error'),
+            )
+
+            exit(error)
+
+        return message
+
+    def __alternate(self, worker):
+        """ Alternates writes and reads for every index handled by a worker
+
+        :param Worker worker: the worker issuing the operations
+        """
+
+        for batch in self.worker_batches(worker):
+
+            entries = self.batch_entries(batch)
+
+            intended_start = self.__pace(worker, 2 * batch[0])
+
+            self.__write_batch(entries, worker, intended_start)
+
+            if self.options.get('-s'):
+                time.sleep(1/20)
+
+            intended_start = self.__pace(worker, 2 * batch[0] + 1)
+
+            self.__read_batch(batch, worker, intended_start)
+
+        self.commit_writes(worker)
+
+    def __write_all(self, worker):
+        """ Writes a new entry for every index handled by a worker
+
+        :param Worker worker: the worker issuing the writes
+        """
+
+        for batch in self.worker_batches(worker):
+
+            entries = self.batch_entries(batch)
+
+            intended_start = self.__pace(worker, batch[0])
+
+            self.__write_batch(entries, worker, intended_start)
+
+            if self.options.get('-s'):
+                time.sleep(1/20)
+
+        self.commit_writes(worker)
+
+    def __read_all(self, worker):
+        """ Reads back every index handled by a worker
+
+        :param Worker worker: the worker issuing the reads
+        """
+
+        for batch in self.worker_batches(worker):
+
+            intended_start = self.__pace(worker, batch[0])
+
+            self.__read_batch(self.batch_indexes(batch), worker, intended_start)
+
+            if self.options.get('-s'):
+                time.sleep(1/20)
+
+    def __mixed_all(self, worker):
+        """ Runs every operation of the workload handled by a worker
+
+        :param Worker worker: the worker issuing the operations
+        """
+
+        for batch in self.worker_batches(worker, self.operations):
+
+            for sequence in batch:
+
+                intended_start = self.__pace(worker, sequence)
+
+                self.mixed_operation(sequence, worker, intended_start)
+
+                if self.options.get('-s'):
+                    time.sleep(1/20)
+
+        self.commit_writes(worker)
+
+    def __write_batch(self, entries, worker, intended_start):
+        """ Writes a batch of entries, as a single write unless `--batch-size`
+        was given
+
+        :param list entries: the entries to be written to the DB
+        :param Worker worker: the worker issuing the write
+        :param int intended_start: the intended start time in open-loop mode
+        """
+
+        if self.batch_size == 1:
+
+            self.write(entries[0], worker, intended_start)
+
+        else:
+
+            self.write_many(entries, worker, intended_start)
+
+    def __read_batch(self, indexes, worker, intended_start):
+        """ Reads a batch of indexes, as a single read unless `--batch-size`
+        was given
+
+        :param list indexes: the indexes to be read from the DB
+        :param Worker worker: the worker issuing the read
+        :param int intended_start: the intended start time in open-loop mode
+        """
+
+        if self.batch_size == 1:
+
+            self.read(indexes[0], worker, intended_start)
+
+        else:
+
+            self.read_many(indexes, worker, intended_start)
+
+    def batch_entries(self, batch):
+        """ Builds the pre-generated entry for every index of a batch
+
+        :param list batch: the indexes of the batch
+
+        :return list entries: the entries to be written
+        """
+
+        entries = [self.build_entry(index) for index in batch]
+
+        return entries
+
+    def build_entry(self, index):
+        """ Builds the pre-generated entry of an index
+
+        :param int index: the index of the entry
+
+        :return dict entry: the entry, with its index
+        """
+
+        entry = self.payloads.entry(index)
+        entry.update(Index=index)
+
+        return entry
+
+    def batch_indexes(self, batch):
+        """ Picks the indexes to read for a batch, which in random mode are
+        the keys drawn from the key distribution.  With `--duration`, indexes
+        past the end of the trials wrap back around.
+
+        :param list batch: the indexes of the batch
+
+        :return list indexes: the indexes to be read
+        """
+
+        if not self.random:
+
+            return [index % self.trials for index in batch]
+
+        return [int(self.read_keys[index % self.trials]) for index in batch]
+
+    def worker_batches(self, worker, count=None):
+        """ Splits the indexes handled by a worker into batches of
+        `--batch-size` indexes each.  In open-loop mode each batch is paced by
+        its first index.
+
+        :param Worker worker: the worker to retrieve the batches for
+        :param int count: the number of indexes to share out, which defaults
+                    to the number of trials
+
+        :return generator batches: the lists of indexes for this worker
+        """
+
+        batch = []
+
+        for index in self.__worker_indexes(worker, count):
+
+            batch.append(index)
+
+            if len(batch) == self.batch_size:
+
+                yield batch
+
+                batch = []
+
+        if batch:
+
+            yield batch
+
+    def __worker_indexes(self, worker, count=None):
+        """ Workers share the key space by striding through it, so worker `i`
+        of `n` handles indexes `i, i + n, i + 2n, ...`.  Only the first worker
+        draws a progress bar.
+
+        :param Worker worker: the worker to retrieve the indexes for
+        :param int count: the number of indexes to share out, which defaults
+                    to the number of trials
+
+        :return indexes: the iterable of indexes for this worker
+        """
+
+        count = count or self.trials
+
+        if self.phase_deadline:
+
+            return self.__timed_indexes(worker)
+
+        indexes = list(range(worker.worker_id, count, self.stride))
+
+        if worker.worker_id == 0:
+
+            indexes = progress.bar(indexes)
+
+        return indexes
+
+    def __timed_indexes(self, worker):
+        """ With `--duration`, a worker keeps striding on past the end of the
+        trials until the phase deadline.  The indexes are wrapped back onto
+        the trials (or the workload) when they are used.
+
+        :param Worker worker: the worker to retrieve the indexes for
+
+        :return generator indexes: the indexes for this worker
+        """
+
+        index = worker.worker_id
+
+        while clock_ns() < self.phase_deadline:
+
+            yield index
+
+            index += self.stride
+
+    def start_schedule(self):
+        """ Marks the start of a phase for the open-loop schedule of every
+        worker in the pool
+        """
+
+        self.phase_start_time = clock_ns()
+
+        self.phase_operations = 0
+
+        # Only the reads, or the operations of a workload, run for a duration
+        self.phase_deadline = None
+
+        if self.duration and self.phase in ['reads', 'mixed']:
+
+            self.phase_deadline = (
+                self.phase_start_time + int(self.duration * NANOSECONDS)
+            )
+
+        for worker in self.pool:
+
+            worker.intended_start = self.phase_start_time
+            worker.phase_operations = 0
+
+    def next_start_time(self, worker, sequence):
+        """ Computes when the next operation of a worker is meant to start in
+        open-loop mode.  On a fixed schedule, the `n`th operation of a phase
+        starts exactly `n / rate` seconds into the phase.  On a poisson
+        schedule, each of the `stride` workers draws exponential gaps at its
+        share of the rate, which together form a poisson process at the full
+        rate.
+
+        :param Worker worker: the worker issuing the operation
+        :param int sequence: the position of the operation in the phase
+
+        :return int intended_start: the intended start time in ns
+        """
+
+        if self.arrival == 'poisson':
+
+            worker_rate = self.rate / self.stride
+            gap = random.expovariate(worker_rate) * NANOSECONDS
+
+            worker.intended_start += int(gap)
+
+        else:
+
+            offset = sequence * NANOSECONDS / self.rate
+
+            worker.intended_start = self.phase_start_time + int(offset)
+
+        return worker.intended_start
+
+    def __pace(self, worker, sequence):
+        """ In open-loop mode, waits for the intended start time of the next
+        operation of a worker.  If the worker has fallen behind, the operation
+        is issued straight away, and the time it spent queued is included in
+        its corrected latency.
+
+        :param Worker worker: the worker issuing the operation
+        :param int sequence: the position of the operation in the phase
+
+        :return int intended_start: the intended start time in ns, or None if
+                    not in open-loop mode
+        """
+
+        if not self.rate:
+
+            return None
+
+        intended_start = self.next_start_time(worker, sequence)
+
+        delay = intended_start - clock_ns()
+
+        if delay > 0:
+            time.sleep(to_seconds(delay))
+
+        return intended_start
+
+    def __run_pool(self, target):
+        """ Runs `target` once for every worker in the pool, each in its own
+        thread, and waits for all of them to finish.  A pool of one simply
+        runs in the main thread.
+
+        :param target: a function which takes a single `Worker` argument
+
+        :return float elapsed: the wall-clock time taken by the whole pool
+        """
+
+        self.start_schedule()
+
+        start_time = self.phase_start_time
+
+        if len(self.pool) == 1:
+
+            target(self.pool[0])
+
+        else:
+
+            threads = [
+                threading.Thread(target=self.__guard, args=(target, worker))
+                for worker in self.pool
+            ]
+
+            for thread in threads:
+                thread.start()
+
+            for thread in threads:
+                thread.join()
+
+        elapsed = to_seconds(clock_ns() - start_time)
+
+        for worker in self.pool:
+
+            if worker.error:
+
+                error = 'Error! Worker {id} failed: {error}'.format(
+                    id=worker.worker_id,
+                    error=worker.error,
+                )
+
+                exit(error)
+
+        return elapsed
+
+    @staticmethod
+    def __guard(target, worker):
+        """ Runs a worker's target, catching any exception so that it can be
+        reported from the main thread once the pool has finished.
+
+        :param target: the function to run
+        :param Worker worker: the worker to run it with
+        """
+
+        try:
+
+            target(worker)
+
+        except Exception as error:
+
+            worker.error = error
+
+    def write(self, entry, worker=None, intended_start=None):
+        """ This function handles all DB write commands and times that action.
+        It takes a single parameter ('entry'), which is the data to
+        be written to the DB.
+
+        :param dict entry: The entry to be recorded to the DB
+        :param Worker worker: The worker whose client and buffers should be
+                    used.  Defaults to the primary client.
+        :param int intended_start: The time (in ns) the write was scheduled to
+                    start at in open-loop mode
+        """
+
+        if worker:
+
+            client = worker.client
+            buffers = worker
+
+        else:
+
+            client = self.database_client
+            buffers = self
+
+        write_start_time = clock_ns()
+
+        client.write(entry)
+
+        write_stop_time = clock_ns()
+
+        write_time = self.record_operation(
+            buffers, 'write', write_start_time, write_stop_time, intended_start,
+            keys=[entry['Index']],
+        )
+
+        if self.really_verbose:
+
+            self.__print_operation('write', write_time)
+
+        self.__count_writes(buffers)
+
+    def read(self, index, worker=None, intended_start=None):
+        """ This function handles all DB read commands, and times that action.
+        It takes a single parameter, which is the index of an entry
+        to retrieve from the DB.
+
+        :param int index: The index of the item to be retrieved from the DB
+        :param Worker worker: The worker whose client and buffers should be
+                    used.  Defaults to the primary client.
+        :param int intended_start: The time (in ns) the read was scheduled to
+                    start at in open-loop mode
+        """
+
+        if worker:
+
+            client = worker.client
+            buffers = worker
+
+        else:
+
+            client = self.database_client
+            buffers = self
+
+        read_start_time = clock_ns()
+
+        read_entry = client.read(index)
+
+        read_stop_time = clock_ns()
+
+        read_time = self.record_operation(
+            buffers, 'read', read_start_time, read_stop_time, intended_start,
+            keys=[index],
+        )
+
+        if self.verbose or self.really_verbose:
+
+            self.__print_operation('read', read_time, read_entry)
+
+    def write_many(self, entries, worker=None, intended_start=None):
+        """ This function handles all batched DB write commands, and times
+        each batch as a whole with the `write_many()` function of the module.
+
+        :param list entries: The entries to be recorded to the DB
+        :param Worker worker: The worker whose client and buffers should be
+                    used.  Defaults to the primary client.
+        :param int intended_start: The time (in ns) the batch was scheduled to
+                    start at in open-loop mode
+        """
+
+        if worker:
+
+            client = worker.client
+            buffers = worker
+
+        else:
+
+            client = self.database_client
+            buffers = self
+
+        write_start_time = clock_ns()
+
+        client.write_many(entries)
+
+        write_stop_time = clock_ns()
+
+        write_time = self.record_operation(
+            buffers, 'write', write_start_time, write_stop_time,
+            intended_start, batch_size=len(entries),
+            keys=[entry['Index'] for entry in entries],
+        )
+
+        if self.really_verbose:
+
+            self.__print_operation('write', write_time)
+
+        self.__count_writes(buffers, len(entries))
+
+    def read_many(self, indexes, worker=None, intended_start=None):
+        """ This function handles all batched DB read commands, and times
+        each batch as a whole with the `read_many()` function of the module.
+
+        :param list indexes: The indexes of the items to be retrieved
+        :param Worker worker: The worker whose client and buffers should be
+                    used.  Defaults to the primary client.
+        :param int intended_start: The time (in ns) the batch was scheduled to
+                    start at in open-loop mode
+        """
+
+        if worker:
+
+            client = worker.client
+            buffers = worker
+
+        else:
+
+            client = self.database_client
+            buffers = self
+
+        read_start_time = clock_ns()
+
+        read_entries = client.read_many(indexes)
+
+        read_stop_time = clock_ns()
+
+        read_time = self.record_operation(
+            buffers, 'read', read_start_time, read_stop_time,
+            intended_start, batch_size=len(indexes), keys=list(indexes),
+        )
+
+        if self.verbose or self.really_verbose:
+
+            self.__print_operation('read', read_time, read_entries)
+
+    def mixed_operation(self, sequence, worker=None, intended_start=None):
+        """ This function handles every operation of a mixed workload, and
+        times that action.  The operation and the entry it acts on are looked
+        up from the workload.
+
+        :param int sequence: The position of the operation in the workload
+        :param Worker worker: The worker whose client and buffers should be
+                    used.  Defaults to the primary client.
+        :param int intended_start: The time (in ns) the operation was
+                    scheduled to start at in open-loop mode
+        """
+
+        if worker:
+
+            client = worker.client
+            buffers = worker
+
+        else:
+
+            client = self.database_client
+            buffers = self
+
+        operation_start_time = clock_ns()
+
+        operation, result = self.workload_call(client, sequence)
+
+        operation_stop_time = clock_ns()
+
+        operation_time = self.record_operation(
+            buffers, operation, operation_start_time, operation_stop_time,
+            intended_start, keys=[self.workload.operation(sequence)[1]],
+        )
+
+        if self.really_verbose:
+
+            self.__print_operation(operation, operation_time, result)
+
+        if operation in WRITE_OPERATIONS:
+
+            self.__count_writes(buffers)
+
+    def commit_writes(self, buffers):
+        """ This function commits the writes a worker has left uncommitted
+        with `--commit-every`, with the `commit_pending()` function of the
+        module, and times the commit as its own operation.
+
+        :param buffers: The `Worker` (or `Benchmark`) whose writes should be
+                    committed
+        """
+
+        if not buffers.pending_writes:
+
+            return
+
+        client = getattr(buffers, 'client', None) or self.database_client
+
+        commit_start_time = clock_ns()
+
+        client.commit_pending()
+
+        commit_stop_time = clock_ns()
+
+        buffers.pending_writes = 0
+
+        latency = commit_stop_time - commit_start_time
+
+        if self.subtract_overhead and self.timer_overhead:
+
+            latency = max(latency - self.timer_overhead, 0)
+
+        self.record_latency(
+            buffers, 'commit_times', latency,
+            warmup=self.__in_warmup(buffers, commit_start_time),
+        )
+
+        if self.really_verbose:
+
+            self.__print_operation('commit', latency)
+
+    def __count_writes(self, buffers, count=1):
+        """ Counts the writes a worker has left uncommitted with
+        `--commit-every`, and commits them once there are enough of them
+
+        :param buffers: the `Worker` (or `Benchmark`) that issued the writes
+        :param int count: the number of entries that were written
+        """
+
+        if self.commit_every == 1:
+
+            return
+
+        buffers.pending_writes += count
+
+        if buffers.pending_writes >= self.commit_every:
+
+            self.commit_writes(buffers)
+
+    def workload_call(self, client, sequence):
+        """ Issues one operation of the workload on a DB client, untimed
+
+        :param client: the `Benchmark` instance of the DB module
+        :param int sequence: the position of the operation in the workload
+
+        :return tup operation: the name of the operation and what it returned
+        """
+
+        operation, index, scan_length = self.workload.operation(sequence)
+
+        result = None
+
+        if operation == 'read':
+
+            result = client.read(index)
+
+        elif operation == 'update':
+
+            client.update(index, self.payloads.entry(sequence))
+
+        elif operation == 'insert':
+
+            entry = self.payloads.entry(index)
+            entry.update(Index=index)
+
+            client.write(entry)
+
+        elif operation == 'scan':
+
+            result = client.scan(index, scan_length)
+
+        else:
+
+            result = client.read(index)
+
+            client.update(index, self.payloads.entry(sequence))
+
+        return operation, result
+
+    def __print_operation(self, operation, latency, read_entry=None):
+        """ Prints the verbose output for a single operation.  This is only
+        called once the operation has been timed and recorded.
+
+        :param str operation: the operation, e.g. 'write' or 'read'
+        :param int latency: the latency of the operation in ns
+        :param read_entry: the entry retrieved by a read
+        """
+
+        if operation != 'read':
+
+            print('{operation} time: {time}'.format(
+                operation=operation.capitalize(),
+                time=to_seconds(latency),
+            ))
+
+            return
+
+        read_msg = 'Read data: {data}'.format(data=read_entry)
+
+        if self.really_verbose:
+
+            read_msg += '\nRead time: {time}'.format(time=to_seconds(latency))
+
+            read_msg += '\n--------------------------'
+
+        print(read_msg)
+
+    def record_operation(self, buffers, operation, start_time, stop_time,
+                         intended_start=None, batch_size=None, keys=None):
+        """ Records the latency of a single timed operation.  With
+        `--subtract-overhead`, the calibrated overhead of the timing code is
+        taken off first.  In open-loop mode, the latency from the intended
+        start time is recorded to the corrected buffers as well.  For a batch,
+        the latency of the whole batch is recorded on its own, and every entry
+        of the batch is recorded with an equal share of it.  Unless `--no-raw`
+        was given, a row for every entry is added to the raw data.
+
+        :param buffers: the `Worker` (or `Benchmark`) holding the buffers
+        :param str operation: the operation, e.g. 'write' or 'read'
+        :param int start_time: the time (in ns) the operation was sent
+        :param int stop_time: the time (in ns) the operation completed
+        :param int intended_start: the time (in ns) the operation was
+                    scheduled to start at in open-loop mode
+        :param int batch_size: the number of entries in a batched operation
+        :param list keys: the index of every entry the operation acted on
+
+        :return int latency: the recorded latency in ns
+        """
+
+        latency = stop_time - start_time
+
+        if self.subtract_overhead and self.timer_overhead:
+
+            latency = max(latency - self.timer_overhead, 0)
+
+        count = batch_size or 1
+
+        warmup = self.__in_warmup(buffers, start_time)
+
+        buffers.phase_operations += count
+
+        if batch_size and not warmup:
+
+            buffers.histograms[operation + '_batch_times'].record(latency)
+
+        self.record_latency(
+            buffers, operation + '_times', latency // count, count, warmup
+        )
+
+        corrected_latency = -1
+
+        if intended_start is not None:
+
+            corrected_latency = (stop_time - intended_start) // count
+
+            self.record_latency(
+                buffers, operation + '_times_corrected',
+                corrected_latency, count, warmup,
+            )
+
+        if self.raw:
+
+            self.__record_raw(
+                buffers, operation, start_time, latency // count,
+                corrected_latency, keys or [-1] * count, warmup,
+            )
+
+        return latency
+
+    def __record_raw(self, buffers, operation, start_time, latency,
+                     corrected_latency, keys, warmup):
+        """ Adds a row to the raw data for every entry of an operation.  The
+        node of each entry is looked up with the `node_select()` function of
+        the DB module, if it has one.
+
+        :param buffers: the `Worker` (or `Benchmark`) holding the raw data
+        :param str operation: the operation, e.g. 'write' or 'read'
+        :param int start_time: the time (in ns) the operation was sent
+        :param int latency: the latency of each entry in ns
+        :param int corrected_latency: the latency (in ns) of each entry from
+                    the intended start time, or -1 if there is none
+        :param list keys: the index of every entry
+        :param bool warmup: True if the operation is part of a warmup
+        """
+
+        client = getattr(buffers, 'client', None) or self.database_client
+
+        node_select = getattr(client, 'node_select', None)
+
+        for key in keys:
+
+            node = -1
+
+            if node_select and key >= 0:
+
+                node = node_select(key)
+
+            buffers.raw_log.append(
+                operation, start_time, latency, corrected_latency, key, node,
+                warmup,
+            )
+
+    def __in_warmup(self, buffers, start_time):
+        """ Checks whether an operation is part of the warmup at the start of
+        its phase.  A warmup of `n` operations is shared out evenly between
+        the workers, so each worker warms up with its first `n / stride`.
+
+        :param buffers: the `Worker` (or `Benchmark`) issuing the operation
+        :param int start_time: the time (in ns) the operation was sent
+
+        :return bool warmup: True if the operation is part of the warmup
+        """
+
+        if self.warmup_seconds is not None and self.phase_start_time:
+
+            elapsed = to_seconds(start_time - self.phase_start_time)
+
+            return elapsed < self.warmup_seconds
+
+        if self.warmup_count is not None:
+
+            return buffers.phase_operations < self.warmup_count / self.stride
+
+        return False
+
+    def record_latency(self, buffers, buffer_name, latency, count=1,
+                       warmup=False):
+        """ Records a latency into a histogram, and into the current window
+        with `--window`.  Warmup latencies are only counted, and are left out
+        of the windows (they are still kept in the raw data, flagged as
+        warmup, so that they can be plotted).
+
+        :param buffers: the `Worker` (or `Benchmark`) holding the buffers
+        :param str buffer_name: the buffer to record to, e.g. 'write_times'
+        :param int latency: the latency in ns
+        :param int count: the number of operations with this latency
+        :param bool warmup: True if the operations are part of a warmup
+        """
+
+        latency = int(latency)
+
+        if self.window and not warmup:
+
+            with buffers.window_lock:
+
+                buffers.window_samples.setdefault(buffer_name, []).extend(
+                    [latency] * count
+                )
+
+        if warmup:
+
+            buffers.warmup_counts[buffer_name] = \
+                buffers.warmup_counts.get(buffer_name, 0) + count
+
+        else:
+
+            buffers.histograms[buffer_name].record(latency, count)
+
+    def compile_data(self):
+        """ This function takes all the data collected from the trials (read
+        and write times) and then calculates some important statistics about
+        said data.  Without altering functionality, a report will be generated
+        upon completion of analysis.
+
+        :return dict compiled_data: dict containing all read and w
+        """
+
+        if self.pool:
+
+            for histogram_name in Worker.HISTOGRAMS:
+
+                histogram = LatencyHistogram(self.precision)
+
+                for worker in self.pool:
+
+                    histogram.merge(worker.histograms[histogram_name])
+
+                self.histograms[histogram_name] = histogram
+
+                self.warmup_counts[histogram_name] = sum(
+                    worker.warmup_counts.get(histogram_name, 0)
+                    for worker in self.pool
+                )
+
+        if self.raw:
+
+            self.__write_raw_data()
+
+        if self.auto_warmup:
+
+            self.__detect_warmup()
+
+        if self.warmup_counts and not any(
+                self.histograms[name].total_count for name in Worker.HISTOGRAMS
+        ):
+
+            exit('Error! Every operation was part of the warmup, try a '
+                 'shorter --warmup!')
+
+        write_histogram = self.histograms['write_times']
+        read_histogram = self.histograms['read_times']
+
+        if self.csv:
+            export_csv(
+                self.raw_data,
+                '{parent_dir}/raw_data.csv'.format(parent_dir=self.reports_dir),
+                NANOSECONDS,
+            )
+
+        write_metrics = self.__compute_descriptive_stats(write_histogram)
+        read_metrics = self.__compute_descriptive_stats(read_histogram)
+
+        write_metrics.update(
+            throughput=self.__compute_throughput(write_histogram, 'writes')
+        )
+        # The reads of a workload run alongside its other operations
+        read_phase = 'mixed' if self.mix else 'reads'
+
+        read_metrics.update(
+            throughput=self.__compute_throughput(read_histogram, read_phase)
+        )
+
+        operation_metrics = [
+            ('writes', write_metrics),
+            ('reads', read_metrics),
+        ]
+
+        # Some workloads (e.g. YCSB E) have no reads at all
+        has_reads = not self.mix or bool(self.mix.get('read'))
+
+        if not has_reads:
+
+            operation_metrics.remove(('reads', read_metrics))
+
+        # Preloaded entries are not timed one by one
+        if self.preload:
+
+            operation_metrics.remove(('writes', write_metrics))
+
+        workload_rows = []
+
+        if self.mix:
+
+            workload_rows = [
+                (label, operation) for label, operation in WORKLOAD_LABELS
+                if self.mix.get(operation)
+            ]
+
+        for label, operation in workload_rows:
+
+            histogram = self.histograms[operation + '_times']
+
+            metrics = self.__compute_descriptive_stats(histogram)
+            metrics.update(
+                throughput=self.__compute_throughput(histogram, 'mixed')
+            )
+
+            operation_metrics.append((label, metrics))
+
+        if self.batch_size > 1:
+
+            for operation, phase in [('write', 'writes'), ('read', 'reads')]:
+
+                histogram = self.histograms[operation + '_batch_times']
+
+                batch_metrics = self.__compute_descriptive_stats(histogram)
+                batch_metrics.update(
+                    throughput=self.__compute_throughput(histogram, phase)
+                )
+
+                operation_metrics.append(
+                    (operation + ' batches', batch_metrics)
+                )
+
+        if self.commit_every > 1:
+
+            commit_histogram = self.histograms['commit_times']
+
+            commit_metrics = self.__compute_descriptive_stats(commit_histogram)
+
+            # Writes are committed in the load phase of a workload as well
+            commit_metrics.update(
+                throughput=self.__compute_throughput(
+                    commit_histogram, 'writes', 'mixed',
+                )
+            )
+
+            operation_metrics.append(('commits', commit_metrics))
+
+        rolling_avg_range = self.trials / 10
+
+        # Without the raw samples, there is no time series to analyze
+        self.n_stdev = None
+
+        time_series = bool(
+            self.raw and not self.headless and write_histogram.total_count and
+            read_histogram.total_count
         )
-        normalized_reads = self.__normalize_data(
-            r,
-            read_metrics.get('avg'),
-            read_metrics.get('stdev'),
+
+        if time_series:
+
+            import pandas as pd
+
+            # Built straight around the arrays, which are not copied again
+            w = pd.DataFrame(self.write_times / NANOSECONDS, columns=['data'])
+            r = pd.DataFrame(self.read_times / NANOSECONDS, columns=['data'])
+
+            writes_rolling_avg = self.__compute_rolling_avg(w, rolling_avg_range)
+            reads_rolling_avg = self.__compute_rolling_avg(r, rolling_avg_range)
+
+            write_metrics.update(rolling_avg=writes_rolling_avg)
+            read_metrics.update(rolling_avg=reads_rolling_avg)
+
+            # The plots leave the outliers out, so the number left out (and
+            # how many stdevs from the mean they were) is kept for the report
+            for dataframe, metrics in [(w, write_metrics), (r, read_metrics)]:
+
+                normalized_data = self.__normalize_data(
+                    dataframe,
+                    metrics.get('avg'),
+                    metrics.get('stdev'),
+                )
+
+                metrics.update(
+                    normalized_data=normalized_data,
+                    trimmed=len(dataframe) - len(normalized_data),
+                    n_stdev=self.n_stdev,
+                )
+
+            write_metrics.update(warmup_mask=self.__warmup_mask('write_times'))
+            read_metrics.update(warmup_mask=self.__warmup_mask('read_times'))
+
+        percentile_rows = []
+
+        if not self.preload:
+
+            percentile_rows.append(('writes', 'write_times'))
+
+        if has_reads:
+
+            percentile_rows.append(('reads', 'read_times'))
+
+        percentile_rows += [
+            (label, operation + '_times')
+            for label, operation in workload_rows
+        ]
+
+        if self.rate:
+
+            percentile_rows.append(
+                ('writes (corrected)', 'write_times_corrected')
+            )
+
+            if has_reads:
+
+                percentile_rows.append(
+                    ('reads (corrected)', 'read_times_corrected')
+                )
+
+            percentile_rows += [
+                (label + ' (corrected)', operation + '_times_corrected')
+                for label, operation in workload_rows
+            ]
+
+        if self.batch_size > 1:
+
+            percentile_rows += [
+                ('write batches', 'write_batch_times'),
+                ('read batches', 'read_batch_times'),
+            ]
+
+        if self.commit_every > 1:
+
+            percentile_rows.append(('commits', 'commit_times'))
+
+        percentiles = [
+            (operation, self.__compute_percentiles(self.histograms[name]))
+            for operation, name in percentile_rows
+        ]
+
+        # Every run is saved so that it can be the baseline of a later run
+        throughputs = dict(
+            (operation, metrics.get('throughput'))
+            for operation, metrics in operation_metrics
         )
 
-        write_metrics.update(normalized_data=normalized_writes)
-        read_metrics.update(normalized_data=normalized_reads)
+        save_results(self.reports_dir, self.histograms, throughputs)
+
+        baseline = None
+
+        if self.baseline:
+
+            baseline = find_regressions(
+                self.baseline,
+                self.histograms,
+                throughputs,
+                percentile_rows,
+                self.threshold,
+                resamples=self.bootstrap,
+                seed=self.seed,
+            )
+
+        # The nodes of the operations are only kept in the raw data
+        nodes = []
+
+        if self.raw:
+
+            nodes = node_stats(self.raw_data)
+
+            for stat in nodes:
+
+                for metric in ['mean', 'p50', 'p99']:
+
+                    stat[metric] = to_seconds(stat[metric])
 
         compiled_data = {
             'write_metrics': write_metrics,
             'read_metrics': read_metrics,
+            'operation_metrics': operation_metrics,
+            'percentiles': percentiles,
             'n_stdev': self.n_stdev,
             'rolling_avg_range': rolling_avg_range,
+            'time_series': time_series,
+            'baseline': baseline,
+            'nodes': nodes,
         }
 
         return compiled_data
 
+    @staticmethod
+    def __compute_percentiles(histogram):
+        """ Computes the latency percentiles shown in the report
+
+        :param LatencyHistogram histogram: the histogram of the latencies
+
+        :return list percentiles: the value of each of `PERCENTILES` in seconds
+        """
+
+        percentiles = [
+            to_seconds(value) for value in histogram.percentiles(PERCENTILES)
+        ]
+
+        return percentiles
+
+    def __write_raw_data(self):
+        """ Writes the raw data of every worker to the `raw_data` directory of
+        the report, and memory-maps it back for the analysis.  The latencies
+        of the writes and reads, and which of them were warmup, are taken from
+        the raw data in the order the operations were started.
+        """
+
+        logs = [self.raw_log] + [worker.raw_log for worker in self.pool]
+
+        self.raw_data = write_raw_data(
+            '{parent_dir}/raw_data'.format(parent_dir=self.reports_dir), logs
+        )
+
+        # The rows are on disk now, so the logs can be let go of
+        self.raw_log = RawLog()
+
+        for worker in self.pool:
+            worker.raw_log = RawLog()
+
+        columns = self.raw_data
+
+        for operation in ['write', 'read']:
+
+            rows = operation_rows(columns, operation)
+
+            buffer_name = operation + '_times'
+
+            setattr(self, buffer_name, columns['latency'][rows])
+
+            self.warmup_masks[buffer_name] = columns['warmup'][rows]
+
+            corrected = columns['corrected'][:0]
+
+            if self.rate:
+                corrected = columns['corrected'][rows]
+
+            setattr(self, buffer_name + '_corrected', corrected)
+
+    def __detect_warmup(self):
+        """ With `--warmup=auto`, finds where the merged write and read
+        latencies settle, and rebuilds their histograms without the warmup
+        before it.  The batch and workload histograms have no raw samples, so
+        they are left as they are.
+        """
+
+        for operation in ['write', 'read']:
+
+            latencies = getattr(self, operation + '_times')
+
+            warmup_count = steady_state_start(latencies)
+
+            self.warmup_masks[operation + '_times'] = (
+                np.arange(len(latencies)) < warmup_count
+            )
+
+            for buffer_name in [operation + '_times',
+                                operation + '_times_corrected']:
+
+                histogram = LatencyHistogram(self.precision)
+
+                buffer = getattr(self, buffer_name)
+
+                histogram.record_many(buffer[warmup_count:])
+
+                self.histograms[buffer_name] = histogram
+
+                self.warmup_counts[buffer_name] = min(warmup_count, len(buffer))
+
+    def __compute_throughput(self, histogram, *phases):
+        """ Computes the aggregate throughput of an operation across all
+        workers.  If no wall-clock time was recorded for the phases (e.g. in
+        debug mode), the operations are assumed to have run back to back.
+
+        :param LatencyHistogram histogram: the histogram of the latencies
+                    recorded for the operation
+        :param str phases: the phases the operation ran in ('writes' or
+                    'reads')
+
+        :return float throughput: the number of operations per second
+        """
+
+        elapsed = sum(self.elapsed.get(phase) or 0 for phase in phases) or \
+            self.elapsed.get('total')
+
+        if not elapsed:
+
+            elapsed = to_seconds(histogram.total)
+
+        if not elapsed:
+
+            return 0.0
+
+        throughput = histogram.total_count / elapsed
+
+        return throughput
+
+    def __preload_throughput(self):
+        """ :return float throughput: the number of entries preloaded per
+                    second, or None if they were not preloaded
+        """
+
+        if not self.elapsed.get('preload'):
+
+            return None
+
+        return self.trials / self.elapsed.get('preload')
+
+    def __warmup_mask(self, buffer_name):
+        """ :return ndarray mask: True for each raw latency of a buffer that
+                    was part of a warmup
+        """
+
+        latencies = getattr(self, buffer_name)
+
+        mask = self.warmup_masks.get(buffer_name)
+
+        if mask is None or len(mask) != len(latencies):
+
+            mask = np.zeros(len(latencies), dtype=bool)
+
+        return mask
+
     def __compute_rolling_avg(self, dataframe, rolling_range=None):
         """ Given a dataframe object, this function will compute a rolling
         average and return it as a separate dataframe object
@@ -415,6 +2753,8 @@ class Benchmark():
                     average data
         """
 
+        import pandas as pd
+
         if not rolling_range:
             rolling_range = self.trials / 10
 
@@ -425,20 +2765,6 @@ class Benchmark():
 
         return rolling_avg
 
-    def __generate_csv(self):
-        """ This function creates a new DataFrame object with the raw read and
-        write times and then writes it to a CSV file
-        """
-
-        raw_data = pd.DataFrame({
-            'reads': self.read_times,
-            'writes': self.write_times,
-        })
-
-        raw_data.to_csv('{parent_dir}/raw_data.csv'.format(
-            parent_dir=self.reports_dir
-        ))
-
     def __normalize_data(self, dataframe, average, stdev):
         """ This function takes a dataframe object and normalizes the data
         within, by removing outliers, which allows the plots to look a lot
@@ -491,6 +2817,15 @@ class Benchmark():
             compiled_data
         )
 
+        percentile_table, percentile_table_md = \
+            self.__generate_percentile_tables(compiled_data)
+
+        baseline_table, baseline_table_md = self.__generate_baseline_tables(
+            compiled_data
+        )
+
+        node_table, node_table_md = self.__generate_node_tables(compiled_data)
+
         if self.no_report:
 
             plots = {
@@ -511,15 +2846,100 @@ class Benchmark():
             'trial_number': self.trials,
             'param_table': param_table,
             'data_table': data_table,
+            'percentile_table': percentile_table,
             'param_table_md': param_table_md,
             'data_table_md': data_table_md,
+            'percentile_table_md': percentile_table_md,
+            'baseline_table': baseline_table,
+            'baseline_table_md': baseline_table_md,
+            'baseline_note': self.__generate_baseline_note(compiled_data),
+            'node_table': node_table,
+            'node_table_md': node_table_md,
+            'node_note': self.__generate_node_note(compiled_data),
+            'commit_note': self.__generate_commit_note(compiled_data),
             'speed_plot': plots.get('speed_plot'),
             'hist_plot': plots.get('hist_plot'),
             'avgs_plot': plots.get('avgs_plot'),
+            'trim_note': self.__generate_trim_note(compiled_data),
         }
 
         return report_data
 
+    def generate_summary(self, compiled_data):
+        """ Writes the parameters and results of the run to `summary.json` in
+        the report directory, for scripts and pipelines to read.  Unlike the
+        report, this needs none of the plotting or report libraries, so it is
+        all that is written with `--headless`.
+
+        :param dict compiled_data: The post-analysis data from the benchmarks
+        """
+
+        operations = {}
+
+        for operation, metrics in compiled_data.get('operation_metrics'):
+
+            operations[operation] = dict(
+                (metric, metrics.get(metric)) for metric in SUMMARY_METRICS
+            )
+
+        percentiles = dict(
+            (operation, dict(
+                ('p{percentile:g}'.format(percentile=percentile), value)
+                for percentile, value in zip(PERCENTILES, values)
+            ))
+            for operation, values in compiled_data.get('percentiles')
+        )
+
+        summary = {
+            'database': self.db_name,
+            'time_and_date': self.time_and_date,
+            'parameters': {
+                'trials': self.trials,
+                'entry_length': self.entry_length,
+                'min_length': self.min_length,
+                'nodes': self.number_of_nodes,
+                'processes': self.processes,
+                'workers': self.workers,
+                'concurrency': self.concurrency,
+                'batch_size': self.batch_size,
+                'commit_every': self.commit_every,
+                'preload': bool(self.preload),
+                'split': self.split,
+                'random': bool(self.random),
+                'distribution': self.distribution,
+                'workload': self.mix,
+                'operations': self.operations if self.mix else None,
+                'rate': self.rate,
+                'arrival': self.arrival,
+                'duration': self.duration,
+                'warmup': self.options.get('--warmup'),
+                'seed': self.seed,
+                'settings': dict(self.module_settings),
+                'raw': self.raw,
+                'precision': self.precision,
+            },
+            'elapsed': self.elapsed,
+            'preload_throughput': self.__preload_throughput(),
+            'timer_overhead': self.timer_overhead,
+            'peak_memory': peak_rss(),
+            'operations': operations,
+            'percentiles': percentiles,
+            'baseline': compiled_data.get('baseline'),
+            'nodes': compiled_data.get('nodes'),
+        }
+
+        summary_path = '{parent_dir}/summary.json'.format(
+            parent_dir=self.reports_dir,
+        )
+
+        with open(summary_path, 'w') as outfile:
+
+            json.dump(summary, outfile, indent=2, sort_keys=True)
+
+        if self.headless:
+
+            print('\nThe summary was written to {path}'.format(path=summary_path))
+
     def generate_report(self, report_data):
         """ This function will take the compiled data and generated a report
         from it.  A report file will also be saved in the `generated_reports`
@@ -561,111 +2981,264 @@ class Benchmark():
 
                 report = template.format(**report_data)
 
-                with open(report_name, 'w+') as outfile:
+                with open(report_name, 'w+') as outfile:
+
+                    outfile.write(report)
+
+    def generate_plots(self, plots):
+        """ This function draws the plots of the report in parallel, and saves
+        them to the images directory of the report.  See `plots.py` for how
+        each plot is described.
+
+        :param dict plots: the description of each plot, by the name it is
+                    saved under
+        """
+
+        for name, plot in plots.items():
+
+            plot.update(path='{parent_dir}/{name}.png'.format(
+                parent_dir=self.images_dir,
+                name=name,
+            ))
+
+        render_plots(list(plots.values()))
+
+    def __generate_all_plots(self, compiled_data):
+        """ This function coordinates the creation of all benchmarking plots
+        and then returns them
+
+        :param dict compiled_data: all of the compiled data from benchmarks
+
+        :return dict plots: the path for each plot created
+        """
+
+        cd = compiled_data
+
+        template = '![Alt text](images/{db}-{date}-{name}.png "{name}")'
+        img_template = template.format(
+            db=self.db_name,
+            date=self.report_date,
+            name='{name}'
+        )
+
+        plots = {
+            'speed_plot': img_template.format(name='rw'),
+            'hist_plot': img_template.format(name='stats'),
+            'avgs_plot': img_template.format(name='running_avg'),
+        }
+
+        img_name_template = '{db}-{date}-{name}'.format(
+            db=self.db_name,
+            date=self.report_date,
+            name='{name}'
+        )
+
+        if not cd.get('time_series'):
+
+            # Only the histogram can be drawn without the raw samples
+            plots.update(speed_plot=None, avgs_plot=None)
+
+            self.generate_plots({
+                img_name_template.format(name='stats'): {
+                    'bins': self.__bin_histograms(),
+                    'title': 'Histogram of Read and Write Times',
+                    'x_label': 'Value (s)',
+                    'y_label': 'Count',
+                },
+            })
+
+            return plots
+
+        write_metrics = cd.get('write_metrics')
+        read_metrics = cd.get('read_metrics')
+
+        trimmed = self.__describe_trimmed(cd)
+
+        trim_title = ''
+
+        if trimmed:
+
+            trim_title = '\n(outliers trimmed: {trimmed})'.format(
+                trimmed=trimmed,
+            )
+
+        rw = self.__split_warmup([
+            ('Writes', write_metrics.get('normalized_data').data,
+             write_metrics.get('warmup_mask')),
+            ('Reads', read_metrics.get('normalized_data').data,
+             read_metrics.get('warmup_mask')),
+        ])
+
+        avgs = self.__split_warmup([
+            ('Writes Average', write_metrics.get('rolling_avg').data,
+             write_metrics.get('warmup_mask')),
+            ('Reads Average', read_metrics.get('rolling_avg').data,
+             read_metrics.get('warmup_mask')),
+        ])
+
+        # The histogram leaves out the warmup, like the tables
+        bins = bin_counts([
+            (label, series.values) for label, series in rw
+            if label in ['Writes', 'Reads']
+        ])
+
+        self.generate_plots({
+            img_name_template.format(name='rw'): {
+                'lines': self.__downsample_lines(rw),
+                'title': 'Plot of Read and Write Speeds' + trim_title,
+                'x_label': 'Trial Number',
+                'y_label': 'Time (s)',
+            },
+            img_name_template.format(name='running_avg'): {
+                'lines': self.__downsample_lines(avgs),
+                'title': 'Plot of Rolling Averages for Reads and Writes',
+                'x_label': 'Trial Number',
+                'y_label': 'Time (s)',
+            },
+            img_name_template.format(name='stats'): {
+                'bins': bins,
+                'title': 'Histogram of Read and Write Times' + trim_title,
+                'x_label': 'Value (s)',
+            },
+        })
+
+        return plots
+
+    @staticmethod
+    def __downsample_lines(columns):
+        """ Downsamples every column of a time-series plot to a fixed number of
+        points, so that the plot takes the same time to draw (and looks the
+        same) at any number of trials
+
+        :param list columns: a `(label, series)` tuple for each column,
+                    indexed by trial number
+
+        :return list lines: a `(label, x, y)` tuple for each column
+        """
+
+        lines = []
+
+        for label, series in columns:
+
+            x, y = downsample(series.index.values, series.values)
+
+            lines.append((label, x, y))
+
+        return lines
+
+    @staticmethod
+    def __describe_trimmed(compiled_data):
+        """ Describes the outliers that were trimmed from the time-series
+        plots, e.g. `12 writes beyond 3 stdev, 4 reads beyond 2 stdev`
+
+        :param dict compiled_data: the compiled data from benchmarking
+
+        :return str description: the description, or None if no outliers
+                    were trimmed
+        """
+
+        parts = []
+
+        for label, name in [('writes', 'write_metrics'),
+                            ('reads', 'read_metrics')]:
+
+            metrics = compiled_data.get(name)
+
+            if metrics.get('trimmed'):
+
+                parts.append('{count} {label} beyond {n_stdev} stdev'.format(
+                    count=metrics.get('trimmed'),
+                    label=label,
+                    n_stdev=metrics.get('n_stdev'),
+                ))
+
+        return ', '.join(parts) or None
+
+    def __generate_trim_note(self, compiled_data):
+        """ :return str trim_note: the sentence of the report that says which
+                    outliers were left out of the plots
+        """
+
+        if self.preload:
+
+            return ('The entries were preloaded without timing each write, so '
+                    'there is no plot of the speeds over the run.')
+
+        if not compiled_data.get('time_series'):
 
-                    outfile.write(report)
+            return ('The raw samples were not kept, so there is no plot of '
+                    'the speeds over the run.')
 
-    def generate_plot(self, dataframe, name, plot_type='line', **kwargs):
-        """ This function takes a DataFrame
+        trimmed = self.__describe_trimmed(compiled_data)
 
-        :param DataFrame dataframe: The data to be plotted
-        :param str name: The name of the plot for saving
-        :param str plot_type='line': The type of plot to generate
-        :param **kwargs: the other options for controlling the look of each
-                    plot
-        """
+        if not trimmed:
 
-        plt.figure()
+            return ('No data points were far enough from the mean to be '
+                    'trimmed, so every data point is shown.')
 
-        ax = dataframe.plot(
-            title=kwargs.get('title'),
-            grid=kwargs.get('grid'),
-            legend=True,
-            kind=plot_type,
-        )
+        return ('The data was normalized, and these outliers were excluded '
+                'from the plot: {trimmed}.  The tables above include every '
+                'data point.'.format(trimmed=trimmed))
 
-        if kwargs.get('x_label'):
+    @staticmethod
+    def __split_warmup(columns):
+        """ Splits the columns of a time-series plot, so that the warmup
+        latencies of each column are moved to a column of their own, which is
+        drawn (and labelled) separately.
 
-            ax.set_xlabel(kwargs.get('x_label'))
+        :param list columns: a `(label, series, warmup_mask)` tuple for each
+                    column, where the mask is indexed by trial number
 
-        if kwargs.get('y_label'):
+        :return list columns: a `(label, series)` tuple for each column to be
+                    plotted
+        """
 
-            ax.set_ylabel(kwargs.get('y_label'))
+        split_columns = []
 
-        current_name = '{parent_dir}/{name}'.format(
-            parent_dir=self.images_dir,
-            db=self.db_name,
-            date=self.report_date,
-            name=name,
-        )
+        for label, series, warmup_mask in columns:
 
-        plt.savefig(current_name)
+            warmup = warmup_mask[series.index]
 
-    def __generate_all_plots(self, compiled_data):
-        """ This function coordinates the creation of all benchmarking plots
-        and then returns them
+            split_columns.append((label, series[~warmup]))
 
-        :param dict compiled_data: all of the compiled data from benchmarks
+            if warmup.any():
 
-        :return dict plots: the path for each plot created
-        """
+                split_columns.append((label + ' (warmup)', series[warmup]))
 
-        cd = compiled_data
+        return split_columns
 
-        template = '![Alt text](images/{db}-{date}-{name}.png "{name}")'
-        img_template = template.format(
-            db=self.db_name,
-            date=self.report_date,
-            name='{name}'
-        )
+    def __bin_histograms(self, bin_count=50):
+        """ Re-bins the read and write histograms into evenly spaced bins over
+        a shared range, so that they can be plotted without the raw samples.
 
-        plots = {
-            'speed_plot': img_template.format(name='rw'),
-            'hist_plot': img_template.format(name='stats'),
-            'avgs_plot': img_template.format(name='running_avg'),
-        }
+        :param int bin_count: the number of bins
 
-        img_name_template = '{db}-{date}-{name}'.format(
-            db=self.db_name,
-            date=self.report_date,
-            name='{name}'
-        )
+        :return tup bins: the edges of the bins in seconds, and the count of
+                    writes and reads in each bin
+        """
 
-        rw = pd.DataFrame({
-            'Writes': cd.get('write_metrics').get('normalized_data').data,
-            'Reads': cd.get('read_metrics').get('normalized_data').data,
-        })
+        write_histogram = self.histograms['write_times']
+        read_histogram = self.histograms['read_times']
 
-        avgs = pd.DataFrame({
-            'Writes Average': cd.get('write_metrics').get('rolling_avg').data,
-            'Reads Average': cd.get('read_metrics').get('rolling_avg').data,
-        })
+        recorded = [
+            histogram for histogram in [write_histogram, read_histogram]
+            if histogram.total_count
+        ]
 
-        self.generate_plot(
-            rw,
-            img_name_template.format(name='rw'),
-            title='Plot of Read and Write Speeds',
-            x_label='Trial Number',
-            y_label='Time (s)',
-        )
+        low = min(histogram.min for histogram in recorded)
+        high = max(histogram.max for histogram in recorded)
 
-        self.generate_plot(
-            avgs,
-            img_name_template.format(name='running_avg'),
-            title='Plot of Rolling Averages for Reads and Writes',
-            x_label='Trial Number',
-            y_label='Time (s)',
-        )
+        edges = np.linspace(low, high, bin_count + 1) / NANOSECONDS
 
-        self.generate_plot(
-            rw,
-            img_name_template.format(name='stats'),
-            title='Histogram of Read and Write Times',
-            plot_type='hist',
-            x_label='Value (s)',
+        bins = (
+            edges,
+            [
+                ('Writes', write_histogram.linear_bins(low, high, bin_count)),
+                ('Reads', read_histogram.linear_bins(low, high, bin_count)),
+            ],
         )
 
-        return plots
+        return bins
 
     def __generate_parameter_tables(self, compiled_data):
         """ This function takes compiled data and gnerates the parameter table
@@ -679,8 +3252,55 @@ class Benchmark():
                     report
         """
 
+        from tabulate import tabulate
+
         cd = compiled_data
 
+        # Payloads are generated in every process, these are from the last one
+        payload_stats = self.payload_stats or {}
+
+        payload_time = payload_cpu_time = payload_memory = 'n/a'
+
+        if payload_stats:
+
+            payload_time = '{0:.5f}'.format(payload_stats['wall_time'])
+            payload_cpu_time = '{0:.5f}'.format(payload_stats['cpu_time'])
+            payload_memory = '{0:.2f}'.format(payload_stats['nbytes'] / 2 ** 20)
+
+        # The worker processes have exited by now, so they can be measured too
+        peak_memory = process_memory = 'n/a'
+
+        if peak_rss() is not None:
+
+            peak_memory = '{0:.2f}'.format(peak_rss() / 2 ** 20)
+
+            if self.processes > 1:
+
+                process_memory = '{0:.2f}'.format(
+                    peak_rss(children=True) / 2 ** 20
+                )
+
+        workload = workload_operations = 'n/a'
+
+        if self.mix:
+
+            workload = ', '.join(
+                '{operation}: {proportion:g}'.format(
+                    operation=operation,
+                    proportion=self.mix[operation],
+                )
+                for operation in sorted(self.mix)
+            )
+
+            if self.workload_name:
+
+                workload = 'YCSB {name} ({mix})'.format(
+                    name=self.workload_name.upper(),
+                    mix=workload,
+                )
+
+            workload_operations = str(self.operations)
+
         param_header = [
             'Parameter',
             'Value',
@@ -691,11 +3311,52 @@ class Benchmark():
             ['Number of Trials', str(self.trials)],
             ['Length of Each Entry Field', str(self.entry_length)],
             ['Number of Nodes in Cluster', str(self.number_of_nodes)],
+            ['Number of Worker Processes', str(self.processes)],
+            ['Number of Workers (Threads per Process)', str(self.workers)],
+            ['Async Operations in Flight (per Process)', str(self.concurrency)],
             ['# of StDev\'s Displayed in Graphs', str(cd.get('n_stdev'))],
             ['Range of Rolling Average in Graphs', str(cd.get('rolling_avg_range'))],
             ['Split Reads and Writes', str(self.split)],
             ['Debug Mode', str(self.options.get('--debug'))],
-            ['Random Mode (Random Reads)', str(self.options.get('--random'))],
+            ['DB Module Settings', ', '.join(
+                '{name}={value}'.format(name=name, value=value)
+                for name, value in self.module_settings
+            ) or 'n/a'],
+            ['Random Mode (Random Reads)', str(bool(self.random))],
+            ['Workload', workload],
+            ['Workload Operations', workload_operations],
+            ['Key Distribution', str(self.distribution)],
+            ['Zipfian Theta', str(self.distribution_params['theta'])],
+            ['Hotspot Keys / Operations', '{hot_keys} / {hot_ops}'.format(
+                **self.distribution_params
+            )],
+            ['Open-Loop Rate (ops/s)', str(self.rate)],
+            ['Open-Loop Arrival Schedule', self.arrival],
+            ['Raw Samples Recorded', str(self.raw)],
+            ['Histogram Significant Digits', str(self.precision)],
+            ['Batch Size', str(self.batch_size)],
+            ['Writes per Commit', str(self.commit_every)],
+            ['Preload Time (s)', str(self.elapsed.get('preload'))],
+            ['Preload Throughput (entries/s)',
+             str(self.__preload_throughput())],
+            ['Minimum Length of Each Entry Field', str(self.min_length)],
+            ['Payload Pool Size (Entries)', str(self.payload_pool_size)],
+            ['Payload Seed', str(self.seed)],
+            ['Payload Generation Time (s)', payload_time],
+            ['Payload Generation CPU Time (s)', payload_cpu_time],
+            ['Payload Pool Memory (MB)', payload_memory],
+            ['Peak Memory of the Harness (MB)', peak_memory],
+            ['Peak Memory of a Worker Process (MB)', process_memory],
+            ['Duration (s)', str(self.duration)],
+            ['Window (s)', str(self.window)],
+            ['Warmup', str(self.options.get('--warmup'))],
+            ['Warmup Writes / Reads Excluded', '{writes} / {reads}'.format(
+                writes=self.warmup_counts.get('write_times', 0),
+                reads=self.warmup_counts.get('read_times', 0),
+            )],
+            ['Timer Resolution (ns)', str(clock_resolution())],
+            ['Timer Overhead (ns)', str(self.timer_overhead)],
+            ['Timer Overhead Subtracted', str(bool(self.subtract_overhead))],
         ]
 
 
@@ -713,31 +3374,64 @@ class Benchmark():
 
         return param_table, param_table_md
 
-    @staticmethod
-    def __compute_descriptive_stats(dataframe):
-        """ A static method that computes the descriptive statistics of a given
-        dataframe
+    def __compute_descriptive_stats(self, histogram):
+        """ Computes the descriptive statistics of a given latency histogram.
+        These are exact, since the histogram keeps the exact sums, minimum and
+        maximum alongside its buckets.  The confidence intervals of the mean
+        and p99 are bootstrapped from the buckets, so they cost the same at
+        any number of samples.
 
-        :param DataFrame dataframe: the dataframe with which to compute the
-                    descriptive stats
+        :param LatencyHistogram histogram: the histogram with which to compute
+                    the descriptive stats
 
-        :return dict metrics: a dict of the descriptive statistics
+        :return dict metrics: a dict of the descriptive statistics in seconds
         """
 
-        df = dataframe
+        h = histogram
 
         metrics = {
-            'avg': df.data.mean(),
-            'stdev': df.data.std(),
-            'max': df.data.max(),
-            'min': df.data.min(),
+            'avg': to_seconds(h.mean()),
+            'stdev': to_seconds(h.stdev()),
+            'max': to_seconds(h.max),
+            'min': to_seconds(h.min),
             }
 
-        range = metrics.get('max') - metrics.get('min')
+        range = None
+
+        if h.total_count:
+            range = metrics.get('max') - metrics.get('min')
+
         metrics.update(range=range)
 
+        intervals = bootstrap_intervals(
+            h,
+            percentile=99,
+            resamples=self.bootstrap,
+            seed=self.seed,
+        )
+
+        metrics.update(
+            p99=to_seconds(h.percentile(99)),
+            mean_ci=self.__interval_to_seconds(intervals.get('mean')),
+            p99_ci=self.__interval_to_seconds(intervals.get('percentile')),
+        )
+
         return metrics
 
+    @staticmethod
+    def __interval_to_seconds(interval):
+        """ :return tup interval: a `(low, high)` interval of latencies in
+                    seconds, or None if there is no interval
+        """
+
+        if interval is None:
+
+            return None
+
+        low, high = interval
+
+        return to_seconds(low), to_seconds(high)
+
     @staticmethod
     def __generate_data_tables(compiled_data):
         """ This function creates the data tables for the report.
@@ -749,6 +3443,8 @@ class Benchmark():
                     markdown report
         """
 
+        from tabulate import tabulate
+
         cd = compiled_data
 
         data_header = [
@@ -758,35 +3454,42 @@ class Benchmark():
             'Max Time',
             'Min Time',
             'Range',
+            'Ops/Sec',
+            'Mean 95% CI',
+            'p99',
+            'p99 95% CI',
         ]
 
-        write_metrics = cd.get('write_metrics')
-        read_metrics = cd.get('read_metrics')
-
         metrics = [
             'avg',
             'stdev',
             'max',
             'min',
             'range',
+            'throughput',
+            'mean_ci',
+            'p99',
+            'p99_ci',
         ]
 
-        data_values = [
-            [
-                'writes'
-            ],
-            [
-                'reads'
-            ],
-        ]
+        data_values = []
+
+        for operation, operation_metrics in cd.get('operation_metrics'):
+
+            row = [operation]
 
-        for metric in metrics:
+            for metric in metrics:
 
-            write_metric = write_metrics.get(metric)
-            data_values[0].append(write_metric)
+                value = operation_metrics.get(metric)
 
-            read_metric = read_metrics.get(metric)
-            data_values[1].append(read_metric)
+                # Intervals are shown as text, as tabulate can't format them
+                if isinstance(value, tuple):
+
+                    value = '{0:.5f} - {1:.5f}'.format(*value)
+
+                row.append(value)
+
+            data_values.append(row)
 
         data_table = tabulate(
             tabular_data=data_values,
@@ -804,6 +3507,312 @@ class Benchmark():
 
         return data_table, data_table_md
 
+    @staticmethod
+    def __generate_percentile_tables(compiled_data):
+        """ This function creates the latency percentile tables for the
+        report.  In open-loop mode, the corrected rows measure latency from
+        the intended start time of each operation.
+
+        :param dict compiled_data: the compiled data from benchmarking
+
+        :return tabulate_obj percentile_table: the table for viewing in the
+                    terminal
+        :return tabulate_obj percentile_table_md: the table for viewing in the
+                    markdown report
+        """
+
+        from tabulate import tabulate
+
+        percentile_header = ['Operation'] + [
+            'p{percentile:g}'.format(percentile=percentile)
+            for percentile in PERCENTILES
+        ]
+
+        percentile_values = [
+            [operation] + values
+            for operation, values in compiled_data.get('percentiles')
+        ]
+
+        percentile_table = tabulate(
+            tabular_data=percentile_values,
+            headers=percentile_header,
+            tablefmt='grid',
+            floatfmt='.5f',
+        )
+
+        percentile_table_md = tabulate(
+            tabular_data=percentile_values,
+            headers=percentile_header,
+            tablefmt='pipe',
+            floatfmt='.5f',
+        )
+
+        return percentile_table, percentile_table_md
+
+    @staticmethod
+    def __generate_baseline_tables(compiled_data):
+        """ This function creates the tables comparing the run to the baseline
+        given with `--baseline`.  The interval is the 95% bootstrap interval of
+        the difference between the percentiles of the two runs.
+
+        :param dict compiled_data: the compiled data from benchmarking
+
+        :return tabulate_obj baseline_table: the table for viewing in the
+                    terminal, or an empty string without a baseline
+        :return tabulate_obj baseline_table_md: the table for viewing in the
+                    markdown report, or an empty string without a baseline
+        """
+
+        from tabulate import tabulate
+
+        comparisons = compiled_data.get('baseline')
+
+        if not comparisons:
+
+            return '', ''
+
+        baseline_header = [
+            'Operation',
+            'Metric',
+            'Baseline',
+            'Current',
+            'Change',
+            'Difference 95% CI',
+            'Regression',
+        ]
+
+        baseline_values = []
+
+        for comparison in comparisons:
+
+            change = comparison.get('change')
+
+            if change is not None:
+                change = '{0:+.1%}'.format(change)
+
+            interval = comparison.get('interval')
+
+            # Intervals are shown as text, as tabulate can't format them
+            if interval is not None:
+                interval = '{0:.5f} - {1:.5f}'.format(*interval)
+
+            baseline_values.append([
+                comparison.get('operation'),
+                comparison.get('metric'),
+                comparison.get('baseline'),
+                comparison.get('current'),
+                change,
+                interval,
+                'YES' if comparison.get('regression') else 'no',
+            ])
+
+        baseline_table = tabulate(
+            tabular_data=baseline_values,
+            headers=baseline_header,
+            tablefmt='grid',
+            floatfmt='.5f',
+        )
+
+        baseline_table_md = tabulate(
+            tabular_data=baseline_values,
+            headers=baseline_header,
+            tablefmt='pipe',
+            floatfmt='.5f',
+        )
+
+        return baseline_table, baseline_table_md
+
+    def __generate_baseline_note(self, compiled_data):
+        """ :return str baseline_note: the sentence of the report that says
+                    whether the run regressed from the baseline
+        """
+
+        comparisons = compiled_data.get('baseline')
+
+        if not self.baseline_dir:
+
+            return ('No baseline was given (`--baseline`), so this run was '
+                    'not compared to an earlier one.')
+
+        if not comparisons:
+
+            return ('The baseline {baseline} has none of the operations of '
+                    'this run, so nothing was compared.'.format(
+                        baseline=self.baseline_dir,
+                    ))
+
+        regressions = [
+            comparison for comparison in comparisons
+            if comparison.get('regression')
+        ]
+
+        note = ('This run was compared to the baseline {baseline}.  A '
+                'percentile regressed if it rose by more than {threshold:.0%} '
+                'and its 95% interval of the difference is above 0, and a '
+                'throughput regressed if it fell by more than '
+                '{threshold:.0%}.  '.format(
+                    baseline=self.baseline_dir,
+                    threshold=self.threshold,
+                ))
+
+        if regressions:
+
+            note += '**{count} regression(s) were found.**'.format(
+                count=len(regressions),
+            )
+
+        else:
+
+            note += 'No regressions were found.'
+
+        return note
+
+    @staticmethod
+    def __generate_node_tables(compiled_data):
+        """ This function creates the tables of the operations sent to each
+        node of the DB, for the DB modules that record the node of every
+        operation with `node_select()`.
+
+        :param dict compiled_data: the compiled data from benchmarking
+
+        :return tabulate_obj node_table: the table for viewing in the
+                    terminal, or an empty string without any nodes
+        :return tabulate_obj node_table_md: the table for viewing in the
+                    markdown report, or an empty string without any nodes
+        """
+
+        from tabulate import tabulate
+
+        nodes = compiled_data.get('nodes')
+
+        if not nodes:
+
+            return '', ''
+
+        node_header = [
+            'Node',
+            'Operation',
+            'Count',
+            'Share',
+            'Average',
+            'p50',
+            'p99',
+        ]
+
+        node_values = [
+            [
+                stat.get('node'),
+                stat.get('operation'),
+                stat.get('count'),
+                '{0:.1%}'.format(stat.get('share')),
+                stat.get('mean'),
+                stat.get('p50'),
+                stat.get('p99'),
+            ]
+            for stat in nodes
+        ]
+
+        node_table = tabulate(
+            tabular_data=node_values,
+            headers=node_header,
+            tablefmt='grid',
+            floatfmt='.5f',
+        )
+
+        node_table_md = tabulate(
+            tabular_data=node_values,
+            headers=node_header,
+            tablefmt='pipe',
+            floatfmt='.5f',
+        )
+
+        return node_table, node_table_md
+
+    @staticmethod
+    def __generate_node_note(compiled_data):
+        """ :return str node_note: the sentence of the report that says how
+                    evenly the operations were split between the nodes
+        """
+
+        nodes = compiled_data.get('nodes')
+
+        if not nodes:
+
+            return ('The node of each operation was not recorded, either '
+                    'because the DB module does not report it with '
+                    '`node_select()` or because the raw samples were not '
+                    'kept.')
+
+        shares = {}
+
+        for stat in nodes:
+
+            shares.setdefault(stat.get('operation'), []).append(
+                stat.get('share')
+            )
+
+        # A skew of 1 means that every node had exactly its fair share
+        skews = ', '.join(
+            '{operation}s {skew:.2f}x'.format(
+                operation=operation,
+                skew=max(operation_shares) * len(operation_shares),
+            )
+            for operation, operation_shares in shares.items()
+        )
+
+        return ('These are the operations sent to each node of the DB.  The '
+                'busiest node handled this multiple of its fair share of each '
+                'operation: {skews}.'.format(skews=skews))
+
+    def __generate_commit_note(self, compiled_data):
+        """ :return str commit_note: the sentence of the report that says what
+                    each write cost with its share of the commits
+        """
+
+        if self.commit_every == 1:
+
+            return ('Every write was committed on its own, so the latency of '
+                    'each write includes its commit.  Grouped commits can be '
+                    'compared with this run by running again with '
+                    '`--commit-every` and `--baseline`, or by sweeping '
+                    '`--commit-every`.')
+
+        metrics = dict(compiled_data.get('operation_metrics'))
+
+        write_metrics = metrics.get('writes')
+        commit_metrics = metrics.get('commits')
+
+        if not commit_metrics.get('avg'):
+
+            return 'No commits were recorded.'
+
+        commit_note = ('The writes were committed in groups of '
+                       '{commit_every}, so the latency of each write leaves '
+                       'its commit out.  The {commits} commits took '
+                       '{commit_avg:.5f} s on average ({commit_p99:.5f} s at '
+                       'p99).'.format(
+                           commit_every=self.commit_every,
+                           commits=self.histograms['commit_times'].total_count,
+                           commit_avg=commit_metrics.get('avg'),
+                           commit_p99=commit_metrics.get('p99'),
+                       ))
+
+        # Preloaded entries are not written one by one
+        if not write_metrics:
+
+            return commit_note
+
+        # Each write shares a commit with the others of its group
+        write_cost = write_metrics.get('avg') + \
+            commit_metrics.get('avg') / self.commit_every
+
+        return commit_note + ('  Each write cost about {write_cost:.5f} s '
+                              'with its share of a commit, and the writes '
+                              'ran at {throughput:.1f} ops/sec.'.format(
+                                  write_cost=write_cost,
+                                  throughput=write_metrics.get('throughput'),
+                              ))
+
     @staticmethod
     def __print_module_list():
         """ Static method that prints the list of available modules to the
@@ -820,6 +3829,44 @@ class Benchmark():
 
         exit(message)
 
+    def __create_client(self, position=0, client=None):
+        """ Creates a new instance of the registered DB module, which sets up
+        its own connection to the DB.  During a sweep, the clients of the
+        earlier runs are kept in `self.clients` and reset instead, so that
+        their connections stay open from one run to the next.
+
+        :param int position: the position of the client in the pool
+        :param client: an instance made with `setup=False`, which is set up
+                    instead of making a new one
+
+        :return client: the `Benchmark` instance of the DB module
+        """
+
+        if self.clients is not None and position < len(self.clients):
+
+            client = self.clients[position]
+            client.reset(self.collection, self.trials)
+
+        else:
+
+            if client is None:
+
+                client = self.module[0].Benchmark(
+                    self.collection, setup=True, trials=self.trials
+                )
+
+            else:
+
+                client.setup(self.collection)
+
+            if self.clients is not None:
+                self.clients.append(client)
+
+        # With `--commit-every`, the writes are committed by `commit_writes()`
+        client.group_commit = self.commit_every > 1
+
+        return client
+
     def __register_module(self, db_module):
         """ This function begins the process of registering a module for
         benchmarking.  It checks to see if the module exists, and if it does,
@@ -836,6 +3883,26 @@ class Benchmark():
 
             module = self.__import_db_mod(db_module)
 
+            self.__override_settings(module)
+
+            # Set before any client is created, since a module may check it
+            # with its settings
+            module[0].Benchmark.preloading = bool(self.preload)
+
+            check_settings = getattr(
+                module[0].Benchmark, 'check_settings', None,
+            )
+
+            if check_settings:
+
+                try:
+
+                    check_settings()
+
+                except ValueError as error:
+
+                    exit('Error! {error}!'.format(error=error))
+
             return module
 
         else:
@@ -846,6 +3913,47 @@ class Benchmark():
 
             exit(error)
 
+    def __override_settings(self, module):
+        """ Overrides the settings of a DB module with those given with
+        `--set`.  A module copies the settings of its `local.py` when it is
+        imported, so they are overridden in both.  Each value is converted to
+        the type of the setting it replaces.
+
+        :param tup module: a tuple with the main and local parts of the module
+        """
+
+        main, local = module
+
+        for name, value in self.module_settings:
+
+            if not hasattr(local, name):
+
+                exit('Error! The DB module has no setting {name}!'.format(
+                    name=name,
+                ))
+
+            default = getattr(local, name)
+
+            try:
+
+                if isinstance(default, bool):
+
+                    value = value.lower() in ['1', 'true', 'yes', 'on']
+
+                elif default is not None:
+
+                    value = type(default)(value)
+
+            except ValueError:
+
+                exit('Error! {name} must be a {type}!'.format(
+                    name=name,
+                    type=type(default).__name__,
+                ))
+
+            setattr(local, name, value)
+            setattr(main, name, value)
+
     @staticmethod
     def __import_db_mod(module):
         """ This function does the actual import of the database-specific
@@ -873,8 +3981,27 @@ class Benchmark():
 
             exit(error)
 
+def serve_process(options, process_id, setup_lock, conn):
+    """ The target of each worker process forked by `--processes`
+
+    :param dict options: the runtime options of the parent process
+    :param int process_id: the position of this process in the process pool
+    :param Lock setup_lock: the lock that serializes client creation
+    :param Connection conn: the pipe to the parent process
+    """
+
+    Benchmark(options=options).serve_process(process_id, setup_lock, conn)
+
 if __name__ == '__main__':
 
     doc_opt= docopt(__doc__)
 
-    Benchmark(setup=True, options=doc_opt)
\ No newline at end of file
+    if ',' in (doc_opt.get('<database>') or ''):
+
+        from comparison import Comparison
+
+        Comparison(doc_opt).run()
+
+    else:
+
+        Benchmark(setup=True, options=doc_opt)
\ No newline at end of file
@@ -46,6 +46,22 @@ class Benchmark(BenchmarkDatabase):
 
         self.collection.ensure_index("Index")
 
+    def reset(self, collection=None, trials=0):
+        """ This function empties the collection over the connection that is
+        already open, so that the next run of a sweep starts from nothing.
+
+        :param collection: The collection that all benchmark writes will happen
+                    with
+        :param trials: The number of trials of the next run
+
+        """
+
+        self.trials = trials
+
+        self.collection.drop()
+
+        self.collection.ensure_index("Index")
+
     def write(self, data):
         """ The function handles all writes with MongoDB.  It takes a single
         parameter (a dict of sample data) and then writes it to the DB.
@@ -72,4 +88,67 @@ class Benchmark(BenchmarkDatabase):
 
         read_entry = self.collection.find_one(query)
 
-        return read_entry
\ No newline at end of file
+        return read_entry
+
+    def write_many(self, entries):
+        """ This function writes a whole batch of entries to MongoDB with a
+        single bulk insert.
+
+        :param entries: A list of dicts that will be written to the DB
+
+        """
+
+        self.collection.insert_many(entries)
+
+    def read_many(self, indexes):
+        """ This function reads a whole batch of entries from MongoDB with a
+        single `$in` query.
+
+        :param indexes: The indexes of the records to be retrieved from the DB
+
+        :return read_entries: the entries retrieved from the DB
+
+        """
+
+        query = {
+            'Index': {'$in': list(indexes)}
+        }
+
+        read_entries = list(self.collection.find(query))
+
+        return read_entries
+
+    def update(self, index, data):
+        """ This function replaces the fields of an existing entry in MongoDB.
+
+        :param index: The index of the record to be updated
+        :param data: A dict of the new fields of the record
+
+        """
+
+        query = {
+            'Index': index
+        }
+
+        self.collection.update_one(query, {'$set': data})
+
+    def scan(self, start, count):
+        """ This function reads a range of entries from MongoDB, in order of
+        their index, with a single query.
+
+        :param start: The index of the first record to be retrieved
+        :param count: The number of records to be retrieved
+
+        :return read_entries: the entries retrieved from the DB
+
+        """
+
+        query = {
+            'Index': {'$gte': start}
+        }
+
+        cursor = self.collection.find(query).sort('Index').limit(count)
+
+        read_entries = list(cursor)
+
+        return read_entries
\ No newline at end of file
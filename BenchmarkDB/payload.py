@@ -0,0 +1,167 @@
+"""
+DB Benchmarking Application
+===========================
+
+Payload.py
+
+This file houses the pool of payloads that are written to the DB.  Every field
+of every entry is generated up front with NumPy, as one array of bytes per
+field, so that building an entry inside the timed loop is only a lookup.  The
+pool can be seeded to write exactly the same data on every run, and its fields
+can be of a fixed or a variable length.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+
+import time
+import string
+
+import numpy as np
+
+
+class PayloadPool():
+    """ A fixed number of pre-generated entries.  Entries are handed out by
+    index and the pool wraps around, so a pool smaller than the number of
+    trials bounds the memory used at the cost of repeating payloads.
+    """
+
+    FIELDS = [
+        ('Number', string.digits),
+        ('Info', string.ascii_letters),
+    ]
+
+    # Entries are generated this many at a time, which bounds the memory used
+    # by the intermediate arrays
+    CHUNK_SIZE = 10000
+
+    def __init__(self, size, length, min_length=None, seed=None):
+        """ __init__() generates every entry of the pool, and records the time
+        and memory it took to do so.
+
+        :param int size: the number of distinct entries to generate
+        :param int length: the length of each field, or the longest length of
+                    each field if `min_length` is given
+        :param int min_length: if given, the length of each field is drawn
+                    uniformly between `min_length` and `length`
+        :param int seed: the seed of the random generator, so that the same
+                    payloads can be generated again
+        """
+
+        if size < 1 or length < 1:
+
+            raise ValueError('The payload pool size and length must be at '
+                             'least 1')
+
+        if min_length is not None and not 1 <= min_length <= length:
+
+            raise ValueError('The minimum length must be between 1 and the '
+                             'length')
+
+        self.size = size
+        self.length = length
+        self.min_length = min_length
+        self.seed = seed
+
+        wall_start_time = time.time()
+        cpu_start_time = process_time()
+
+        random_state = np.random.RandomState(seed)
+
+        self.fields = {}
+        self.lengths = {}
+
+        for name, alphabet in self.FIELDS:
+
+            self.fields[name] = self.__generate_field(random_state, alphabet)
+
+            if min_length is not None:
+
+                self.lengths[name] = random_state.randint(
+                    min_length, length + 1, size=size,
+                ).astype(np.uint32)
+
+        self.wall_time = time.time() - wall_start_time
+        self.cpu_time = process_time() - cpu_start_time
+
+        self.nbytes = sum(
+            array.nbytes
+            for arrays in [self.fields, self.lengths]
+            for array in arrays.values()
+        )
+
+    def entry(self, index):
+        """ Builds the entry for an index from the pre-generated fields
+
+        :param int index: the index of the entry
+
+        :return dict entry: the entry, without its index
+        """
+
+        position = index % self.size
+
+        entry = dict()
+
+        for name, values in self.fields.items():
+
+            value = values[position]
+
+            if self.lengths:
+
+                value = value[:self.lengths[name][position]]
+
+            entry[name] = str(value.decode('ascii'))
+
+        return entry
+
+    def stats(self):
+        """ :return dict stats: the size of the pool and the time and memory
+                    it took to generate
+        """
+
+        return {
+            'size': self.size,
+            'nbytes': self.nbytes,
+            'wall_time': self.wall_time,
+            'cpu_time': self.cpu_time,
+        }
+
+    def __generate_field(self, random_state, alphabet):
+        """ Generates one field for every entry of the pool
+
+        :param RandomState random_state: the generator to draw from
+        :param str alphabet: the characters the field is made of
+
+        :return ndarray values: a fixed-width bytes array of `size` values
+        """
+
+        symbols = np.frombuffer(alphabet.encode('ascii'), dtype=np.uint8)
+
+        values = np.empty(self.size, dtype='S{length}'.format(
+            length=self.length,
+        ))
+
+        for start in range(0, self.size, self.CHUNK_SIZE):
+
+            stop = min(start + self.CHUNK_SIZE, self.size)
+
+            codes = random_state.randint(
+                0, len(symbols), size=(stop - start, self.length),
+            )
+
+            characters = np.ascontiguousarray(symbols[codes])
+
+            values[start:stop] = characters.view(values.dtype).ravel()
+
+        return values
+
+
+def process_time():
+    """ :return float seconds: the CPU time used by this process so far """
+
+    if hasattr(time, 'process_time'):
+
+        return time.process_time()
+
+    # Python 2
+    return time.clock()
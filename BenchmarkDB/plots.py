@@ -0,0 +1,209 @@
+"""
+DB Benchmarking Application
+===========================
+
+Plots.py
+
+This file houses the drawing of the plots of the report.  The data of each
+plot is reduced before it is drawn: the time series are downsampled to the
+lowest and highest value of each of a fixed number of buckets, which keeps the
+spikes that a plot is read for, and the histograms are drawn from counts that
+are binned beforehand.  Every plot therefore takes about the same time to draw
+whatever the number of trials, and the plots are drawn in parallel, in a
+process each.
+
+A plot is described by a plain dict, so that it can be sent to a process:
+
+    {
+        'path': 'generated_reports/<title>/images/rw.png',
+        'title': 'Plot of Read and Write Speeds',
+        'x_label': 'Trial Number',
+        'y_label': 'Time (s)',
+        'lines': [('Writes', x, y), ('Reads', x, y)],
+    }
+
+A histogram has `'bins': (edges, [('Writes', counts), ('Reads', counts)])`
+instead of lines, and `'logx': True` draws the x axis on a log scale.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+
+import math
+import multiprocessing
+
+import numpy as np
+
+
+# The number of buckets a time series is downsampled to, which is more than
+# the width of a plot in pixels
+PLOT_BUCKETS = 1000
+
+
+def import_pyplot():
+    """ Imports the plotting libraries, which are slow to import and need a
+    display stack, so they are only loaded once a plot is actually drawn.
+
+    :return module plt: `matplotlib.pyplot`, set up to draw without a display
+    """
+
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    # Imported for the style it gives the plots
+    import seaborn
+
+    return plt
+
+
+def downsample(x, y, bucket_count=PLOT_BUCKETS):
+    """ Downsamples a time series to the lowest and the highest point of each
+    of `bucket_count` buckets of consecutive points, in their original order.
+    Unlike averaging or keeping every n-th point, this keeps every spike, so
+    the plot has the same shape as a plot of every point.  Points that are not
+    numbers (e.g. the start of a rolling average) are left out.
+
+    :param x: the x value of each point, e.g. the trial number
+    :param y: the y value of each point, e.g. the latency
+    :param int bucket_count: the number of buckets
+
+    :return tup points: the x values and y values of the points kept
+    """
+
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+
+    finite = np.isfinite(y)
+
+    if not finite.all():
+
+        x = x[finite]
+        y = y[finite]
+
+    if len(y) <= 2 * bucket_count:
+
+        return x, y
+
+    width = int(math.ceil(len(y) / bucket_count))
+    rows = int(math.ceil(len(y) / width))
+
+    # The last bucket is padded, and the padding is never picked
+    buckets = np.full(rows * width, np.nan)
+    buckets[:len(y)] = y
+    buckets = buckets.reshape(rows, width)
+
+    starts = np.arange(rows) * width
+
+    positions = np.unique(np.concatenate([
+        starts + np.nanargmin(buckets, axis=1),
+        starts + np.nanargmax(buckets, axis=1),
+    ]))
+
+    return x[positions], y[positions]
+
+
+def bin_counts(columns, bin_count=50):
+    """ Bins the values of several columns into the same evenly spaced bins,
+    so that they can be drawn as a histogram from the counts alone
+
+    :param list columns: a `(label, values)` tuple for each column
+    :param int bin_count: the number of bins
+
+    :return tup bins: the edges of the bins, and a `(label, counts)` tuple for
+                each column
+    """
+
+    columns = [(label, np.asarray(values)) for label, values in columns]
+
+    recorded = [values for _, values in columns if len(values)]
+
+    low = min(values.min() for values in recorded)
+    high = max(values.max() for values in recorded)
+
+    edges = np.linspace(low, max(high, low + 1e-9), bin_count + 1)
+
+    bins = (
+        edges,
+        [(label, np.histogram(values, bins=edges)[0])
+         for label, values in columns],
+    )
+
+    return bins
+
+
+def render_plot(plot):
+    """ Draws a single plot and saves it
+
+    :param dict plot: the description of the plot
+    """
+
+    plt = import_pyplot()
+
+    figure, ax = plt.subplots()
+
+    for label, x, y in plot.get('lines', []):
+
+        ax.plot(x, y, label=label)
+
+    if plot.get('bins'):
+
+        edges, columns = plot.get('bins')
+
+        for label, counts in columns:
+
+            ax.hist(
+                edges[:-1], bins=edges, weights=counts, label=label, alpha=0.5,
+            )
+
+    if plot.get('logx'):
+
+        ax.set_xscale('log')
+
+    ax.set_title(plot.get('title'))
+
+    if plot.get('x_label'):
+
+        ax.set_xlabel(plot.get('x_label'))
+
+    if plot.get('y_label'):
+
+        ax.set_ylabel(plot.get('y_label'))
+
+    ax.legend()
+
+    figure.savefig(plot.get('path'))
+
+    plt.close(figure)
+
+
+def render_plots(plots, processes=None):
+    """ Draws several plots at once, each in its own process
+
+    :param list plots: the description of each plot
+    :param int processes: the number of processes to draw with (defaults to
+                one for each plot, up to the number of CPUs)
+    """
+
+    if processes is None:
+
+        processes = min(len(plots), multiprocessing.cpu_count())
+
+    if processes < 2:
+
+        for plot in plots:
+
+            render_plot(plot)
+
+        return
+
+    pool = multiprocessing.Pool(processes)
+
+    try:
+
+        pool.map(render_plot, plots)
+
+    finally:
+
+        pool.close()
+        pool.join()
@@ -13,4 +13,37 @@ POSTGRESQL_PORT = 5432
 POSTGRESQL_USER = 'vagrant'
 POSTGRESQL_PASSWORD = 'password'
 
-NUMBER_OF_NODES = 3
\ No newline at end of file
+NUMBER_OF_NODES = 3
+
+# How the statements are sent: 'plain' formats every value into the SQL,
+# 'bound' passes the values as parameters to psycopg2, which quotes them and
+# interpolates them into the SQL on the client (psycopg2 has no server-side
+# binding, so the server still parses and plans every statement), and
+# 'prepared' has each connection PREPARE every statement once and run it with
+# EXECUTE, so the server does not parse and plan it again for every operation
+POSTGRESQL_STATEMENTS = 'plain'
+
+# How the entries are split between the nodes: 'range' gives each node an
+# equal range of consecutive indexes, 'hash' hashes each index modulo the
+# number of nodes, and 'consistent' hashes each index onto a ring with
+# POSTGRESQL_VIRTUAL_NODES virtual nodes for each node (see router.py)
+POSTGRESQL_ROUTER = 'range'
+POSTGRESQL_VIRTUAL_NODES = 100
+
+# Whether a commit waits for its WAL to be flushed to disk before it returns:
+# 'on' (the default of the server), 'off', 'local', 'remote_write' or
+# 'remote_apply'.  This is set on every connection, and is worth comparing
+# with grouped commits (`--commit-every`), which share each flush between
+# several writes instead
+POSTGRESQL_SYNCHRONOUS_COMMIT = 'on'
+
+# The number of bytes sent to each node in every chunk of the COPY of
+# `--preload`
+POSTGRESQL_COPY_BUFFER = 2 ** 20
+
+# How the table of each node is reset before a run, once the catalog shows
+# that it exists: 'truncate' empties it, 'recreate' drops and creates it again
+# (e.g. after the schema changed), and 'keep' keeps its entries, so that a
+# series of read-only runs with `--preload` only loads them once.  'keep' is
+# only allowed with `--preload`.
+POSTGRESQL_RESET = 'truncate'
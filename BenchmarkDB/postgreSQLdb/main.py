@@ -10,25 +10,76 @@ process.
 """
 from __future__ import absolute_import
 
-import os
+import hashlib
+import threading
 
 import psycopg2
 from .local import *
 
 from benchmark_template import BenchmarkDatabase
+from router import create_router
 from six.moves import range
 
 
-class Benchmark():
+class CopyStream():
+    """ A file-like stream of the rows of a COPY, which are only built as the
+    driver reads them, so that any number of rows is loaded in constant
+    memory.
+    """
+
+    def __init__(self, rows):
+        """ :param rows: an iterable of the rows, in the text format of
+                    COPY
+        """
+
+        self.rows = iter(rows)
+        self.buffer = ''
+
+    def read(self, size=-1):
+        """ :return str data: up to `size` characters of the rows, or all of
+                    the rows that are left if `size` is negative
+        """
+
+        chunks = [self.buffer]
+        length = len(self.buffer)
+
+        while size < 0 or length < size:
+
+            row = next(self.rows, None)
+
+            if row is None:
+                break
+
+            chunks.append(row)
+            length += len(row)
+
+        data = ''.join(chunks)
+
+        if size < 0:
+
+            self.buffer = ''
+
+            return data
+
+        self.buffer = data[size:]
+
+        return data[:size]
+
+
+class Benchmark(BenchmarkDatabase):
 
     def __init__(self, collection, setup=False, trials=0):
 
         self.trials = trials
-        self.split_points = {}
+        self.router = None
 
         self.connections = {}
         self.cursors = {}
 
+        # The nodes with writes that are left uncommitted, with grouped
+        # commits
+        self.pending = set()
+
         self.insert_statement = """INSERT INTO test (Index, Number, Info)
                                        VALUES (
                                            {Index},
@@ -36,7 +87,37 @@ class Benchmark():
                                            {Info!r}
                                        );"""
 
-        self.delete_statement = 'DROP TABLE {table} cascade'
+        self.delete_statement = 'DROP TABLE test cascade;'
+
+        self.truncate_statement = 'TRUNCATE test;'
+
+        # The catalog is asked whether the table exists, which also works
+        # from any directory or host
+        self.exists_statement = """SELECT EXISTS (
+                                       SELECT 1 FROM pg_catalog.pg_tables
+                                       WHERE schemaname = current_schema()
+                                       AND tablename = 'test'
+                                   );"""
+
+        # The indexes held by a table are summed up to check that they are
+        # exactly those the router gives its node
+        self.index_stats_statement = \
+            'SELECT count(*), min(Index), max(Index), sum(Index) FROM test;'
+
+        # A fingerprint of the entries of the last preload is kept next to
+        # the table of every node, so that kept entries made with another
+        # --length or --seed are not reused
+        self.create_load_statement = \
+            'CREATE TABLE IF NOT EXISTS benchmark_load (Fingerprint TEXT);'
+
+        self.drop_load_statement = 'DROP TABLE IF EXISTS benchmark_load;'
+
+        self.select_load_statement = 'SELECT Fingerprint FROM benchmark_load;'
+
+        self.clear_load_statement = 'DELETE FROM benchmark_load;'
+
+        self.insert_load_statement = \
+            'INSERT INTO benchmark_load (Fingerprint) VALUES (%s);'
 
         self.create_statement = """CREATE TABLE test (
                                        Index   INTEGER PRIMARY KEY,
@@ -46,74 +127,320 @@ class Benchmark():
 
         self.select_statement = 'SELECT * from test WHERE Index = {index};'
 
+        self.insert_many_statement = """INSERT INTO test (Index, Number, Info)
+                                            VALUES {values};"""
+
+        self.values_statement = '({Index}, {Number}, {Info!r})'
+
+        self.select_many_statement = \
+            'SELECT * from test WHERE Index = ANY(ARRAY[{indexes}]);'
+
+        self.update_statement = """UPDATE test
+                                       SET Number = {Number}, Info = {Info!r}
+                                       WHERE Index = {index};"""
+
+        # The statements whose values are passed to the driver as parameters,
+        # which are used unless POSTGRESQL_STATEMENTS is 'plain'.  psycopg2
+        # quotes the values and interpolates them on the client, so the server
+        # still receives (and parses) plain SQL unless it is prepared.
+        self.bound_statements = {
+            'insert': """INSERT INTO test (Index, Number, Info)
+                          VALUES (%s, %s, %s);""",
+            'select': 'SELECT * from test WHERE Index = %s;',
+            'insert_many': """INSERT INTO test (Index, Number, Info)
+                               SELECT unnest(%s::integer[]),
+                                      unnest(%s::bigint[]),
+                                      unnest(%s::text[]);""",
+            'select_many': 'SELECT * from test WHERE Index = ANY(%s);',
+            'update': """UPDATE test
+                          SET Number = %s, Info = %s
+                          WHERE Index = %s;""",
+        }
+
+        self.prepare_statement = 'PREPARE benchmark_{name} AS {statement}'
+
+        # Built once, so that nothing is formatted on the hot path
+        self.execute_statements = dict(
+            (name, 'EXECUTE benchmark_{name} ({params});'.format(
+                name=name,
+                params=', '.join(['%s'] * statement.count('%s')),
+            ))
+            for name, statement in self.bound_statements.items()
+        )
+
+        self.deallocate_statement = 'DEALLOCATE ALL;'
+
+        self.synchronous_commit_statement = 'SET synchronous_commit TO %s;'
+
+        self.copy_statement = 'COPY test (Index, Number, Info) FROM STDIN;'
+
+        # The fields are only digits and letters, so nothing is escaped
+        self.copy_row = '{Index}\t{Number}\t{Info}\n'
+
+        self.analyze_statement = 'ANALYZE test;'
+
+        self.check_settings()
+
+        self.statements = POSTGRESQL_STATEMENTS
+
         if setup:
             self.setup(collection)
 
+    @classmethod
+    def check_settings(cls):
+        """ Checks the settings of `local.py` (and `--set`), which `main.py`
+        does before any client is created
+
+        """
+
+        if POSTGRESQL_STATEMENTS not in ['plain', 'bound', 'prepared']:
+
+            raise ValueError('POSTGRESQL_STATEMENTS must be plain, bound or '
+                             'prepared, not {statements!r}'.format(
+                                 statements=POSTGRESQL_STATEMENTS,
+                             ))
+
+        if POSTGRESQL_RESET not in ['truncate', 'recreate', 'keep']:
+
+            raise ValueError('POSTGRESQL_RESET must be truncate, recreate or '
+                             'keep, not {reset!r}'.format(
+                                 reset=POSTGRESQL_RESET,
+                             ))
+
+        # The kept entries are only checked (and reloaded if they are not
+        # those of this run) by `preload()`, and would otherwise clash with
+        # the writes of the run
+        if POSTGRESQL_RESET == 'keep' and not cls.preloading:
+
+            raise ValueError("POSTGRESQL_RESET can only be 'keep' when the "
+                             "entries are loaded with --preload")
+
+        if POSTGRESQL_SYNCHRONOUS_COMMIT not in [
+                'on', 'off', 'local', 'remote_write', 'remote_apply']:
+
+            raise ValueError('POSTGRESQL_SYNCHRONOUS_COMMIT must be on, off, '
+                             'local, remote_write or remote_apply, not '
+                             '{value!r}'.format(
+                                 value=POSTGRESQL_SYNCHRONOUS_COMMIT,
+                             ))
+
     def setup(self, collection):
         """ This function will set up the connection with the DB.  The options
-        used here are all configured in the config file.
+        used here are all configured in the config file.  Every node is
+        connected to and has its table reset at the same time.
 
         :param collection: The collection that all benchmark writes will happen
                     with
 
         """
-        # #TODO - fix how the collection is used here
 
-        import ipdb
-        # ipdb.set_trace()
+        self.router = self.create_router()
+
+        self.for_each_node(self.connect, collection)
 
-        lock_file = '.sql_{node}.lock'
-        dir = 'postgreSQLdb'
-        file_list = os.listdir(dir)
+    def connect(self, node, collection):
+        """ Connects to a node, and then resets its table
 
-        split_number = self.trials / NUMBER_OF_NODES
+        :param node: The node to connect to
+        :param collection: The DB the table is in
 
-        for node in range(1, NUMBER_OF_NODES + 1):
+        """
 
-            current_host = POSTGRESQL_NODES[
-                'POSTGRESQL_{node}'.format(node=node)
-            ]
+        current_host = POSTGRESQL_NODES['POSTGRESQL_{node}'.format(node=node)]
 
-            current_conn = psycopg2.connect(
-                host=current_host,
-                port=POSTGRESQL_PORT,
-                user=POSTGRESQL_USER,
-                password=POSTGRESQL_PASSWORD,
-                dbname=collection,
-            )
+        current_conn = psycopg2.connect(
+            host=current_host,
+            port=POSTGRESQL_PORT,
+            user=POSTGRESQL_USER,
+            password=POSTGRESQL_PASSWORD,
+            dbname=collection,
+        )
+
+        self.connections[node] = current_conn
+
+        self.cursors[node] = current_conn.cursor()
 
-            self.connections[node] = current_conn
+        self.cursors[node].execute(
+            self.synchronous_commit_statement,
+            (POSTGRESQL_SYNCHRONOUS_COMMIT,),
+        )
 
-            current_cursor = self.connections[node].cursor()
+        self.commit(node)
+
+        self.reset_node(node)
 
-            self.cursors[node] = current_cursor
+    def reset(self, collection, trials=0):
+        """ This function resets the table on every node at the same time,
+        over the connections that are already open, so that the next run of a
+        sweep starts from nothing (or from the kept entries).
+
+        :param collection: The collection that all benchmark writes will happen
+                    with
+        :param trials: The number of trials of the next run
 
-            current_lock = lock_file.format(node=node)
+        """
 
-            if current_lock in file_list:
+        self.trials = trials
 
-                delete = self.delete_statement.format(table=collection)
+        self.router = self.create_router()
 
-                self.cursors[node].execute(delete)
+        self.pending.clear()
 
-                self.commit(node)
+        self.for_each_node(self.reset_node)
 
-            else:
+    def reset_node(self, node):
+        """ Resets the table of a node as chosen by POSTGRESQL_RESET: the
+        table is created if the catalog does not list it, and otherwise it is
+        either truncated, dropped and created again, or kept as it is.
 
-                with open('{dir}/{lock}'.format(lock=current_lock, dir=dir,), 'w+'):
-                    pass
+        :param node: The node whose table is reset
 
-            # create_table = self.create_statement.format(
-            #     index='Index int',
-            #     number='Number int',
-            #     info='Info text',
-            # )
+        """
+
+        self.cursors[node].execute(self.exists_statement)
+
+        exists = self.cursors[node].fetchone()[0]
+
+        # The fingerprint of the last preload only holds while its entries
+        # are kept
+        if not exists or POSTGRESQL_RESET != 'keep':
+
+            self.cursors[node].execute(self.drop_load_statement)
+
+        if not exists:
 
             self.cursors[node].execute(self.create_statement)
 
-            self.commit(node)
+        elif POSTGRESQL_RESET == 'truncate':
+
+            self.cursors[node].execute(self.truncate_statement)
+
+        elif POSTGRESQL_RESET == 'recreate':
+
+            self.cursors[node].execute(self.delete_statement)
+
+            self.cursors[node].execute(self.create_statement)
+
+        self.commit(node)
+
+        self.prepare(node)
+
+    def for_each_node(self, target, *args):
+        """ Runs a function for every node at the same time, each in its own
+        thread, and raises the first error of any of them
+
+        :param target: A function whose first argument is the node
+        :param args: The other arguments of the function
+
+        """
+
+        errors = []
+
+        threads = [
+            threading.Thread(
+                target=self.guard_node, args=(target, node, args, errors),
+            )
+            for node in range(1, NUMBER_OF_NODES + 1)
+        ]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        if errors:
+
+            raise errors[0]
+
+    @staticmethod
+    def guard_node(target, node, args, errors):
+        """ Runs a function for a node, catching any error so that it can be
+        raised once every node has finished
+
+        :param target: A function whose first argument is the node
+        :param node: The node to run it for
+        :param args: The other arguments of the function
+        :param errors: The list that any error is added to
+
+        """
+
+        try:
+
+            target(node, *args)
+
+        except Exception as error:
 
-            self.split_points[node] = split_number * node
+            errors.append(error)
+
+    def create_router(self):
+        """ Creates the router that splits the entries between the nodes,
+        as chosen by POSTGRESQL_ROUTER
+
+        :return router: the router
+        """
+
+        router = create_router(
+            POSTGRESQL_ROUTER,
+            nodes=list(range(1, NUMBER_OF_NODES + 1)),
+            record_count=self.trials,
+            virtual_nodes=POSTGRESQL_VIRTUAL_NODES,
+        )
+
+        return router
+
+    def prepare(self, node):
+        """ With prepared statements, has the connection to a node PREPARE
+        every statement, which is done again whenever the table is recreated.
+        The statements are prepared with the `$n` parameters of the server,
+        and run with `EXECUTE`, whose values are interpolated by the driver.
+
+        :param node: The node whose connection prepares the statements
+
+        """
+
+        if self.statements != 'prepared':
+
+            return
+
+        self.cursors[node].execute(self.deallocate_statement)
+
+        for name, statement in self.bound_statements.items():
+
+            parts = statement.split('%s')
+
+            # `%s` becomes `$1`, `$2`... in the order the values are given
+            statement = parts[0] + ''.join(
+                '${number}{part}'.format(number=number, part=part)
+                for number, part in enumerate(parts[1:], 1)
+            )
+
+            self.cursors[node].execute(self.prepare_statement.format(
+                name=name,
+                statement=statement.rstrip(';'),
+            ))
+
+        self.commit(node)
+
+    def execute(self, node, name, params):
+        """ Runs one of the bound statements on a node, either directly or
+        with `EXECUTE` when it has been prepared
+
+        :param node: The node to run the statement on
+        :param name: The name of the statement, e.g. 'insert'
+        :param params: The values of the statement, in order
+
+        """
+
+        if self.statements == 'prepared':
+
+            statement = self.execute_statements[name]
+
+        else:
+
+            statement = self.bound_statements[name]
+
+        self.cursors[node].execute(statement, params)
 
     def write(self, data):
         """ The function handles all writes with MongoDB.  It takes a single
@@ -126,11 +453,19 @@ class Benchmark():
         trial = data['Index']
         node = self.node_select(trial)
 
-        insert = self.insert_statement.format(**data)
+        if self.statements == 'plain':
 
-        self.cursors[node].execute(insert)
+            insert = self.insert_statement.format(**data)
 
-        self.commit(node)
+            self.cursors[node].execute(insert)
+
+        else:
+
+            self.execute(node, 'insert', (
+                trial, int(data['Number']), data['Info'],
+            ))
+
+        self.finish_write(node)
 
     def read(self, index):
         """ This function handles all reads from MongoDB.  It takes a single
@@ -144,30 +479,328 @@ class Benchmark():
 
         node = self.node_select(index)
 
-        select = self.select_statement.format(index=index)
+        if self.statements == 'plain':
+
+            select = self.select_statement.format(index=index)
 
-        self.cursors[node].execute(select)
+            self.cursors[node].execute(select)
+
+        else:
+
+            self.execute(node, 'select', (index,))
 
         return self.cursors[node].fetchone()
 
+    def write_many(self, entries):
+        """ This function writes a whole batch of entries, with a single
+        multi-row INSERT (and a single commit) for each node the entries
+        belong on.
+
+        :param entries: A list of dicts that will be written to the DB
+
+        """
+
+        nodes = self.group_by_node(entries, lambda entry: entry['Index'])
+
+        for node, node_entries in nodes.items():
+
+            if self.statements == 'plain':
+
+                values = ', '.join(
+                    self.values_statement.format(**entry)
+                    for entry in node_entries
+                )
+
+                insert = self.insert_many_statement.format(values=values)
+
+                self.cursors[node].execute(insert)
+
+            else:
+
+                # One array of each column, which the statement unnests
+                self.execute(node, 'insert_many', (
+                    [entry['Index'] for entry in node_entries],
+                    [int(entry['Number']) for entry in node_entries],
+                    [entry['Info'] for entry in node_entries],
+                ))
+
+            self.finish_write(node)
+
+    def read_many(self, indexes):
+        """ This function reads a whole batch of entries, with a single
+        `= ANY()` query for each node the entries belong on.
+
+        :param indexes: The indexes of the records to be retrieved from the DB
+
+        :return read_entries: the entries retrieved from the DB
+
+        """
+
+        read_entries = []
+
+        nodes = self.group_by_node(indexes, lambda index: index)
+
+        for node, node_indexes in nodes.items():
+
+            if self.statements == 'plain':
+
+                select = self.select_many_statement.format(
+                    indexes=', '.join(str(index) for index in node_indexes),
+                )
+
+                self.cursors[node].execute(select)
+
+            else:
+
+                self.execute(node, 'select_many', (list(node_indexes),))
+
+            read_entries.extend(self.cursors[node].fetchall())
+
+        return read_entries
+
+    def update(self, index, data):
+        """ This function replaces the fields of an existing entry, on the
+        node the entry belongs on.
+
+        :param index: The index of the record to be updated
+        :param data: A dict of the new fields of the record
+
+        """
+
+        node = self.node_select(index)
+
+        if self.statements == 'plain':
+
+            update = self.update_statement.format(index=index, **data)
+
+            self.cursors[node].execute(update)
+
+        else:
+
+            self.execute(node, 'update', (
+                int(data['Number']), data['Info'], index,
+            ))
+
+        self.finish_write(node)
+
+    def preload(self, count, entry):
+        """ This function loads the entries with `COPY FROM STDIN`, which
+        streams the entries of every node over its own connection, with all
+        of the nodes loading at the same time.  Each table is then analyzed,
+        so that the reads are planned for its full size.  When
+        POSTGRESQL_RESET is 'keep', the entries are reused instead if the
+        table of every node already holds exactly the indexes the router
+        gives that node (by their count, lowest, highest and sum), and they
+        were loaded with the same payloads (by the fingerprint of the load).
+
+        :param count: The number of entries to load
+        :param entry: A function that returns the entry of an index
+
+        """
+
+        # The indexes are split between the nodes once, in a single pass
+        partition = self.router.partition(count)
+
+        fingerprint = self.fingerprint(count, entry)
+
+        if POSTGRESQL_RESET == 'keep':
+
+            kept = {}
+
+            self.for_each_node(self.inspect_node, kept)
+
+            if all(
+                kept[node] == (self.index_stats(partition[node]), fingerprint)
+                for node in kept
+            ):
+
+                return
+
+            # The kept entries are not those of this run
+            self.for_each_node(self.truncate_node)
+
+        self.for_each_node(self.copy_node, partition, entry, fingerprint)
+
+    def fingerprint(self, count, entry, samples=100):
+        """ Fingerprints a load by the number of entries and a sample of the
+        entries spread over all of the indexes, which differ with the length,
+        seed or pool of the payloads
+
+        :param count: The number of entries to load
+        :param entry: A function that returns the entry of an index
+        :param samples: The number of entries sampled
+
+        :return str fingerprint: A digest of the load
+        """
+
+        digest = hashlib.md5(str(count).encode())
+
+        for index in range(0, count, max(count // samples, 1)):
+
+            digest.update(self.copy_row.format(**entry(index)).encode())
+
+        return digest.hexdigest()
+
+    @staticmethod
+    def index_stats(indexes):
+        """ Sums up the (sorted) indexes that belong on a node the same way
+        `index_stats_statement` sums up those a table holds
+
+        :param indexes: The indexes of the node, from the router
+
+        :return tup stats: The count, lowest, highest and sum of the indexes
+        """
+
+        count = len(indexes)
+
+        if not count:
+
+            return 0, None, None, None
+
+        first = int(indexes[0])
+        last = int(indexes[-1])
+
+        if hasattr(indexes, 'sum'):
+
+            total = int(indexes.sum())
+
+        else:
+
+            # A range of consecutive indexes
+            total = (first + last) * count // 2
+
+        return count, first, last, total
+
+    def inspect_node(self, node, kept):
+        """ Sums up the indexes in the table of a node, and finds the
+        fingerprint of the load they came from
+
+        :param node: The node to inspect
+        :param kept: The dict the stats and fingerprint are added to, by node
+
+        """
+
+        self.cursors[node].execute(self.index_stats_statement)
+
+        stats = tuple(
+            None if value is None else int(value)
+            for value in self.cursors[node].fetchone()
+        )
+
+        self.cursors[node].execute(self.create_load_statement)
+        self.cursors[node].execute(self.select_load_statement)
+
+        row = self.cursors[node].fetchone()
+
+        kept[node] = (stats, row[0] if row else None)
+
+        self.commit(node)
+
+    def truncate_node(self, node):
+        """ Empties the table of a node
+
+        :param node: The node to empty
+
+        """
+
+        self.cursors[node].execute(self.truncate_statement)
+
+        self.commit(node)
+
+    def copy_node(self, node, partition, entry, fingerprint):
+        """ Loads the entries that belong on one node with a single COPY, and
+        records the fingerprint of the load
+
+        :param node: The node to load
+        :param partition: The indexes of every node, from the router
+        :param entry: A function that returns the entry of an index
+        :param fingerprint: The fingerprint of the load
+
+        """
+
+        rows = CopyStream(
+            self.copy_row.format(**entry(int(index)))
+            for index in partition[node]
+        )
+
+        self.cursors[node].copy_expert(
+            self.copy_statement, rows, size=POSTGRESQL_COPY_BUFFER,
+        )
+
+        self.cursors[node].execute(self.create_load_statement)
+        self.cursors[node].execute(self.clear_load_statement)
+        self.cursors[node].execute(self.insert_load_statement, (fingerprint,))
+
+        self.cursors[node].execute(self.analyze_statement)
+
+        self.commit(node)
+
+    def group_by_node(self, items, index_of):
+        """ Groups a batch of items by the node each one belongs on
+
+        :param items: The items to be grouped
+        :param index_of: A function that returns the index of an item
+
+        :return dict nodes: The items for each node
+        """
+
+        nodes = {}
+
+        for item in items:
+
+            node = self.node_select(index_of(item))
+
+            nodes.setdefault(node, []).append(item)
+
+        return nodes
+
     def node_select(self, trial):
+        """ Finds the node an entry is stored on, with the router chosen by
+        POSTGRESQL_ROUTER
+
+        :param trial: The index of the entry
+
+        :return node: The node the entry is stored on
         """
 
-        :param trial:
-        :return:
+        return self.router.node(trial)
+
+    def finish_write(self, node):
+        """ Commits a write on a node straight away, or with grouped commits
+        (`--commit-every`), leaves it for `commit_pending()`
+
+        :param node: The node the write was sent to
+        """
+
+        if self.group_commit:
+
+            self.pending.add(node)
+
+        else:
+
+            self.commit(node)
+
+    def commit_pending(self):
+        """ Commits the writes left uncommitted on every node, with grouped
+        commits.  This is timed by `main.py` as its own operation.
         """
 
-        node = 1
+        for node in sorted(self.pending):
 
-        for n in range(1, NUMBER_OF_NODES + 1):
+            self.commit(node)
+
+        self.pending.clear()
 
-            split = self.split_points.get(n)
+    def end_transaction(self):
+        """ Ends the transaction that the reads leave open on every node,
+        whose lock would otherwise block the TRUNCATE (or DROP) of the reset
+        of another client of a sweep
 
-            if split and trial <= split:
+        """
 
-                    node = n
+        for node in self.cursors:
 
-        return node
+            self.commit(node)
 
     def commit(self, node):
         """ Commits the current transaction.  This function is ONLY USED FOR
@@ -0,0 +1,377 @@
+"""
+DB Benchmarking Application
+===========================
+
+Rawdata.py
+
+This file houses the raw data of a run: one row for every operation, with its
+start time, latency, operation, key and node.  While the run is going, each
+worker appends its rows to typed arrays allocated up front.  Afterwards, every column is
+written as its own NumPy `.npy` file.  The files are loaded back memory-mapped,
+so analysing (or re-analysing) a run of millions of operations never reads
+more of the data into memory than it needs:
+
+    columns = load_raw_data('generated_reports/<title>/raw_data')
+    reads = columns['latency'][columns['operation'] == OPERATIONS.index('read')]
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+
+import os
+import csv
+
+import numpy as np
+
+from workload import OPERATIONS as WORKLOAD_OPERATIONS
+
+
+# The operation of each row is stored as its position in this list
+OPERATIONS = ['write'] + WORKLOAD_OPERATIONS
+
+# The columns of the raw data, as (name, NumPy dtype).  The times are integer
+# ns, `corrected` is the latency from the intended start time in open-loop
+# mode, and -1 stands for a value that is not known (e.g. the node of a
+# single-node DB).  Each row takes 36 bytes.
+COLUMNS = [
+    ('start', np.int64),
+    ('latency', np.int64),
+    ('corrected', np.int64),
+    ('operation', np.uint8),
+    ('key', np.int64),
+    ('node', np.int16),
+    ('warmup', np.bool_),
+]
+
+
+class RawLog():
+    """ The rows recorded by one worker, kept in typed NumPy arrays that are
+    allocated up front for the expected number of rows, so that recording a
+    row never allocates.  If more rows are recorded than expected, the arrays
+    are doubled in size.
+    """
+
+    def __init__(self, capacity=0):
+        """ __init__() allocates an array for every column.  The memory of an
+        array is only taken by the OS as rows are written to it, so a capacity
+        that turns out too large costs very little.
+
+        :param int capacity: the number of rows expected
+        """
+
+        self.length = 0
+
+        self.columns = dict(
+            (name, np.empty(capacity, dtype=dtype)) for name, dtype in COLUMNS
+        )
+
+    def __len__(self):
+
+        return self.length
+
+    def __getstate__(self):
+        """ Only the recorded rows are pickled (e.g. to be sent from a worker
+        process to the parent), not the unused capacity
+        """
+
+        return {'length': self.length, 'columns': self.arrays()}
+
+    def append(self, operation, start, latency, corrected=-1, key=-1,
+               node=-1, warmup=False):
+        """ Appends the row of a single operation
+
+        :param str operation: the operation, e.g. 'write' or 'read'
+        :param int start: the time (in ns) the operation was sent
+        :param int latency: the latency in ns
+        :param int corrected: the latency (in ns) from the intended start time
+        :param int key: the index of the entry the operation acted on
+        :param int node: the node of the DB the entry is stored on
+        :param bool warmup: True if the operation was part of a warmup
+        """
+
+        row = self.length
+
+        if row == len(self.columns['start']):
+
+            self.__grow(row + 1)
+
+        columns = self.columns
+
+        columns['start'][row] = start
+        columns['latency'][row] = latency
+        columns['corrected'][row] = corrected
+        columns['operation'][row] = OPERATIONS.index(operation)
+        columns['key'][row] = key
+        columns['node'][row] = node
+        columns['warmup'][row] = warmup
+
+        self.length = row + 1
+
+    def merge(self, other):
+        """ Appends every row of another log to this one
+
+        :param RawLog other: the log to be merged
+        """
+
+        length = self.length + len(other)
+
+        if length > len(self.columns['start']):
+
+            self.__grow(length)
+
+        rows = other.arrays()
+
+        for name, _ in COLUMNS:
+
+            self.columns[name][self.length:length] = rows[name]
+
+        self.length = length
+
+    def arrays(self):
+        """ :return dict arrays: a view of the recorded rows of every column,
+                    without copying them
+        """
+
+        return dict(
+            (name, self.columns[name][:self.length]) for name, _ in COLUMNS
+        )
+
+    def __grow(self, length):
+        """ Makes room for at least `length` rows, by at least doubling the
+        size of every array
+
+        :param int length: the number of rows needed
+        """
+
+        capacity = max(length, 2 * len(self.columns['start']), 1024)
+
+        for name, dtype in COLUMNS:
+
+            column = np.empty(capacity, dtype=dtype)
+            column[:self.length] = self.columns[name][:self.length]
+
+            self.columns[name] = column
+
+
+def write_raw_data(directory, logs, chunk_size=1000000):
+    """ Writes the rows of several logs into one `.npy` file per column, with
+    the rows in the order the operations were started.  The rows are copied
+    straight from the logs into the files.  If the rows of the workers are
+    interleaved, each column is first written to a scratch file and then
+    gathered from it in order, a chunk at a time, so that no column is ever
+    copied into memory whole.
+
+    :param str directory: the directory to write the files to
+    :param list logs: the `RawLog` of every worker
+    :param int chunk_size: the number of rows reordered at a time
+
+    :return dict columns: the columns, memory-mapped from the files
+    """
+
+    if not os.path.isdir(directory):
+
+        os.makedirs(directory)
+
+    parts = [log.arrays() for log in logs if len(log)]
+
+    length = sum(len(log) for log in logs)
+
+    # The rows of several workers are interleaved in time
+    order = None
+
+    if len(parts) > 1:
+
+        starts = np.concatenate([part['start'] for part in parts])
+
+        if np.any(starts[1:] < starts[:-1]):
+
+            order = np.argsort(starts, kind='mergesort')
+
+        del starts
+
+    for name, dtype in COLUMNS:
+
+        path = _column_path(directory, name)
+
+        column = _open_column(
+            path if order is None else path + '.unsorted', dtype, length,
+        )
+
+        low = 0
+
+        for part in parts:
+
+            column[low:low + len(part[name])] = part[name]
+
+            low += len(part[name])
+
+        if order is not None:
+
+            unsorted, column = column, _open_column(path, dtype, length)
+
+            for low in range(0, length, chunk_size):
+
+                column[low:low + chunk_size] = \
+                    unsorted[order[low:low + chunk_size]]
+
+            del unsorted
+
+            os.remove(path + '.unsorted')
+
+        column.flush()
+
+        del column
+
+    return load_raw_data(directory)
+
+
+def operation_rows(columns, operation):
+    """ Finds the rows of one operation.  When they are all next to each
+    other (e.g. the writes and reads of a split run), they are found as a
+    slice, so that the columns are only viewed instead of copied.
+
+    :param dict columns: the columns of the raw data
+    :param str operation: the operation, e.g. 'write' or 'read'
+
+    :return rows: a slice or a mask of the rows, to index the columns with
+    """
+
+    mask = columns['operation'] == OPERATIONS.index(operation)
+
+    count = int(np.count_nonzero(mask))
+
+    first = int(np.argmax(mask)) if count else 0
+
+    if mask[first:first + count].all():
+
+        return slice(first, first + count)
+
+    return mask
+
+
+def node_stats(columns, percentiles=(50, 99)):
+    """ Summarizes the operations sent to each node of the DB, so that the
+    skew of the keys between the nodes, and any node that is slower than the
+    others, can be seen.  The rows of a warmup are left out.
+
+    :param dict columns: the columns of the raw data
+    :param tup percentiles: the percentiles of latency to find for each node
+
+    :return list stats: a dict for every node and operation, in order of node,
+                with the count of operations, their share of the operation,
+                and their mean and percentiles of latency (in ns).  The list
+                is empty if the nodes were not recorded.
+    """
+
+    stats = []
+
+    for code, operation in enumerate(OPERATIONS):
+
+        rows = (columns['operation'] == code) & ~columns['warmup'] & \
+            (columns['node'] >= 0)
+
+        nodes = columns['node'][rows]
+
+        if not len(nodes):
+            continue
+
+        latencies = columns['latency'][rows]
+
+        # Grouped by sorting once, instead of a pass over the rows per node
+        order = np.argsort(nodes, kind='mergesort')
+        node_numbers, starts, counts = np.unique(
+            nodes[order], return_index=True, return_counts=True,
+        )
+
+        for node, start, count in zip(node_numbers, starts, counts):
+
+            node_latencies = latencies[order[start:start + count]]
+
+            stat = {
+                'node': int(node),
+                'operation': operation,
+                'count': int(count),
+                'share': float(count / len(nodes)),
+                'mean': float(node_latencies.mean()),
+            }
+
+            for percentile, value in zip(
+                    percentiles, np.percentile(node_latencies, percentiles)
+            ):
+
+                stat['p{percentile:g}'.format(percentile=percentile)] = \
+                    float(value)
+
+            stats.append(stat)
+
+    stats.sort(key=lambda stat: stat['node'])
+
+    return stats
+
+
+def load_raw_data(directory):
+    """ Loads the columns of the raw data written by `write_raw_data()`
+
+    :param str directory: the directory holding the files
+
+    :return dict columns: every column, memory-mapped from its file
+    """
+
+    return dict(
+        (name, np.load(_column_path(directory, name), mmap_mode='r'))
+        for name, _ in COLUMNS
+    )
+
+
+def export_csv(columns, path, unit=10 ** 9, chunk_size=100000):
+    """ Exports the raw data to a CSV file, a chunk of rows at a time, with
+    the times in seconds and the operations by name
+
+    :param dict columns: the columns of the raw data
+    :param str path: the path of the CSV file to write
+    :param int unit: the number of latency units (ns) in a second
+    :param int chunk_size: the number of rows converted at a time
+    """
+
+    names = [name for name, _ in COLUMNS]
+
+    first_start = columns['start'][0] if len(columns['start']) else 0
+
+    with open(path, 'w') as outfile:
+
+        writer = csv.writer(outfile)
+
+        writer.writerow(names)
+
+        for low in range(0, len(columns['start']), chunk_size):
+
+            chunk = dict(
+                (name, columns[name][low:low + chunk_size]) for name in names
+            )
+
+            writer.writerows(zip(
+                (chunk['start'] - first_start) / unit,
+                chunk['latency'] / unit,
+                ['' if corrected < 0 else corrected / unit
+                 for corrected in chunk['corrected']],
+                [OPERATIONS[code] for code in chunk['operation']],
+                chunk['key'],
+                chunk['node'],
+                chunk['warmup'].astype(int),
+            ))
+
+
+def _open_column(path, dtype, length):
+    """ :return memmap column: a new `.npy` file of a column, memory-mapped
+                for writing
+    """
+
+    return np.lib.format.open_memmap(
+        path, mode='w+', dtype=dtype, shape=(length,),
+    )
+
+
+def _column_path(directory, name):
+    """ :return str path: the path of the file of a column """
+
+    return os.path.join(directory, name + '.npy')
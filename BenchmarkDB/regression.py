@@ -0,0 +1,186 @@
+"""
+DB Benchmarking Application
+===========================
+
+Regression.py
+
+This file houses the regression gate of `--baseline`, which compares a run to
+an earlier one so that a nightly benchmark can fail when a change to the
+schema or driver makes the DB slower.  Every run saves its histograms and
+throughputs to `results.json` in its report directory, so any earlier report
+can serve as the baseline:
+
+    main.py postgreSQLdb nightly --baseline=generated_reports/last-night
+
+The p50 and p99 of each operation are compared with a bootstrap interval of
+their difference, so a change only counts as a regression when it is both
+larger than the threshold and significant.  The throughputs are single
+numbers, so they are only compared against the threshold.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+
+import os
+import json
+
+from histogram import LatencyHistogram
+from bootstrap import bootstrap_difference
+from timer import to_seconds
+
+
+# The name of the file each report saves its results to
+RESULTS_FILE = 'results.json'
+
+# The percentiles of latency that are compared with the baseline
+COMPARED_PERCENTILES = [50, 99]
+
+
+def save_results(reports_dir, histograms, throughputs):
+    """ Saves the results of a run that a later run can be compared with
+
+    :param str reports_dir: the report directory of the run
+    :param dict histograms: the `LatencyHistogram` of every buffer
+    :param dict throughputs: the throughput of every operation, e.g. 'writes'
+    """
+
+    results = {
+        'histograms': dict(
+            (name, histogram.to_dict())
+            for name, histogram in histograms.items()
+            if histogram.total_count
+        ),
+        'throughputs': throughputs,
+    }
+
+    with open(os.path.join(reports_dir, RESULTS_FILE), 'w') as outfile:
+
+        json.dump(results, outfile)
+
+
+def load_results(reports_dir):
+    """ Loads the results saved by `save_results()`
+
+    :param str reports_dir: the report directory of the earlier run
+
+    :return dict results: the `LatencyHistogram` of every buffer, and the
+                throughput of every operation
+    """
+
+    path = os.path.join(reports_dir, RESULTS_FILE)
+
+    if not os.path.exists(path):
+
+        raise ValueError('{path} does not exist, is {reports_dir} the report '
+                         'directory of a run?'.format(
+                             path=path,
+                             reports_dir=reports_dir,
+                         ))
+
+    with open(path, 'r') as infile:
+
+        results = json.load(infile)
+
+    results['histograms'] = dict(
+        (name, LatencyHistogram.from_dict(state))
+        for name, state in results['histograms'].items()
+    )
+
+    return results
+
+
+def find_regressions(baseline, histograms, throughputs, rows, threshold,
+                     resamples=1000, seed=None):
+    """ Compares the p50, p99 and throughput of every operation of a run to
+    the baseline.  A percentile has regressed when it is higher than the
+    baseline by more than the threshold, and the 95% bootstrap interval of
+    the difference is entirely above 0.  A throughput has regressed when it
+    is lower than the baseline by more than the threshold.
+
+    :param dict baseline: the results of the earlier run, from
+                `load_results()`
+    :param dict histograms: the `LatencyHistogram` of every buffer of the run
+    :param dict throughputs: the throughput of every operation of the run
+    :param list rows: the `(operation, buffer)` of every operation to compare,
+                e.g. `('writes', 'write_times')`
+    :param float threshold: the fraction a result may get worse by
+    :param int resamples: the number of bootstrap resamples
+    :param int seed: the seed of the random generator
+
+    :return list comparisons: a dict for every result that was compared, with
+                its operation, metric, baseline, current value, change,
+                interval and whether it regressed
+    """
+
+    comparisons = []
+
+    for operation, name in rows:
+
+        baseline_histogram = baseline['histograms'].get(name)
+        histogram = histograms.get(name)
+
+        if baseline_histogram is None or not histogram.total_count:
+            continue
+
+        for percentile in COMPARED_PERCENTILES:
+
+            before = baseline_histogram.percentile(percentile)
+            after = histogram.percentile(percentile)
+
+            interval = bootstrap_difference(
+                baseline_histogram,
+                histogram,
+                percentile=percentile,
+                resamples=resamples,
+                seed=seed,
+            )
+
+            change = _change(before, after)
+
+            significant = interval is not None and interval[0] > 0
+
+            comparisons.append({
+                'operation': operation,
+                'metric': 'p{percentile:g}'.format(percentile=percentile),
+                'baseline': to_seconds(before),
+                'current': to_seconds(after),
+                'change': change,
+                'interval': interval and (
+                    to_seconds(interval[0]), to_seconds(interval[1])
+                ),
+                'regression': bool(
+                    significant and change is not None and change > threshold
+                ),
+            })
+
+        before = baseline['throughputs'].get(operation)
+        after = throughputs.get(operation)
+
+        if before is None or after is None:
+            continue
+
+        change = _change(before, after)
+
+        comparisons.append({
+            'operation': operation,
+            'metric': 'ops/sec',
+            'baseline': before,
+            'current': after,
+            'change': change,
+            'interval': None,
+            'regression': change is not None and -change > threshold,
+        })
+
+    return comparisons
+
+
+def _change(before, after):
+    """ :return float change: the relative change from one result to another,
+                or None if the first is 0
+    """
+
+    if not before:
+
+        return None
+
+    return (after - before) / before
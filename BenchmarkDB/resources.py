@@ -0,0 +1,51 @@
+"""
+DB Benchmarking Application
+===========================
+
+Resources.py
+
+This file houses the measurements of the memory used by the benchmark itself,
+so that the report shows whether the harness (rather than the DB) was close to
+the limits of the machine it ran on.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+
+import sys
+
+try:
+
+    import resource
+
+except ImportError:
+
+    # Windows
+    resource = None
+
+
+def peak_rss(children=False):
+    """ Finds the peak resident set size (the most physical memory in use at
+    any one time) of this process, or of the largest of its child processes
+    that have exited
+
+    :param bool children: measure the child processes instead of this one
+
+    :return int peak: the peak resident set size in bytes, or None if it
+                cannot be measured on this platform
+    """
+
+    if resource is None:
+
+        return None
+
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+
+    peak = resource.getrusage(who).ru_maxrss
+
+    # Linux reports kilobytes, macOS reports bytes
+    if sys.platform != 'darwin':
+
+        peak *= 1024
+
+    return peak
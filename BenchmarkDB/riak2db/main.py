@@ -109,4 +109,23 @@ class Benchmark(BenchmarkDatabase):
 
         read_entry = self.bucket.get(str(index)).data
 
-        return read_entry
\ No newline at end of file
+        return read_entry
+
+    def read_many(self, indexes):
+        """ This function reads a whole batch of entries from Riak at once with
+        the client's multiget, which fetches the keys concurrently.  Riak has
+        no bulk write, so `write_many()` keeps the default of storing each
+        entry in turn.
+
+        :param indexes: The indexes of the entries to be read
+
+        :return read_entries: the entries that were just retrieved from Riak
+        """
+
+        keys = [str(index) for index in indexes]
+
+        read_entries = [
+            riak_object.data for riak_object in self.bucket.multiget(keys)
+        ]
+
+        return read_entries
\ No newline at end of file
@@ -0,0 +1,269 @@
+"""
+DB Benchmarking Application
+===========================
+
+Router.py
+
+This file houses the routers that decide which node of a sharded DB each
+entry is stored on, for the DB modules that split the entries between their
+nodes themselves (e.g. the PostgreSQL module).  Every router finds the node of
+an index in constant or logarithmic time, and only the range router depends
+on the number of entries:
+
+    hash        the index is hashed and taken modulo the number of nodes
+    consistent  the index is hashed onto a ring of virtual nodes, so that
+                adding a node only moves the entries of its neighbours
+    range       the indexes are split into equal, consecutive ranges, which
+                are looked up in a precomputed table
+
+    router = create_router('consistent', nodes=[1, 2, 3])
+    node = router.node(index)
+
+Each router can also partition the indexes between the nodes in a single
+vectorized pass, e.g. so that a bulk load can stream the entries of every node
+over its own connection:
+
+    partition = router.partition(count)
+    indexes = partition[node]
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+
+import bisect
+import hashlib
+
+import numpy as np
+
+from six.moves import range
+
+
+# The names of the routers, for `create_router()`
+ROUTERS = ['hash', 'consistent', 'range']
+
+# Fibonacci hashing spreads consecutive indexes evenly over 64 bits
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+HASH_MASK = 2 ** 64 - 1
+
+
+def hash_index(index):
+    """ :return int hash: a 64 bit hash of an integer index, which may also
+                be a NumPy integer (e.g. from `partition()`)
+    """
+
+    return (int(index) * HASH_MULTIPLIER) & HASH_MASK
+
+
+def hash_indexes(count):
+    """ :return ndarray hashes: the 64 bit hash of every index below `count`,
+                which is the same as that of `hash_index()`, since uint64
+                arithmetic wraps around
+    """
+
+    return np.arange(count, dtype=np.uint64) * np.uint64(HASH_MULTIPLIER)
+
+
+def split_positions(positions, nodes):
+    """ Splits the indexes between the nodes, given the position of the node
+    of every index.  A stable sort keeps the indexes of each node in order.
+
+    :param ndarray positions: the position in `nodes` of the node of every
+                index
+    :param list nodes: the nodes
+
+    :return dict partition: the indexes of every node, in order
+    """
+
+    order = np.argsort(positions, kind='mergesort')
+
+    bounds = np.cumsum(np.bincount(positions, minlength=len(nodes)))[:-1]
+
+    return dict(zip(nodes, np.split(order, bounds)))
+
+
+class HashRouter():
+    """ Routes each index to the node its hash falls on, modulo the number of
+    nodes.  This spreads the indexes evenly, but changing the number of nodes
+    moves almost every entry.
+    """
+
+    def __init__(self, nodes):
+        """ :param list nodes: the nodes to route to """
+
+        self.nodes = list(nodes)
+        self.node_count = len(self.nodes)
+
+    def node(self, index):
+        """ :return node: the node the entry with an index is stored on """
+
+        return self.nodes[(hash_index(index) >> 32) % self.node_count]
+
+    def partition(self, count):
+        """ :return dict partition: the indexes below `count` that are stored
+                    on each node, in order
+        """
+
+        positions = (hash_indexes(count) >> np.uint64(32)) % \
+            np.uint64(self.node_count)
+
+        return split_positions(positions.astype(np.intp), self.nodes)
+
+    def indexes(self, node, count):
+        """ :return iterable indexes: the indexes below `count` that are
+                    stored on a node, in order
+        """
+
+        return self.partition(count)[node]
+
+
+class ConsistentRouter():
+    """ Routes each index to the first virtual node at or after its hash on a
+    ring.  Each node owns many virtual nodes, so that the indexes are spread
+    evenly, and adding or removing a node only moves the entries it owns.
+    """
+
+    def __init__(self, nodes, virtual_nodes=100):
+        """ __init__() places every virtual node of every node on the ring.
+
+        :param list nodes: the nodes to route to
+        :param int virtual_nodes: the number of virtual nodes of each node
+        """
+
+        self.nodes = list(nodes)
+
+        points = sorted(
+            (self.__point(node, replica), node)
+            for node in self.nodes
+            for replica in range(virtual_nodes)
+        )
+
+        self.points = [point for point, _ in points]
+        self.owners = [node for _, node in points]
+
+        # The same ring as arrays, with the position in `nodes` of the owner
+        # of each point, for `partition()`
+        self.point_array = np.array(self.points, dtype=np.uint64)
+        self.owner_positions = np.array(
+            [self.nodes.index(node) for node in self.owners], dtype=np.intp,
+        )
+
+    def node(self, index):
+        """ :return node: the node the entry with an index is stored on """
+
+        position = bisect.bisect_left(self.points, hash_index(index))
+
+        # The ring wraps around past the last virtual node
+        return self.owners[position % len(self.owners)]
+
+    def partition(self, count):
+        """ :return dict partition: the indexes below `count` that are stored
+                    on each node, in order
+        """
+
+        positions = np.searchsorted(self.point_array, hash_indexes(count))
+
+        return split_positions(
+            self.owner_positions[positions % len(self.owners)], self.nodes,
+        )
+
+    def indexes(self, node, count):
+        """ :return iterable indexes: the indexes below `count` that are
+                    stored on a node, in order
+        """
+
+        return self.partition(count)[node]
+
+    @staticmethod
+    def __point(node, replica):
+        """ :return int point: the position of a virtual node on the ring """
+
+        digest = hashlib.md5(
+            '{node}-{replica}'.format(node=node, replica=replica).encode()
+        ).hexdigest()
+
+        return int(digest[:16], 16)
+
+
+class RangeRouter():
+    """ Routes each index to the node that owns its range of consecutive
+    indexes.  The indexes `0` to `record_count - 1` are split into one equal
+    range per node, and any index past them (e.g. an insert of a workload)
+    belongs to the last node.
+    """
+
+    def __init__(self, nodes, record_count):
+        """ __init__() builds the table of the first index past each range
+
+        :param list nodes: the nodes to route to
+        :param int record_count: the number of entries that are split
+        """
+
+        self.nodes = list(nodes)
+
+        range_size = record_count / len(self.nodes)
+
+        self.bounds = [
+            int(round(range_size * number))
+            for number in range(1, len(self.nodes))
+        ]
+
+    def node(self, index):
+        """ :return node: the node the entry with an index is stored on """
+
+        return self.nodes[bisect.bisect_right(self.bounds, index)]
+
+    def partition(self, count):
+        """ :return dict partition: the indexes below `count` that are stored
+                    on each node, which are a single range per node
+        """
+
+        return dict((node, self.indexes(node, count)) for node in self.nodes)
+
+    def indexes(self, node, count):
+        """ :return iterable indexes: the indexes below `count` that are
+                    stored on a node, which are a single range
+        """
+
+        position = self.nodes.index(node)
+
+        start = self.bounds[position - 1] if position else 0
+
+        if position < len(self.bounds):
+
+            stop = min(self.bounds[position], count)
+
+        else:
+
+            stop = count
+
+        return range(start, max(start, stop))
+
+
+def create_router(name, nodes, record_count=0, virtual_nodes=100):
+    """ Creates one of the routers by name
+
+    :param str name: the router, one of `ROUTERS`
+    :param list nodes: the nodes to route to
+    :param int record_count: the number of entries, for the range router
+    :param int virtual_nodes: the number of virtual nodes of each node, for
+                the consistent router
+
+    :return router: the router
+    """
+
+    if name == 'hash':
+
+        return HashRouter(nodes)
+
+    elif name == 'consistent':
+
+        return ConsistentRouter(nodes, virtual_nodes)
+
+    elif name == 'range':
+
+        return RangeRouter(nodes, record_count)
+
+    raise ValueError('The router must be one of {routers}, not {name!r}'.format(
+        routers=', '.join(ROUTERS),
+        name=name,
+    ))
@@ -0,0 +1,418 @@
+"""
+DB Benchmarking Application
+===========================
+
+Sweep.py
+
+This file houses the parameter sweep, which runs the benchmark once for every
+combination of a grid of parameters (e.g. every number of trials with every
+number of workers), so that the capacity of a DB can be planned from how its
+latency and throughput change with each parameter.  Every run keeps its own
+report, and the sweep adds a summary table and a plot of latency and of
+throughput against each parameter.
+
+The DB module is loaded once, and its clients are reset between runs instead
+of reconnecting.  Each finished run is saved to a checkpoint as soon as it is
+done, so a sweep that is interrupted picks up where it stopped when it is run
+again with the same title.
+
+    Usage:
+        sweep.py <database> <sweep_title> [options]
+        sweep.py --debug <sweep_title> [options]
+
+    Options:
+        -h --help               Show this help screen
+        --trials=<list>         Numbers of trials to sweep, e.g. 1000,10000
+                                    [default: 1000]
+        --length=<list>         Entry lengths to sweep [default: 10]
+        --workers=<list>        Numbers of workers to sweep [default: 1]
+        --concurrency=<list>    Numbers of async operations in flight to
+                                    sweep, instead of workers
+        --batch-size=<list>     Batch sizes to sweep [default: 1]
+        --commit-every=<list>   Numbers of writes per commit to sweep, e.g.
+                                    1,10,100 to compare per-row and grouped
+                                    commits
+        --options=<options>     Any other options of main.py, given to every
+                                    run, e.g. "--random --seed=7".  With
+                                    --headless, the sweep only writes
+                                    summary.csv, without the table or plots
+        --restart               Run every point again instead of resuming
+                                    from the checkpoint
+        --debug                 Generates random datasets instead of actually
+                                    connecting to a DB
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import csv
+import json
+import shlex
+import itertools
+
+from sys import exit
+from docopt import docopt
+
+import main
+from main import Benchmark, PERCENTILES
+from plots import import_pyplot
+
+
+# The parameters that can be swept, as (option, label)
+PARAMETERS = [
+    ('--trials', 'trials'),
+    ('--length', 'length'),
+    ('--workers', 'workers'),
+    ('--concurrency', 'concurrency'),
+    ('--batch-size', 'batch size'),
+    ('--commit-every', 'commit every'),
+]
+
+# The operations summarized for every run
+OPERATIONS = ['writes', 'reads', 'commits']
+
+
+class Sweep():
+    """ Runs the benchmark for every point of a grid of parameters, and
+    summarizes the results of all of them.
+    """
+
+    def __init__(self, options):
+        """ __init__() builds the grid of points from the user's options, and
+        loads the checkpoint of an earlier attempt at the same sweep.
+
+        :param dict options: the runtime options, as parsed by docopt
+        """
+
+        self.options = options
+
+        self.database = options.get('<database>')
+        self.title = options.get('<sweep_title>')
+
+        self.sweep_dir = 'generated_reports/{title}'.format(title=self.title)
+        self.checkpoint_path = self.sweep_dir + '/checkpoint.json'
+
+        try:
+
+            self.extra_options = shlex.split(options.get('--options') or '')
+
+            self.headless = '--headless' in self.extra_options
+
+            self.grid = [
+                (option, label, self.__parse_list(options.get(option)))
+                for option, label in PARAMETERS
+                if options.get(option)
+            ]
+
+        except ValueError as error:
+
+            exit('Error! {error}!'.format(error=error))
+
+        self.points = [
+            list(zip([option for option, _, _ in self.grid], values))
+            for values in itertools.product(
+                *[values for _, _, values in self.grid]
+            )
+        ]
+
+        # The clients of the DB module, which are kept from run to run
+        self.clients = []
+
+        self.results = {}
+
+        if not os.path.isdir(self.sweep_dir):
+
+            os.makedirs(self.sweep_dir)
+
+        if os.path.exists(self.checkpoint_path) and \
+                not options.get('--restart'):
+
+            with open(self.checkpoint_path, 'r') as infile:
+
+                self.results = json.load(infile)
+
+    def run(self):
+        """ Runs every point of the grid that has not been run yet, and then
+        writes the summary of the sweep
+        """
+
+        for number, point in enumerate(self.points, 1):
+
+            name = self.__point_name(point)
+
+            if name in self.results:
+
+                print('Skipping {name}, which is already done'.format(
+                    name=name,
+                ))
+
+                continue
+
+            print('Running point {number} of {total}: {name}'.format(
+                number=number,
+                total=len(self.points),
+                name=name,
+            ))
+
+            benchmark = Benchmark(
+                options=self.__run_options(point, name),
+                clients=self.clients,
+                reports_root=self.sweep_dir,
+            )
+            benchmark.setup()
+
+            self.results[name] = self.__summarize(point, benchmark)
+
+            self.__save_checkpoint()
+
+        self.generate_summary()
+
+    def generate_summary(self):
+        """ Writes the summary table of every point, and plots the latency and
+        throughput of every point against each of the parameters swept.  With
+        `--headless`, only the summary CSV is written.
+        """
+
+        rows = [self.results[self.__point_name(point)] for point in self.points]
+
+        columns = []
+
+        for row in rows:
+
+            columns += [column for column in row if column not in columns]
+
+        with open(self.sweep_dir + '/summary.csv', 'w') as outfile:
+
+            writer = csv.DictWriter(outfile, fieldnames=columns)
+
+            writer.writeheader()
+            writer.writerows(rows)
+
+        if self.headless:
+
+            print('\nThe summary was written to {path}'.format(
+                path=self.sweep_dir + '/summary.csv',
+            ))
+
+            return
+
+        # The table and plots need libraries that are slow to import, so they
+        # are only loaded here
+        import pandas as pd
+        from tabulate import tabulate
+
+        summary = pd.DataFrame(rows, columns=columns)
+
+        table = tabulate(
+            tabular_data=summary.values.tolist(),
+            headers=list(summary.columns),
+            tablefmt='grid',
+            floatfmt='.5f',
+        )
+
+        table_md = tabulate(
+            tabular_data=summary.values.tolist(),
+            headers=list(summary.columns),
+            tablefmt='pipe',
+            floatfmt='.5f',
+        )
+
+        print('\n\n' + table + '\n\n')
+
+        with open(self.sweep_dir + '/summary.md', 'w+') as outfile:
+
+            outfile.write('SWEEP SUMMARY - {title}\n'.format(title=self.title))
+            outfile.write('=========================================\n\n')
+            outfile.write(table_md + '\n')
+
+        for option, label, values in self.grid:
+
+            if len(values) < 2:
+                continue
+
+            self.__plot_against(summary, label, 'p99', 'Latency (s)')
+            self.__plot_against(summary, label, 'ops/sec', 'Operations / s')
+
+    def __plot_against(self, summary, label, metric, y_label):
+        """ Plots one metric of every operation against one parameter, with a
+        line for every combination of the other parameters
+
+        :param DataFrame summary: the summary of every point
+        :param str label: the label of the parameter, e.g. 'workers'
+        :param str metric: the metric to plot, e.g. 'p99'
+        :param str y_label: the label of the y axis
+        """
+
+        others = [
+            other for _, other, values in self.grid
+            if other != label and len(values) > 1
+        ]
+
+        columns = [
+            '{operation} {metric}'.format(operation=operation, metric=metric)
+            for operation in OPERATIONS
+        ]
+
+        plot_data = summary.pivot_table(
+            index=label,
+            columns=others or None,
+            values=[column for column in columns if column in summary],
+        )
+
+        # Each line is labelled e.g. `reads p99, trials=1000`
+        plot_data.columns = [
+            ', '.join([column[0]] + [
+                '{other}={value}'.format(other=other, value=value)
+                for other, value in zip(others, column[1:])
+            ])
+            for column in [
+                column if isinstance(column, tuple) else (column,)
+                for column in plot_data.columns
+            ]
+        ]
+
+        plt = import_pyplot()
+
+        plt.figure()
+
+        ax = plot_data.plot(
+            title='{metric} against {label}'.format(
+                metric=metric,
+                label=label,
+            ),
+            marker='o',
+            legend=True,
+        )
+
+        ax.set_xticks(plot_data.index)
+        ax.set_xlabel(label)
+        ax.set_ylabel(y_label)
+
+        plt.savefig('{parent_dir}/{metric}-{label}.png'.format(
+            parent_dir=self.sweep_dir,
+            metric=metric.replace('/', '-per-'),
+            label=label.replace(' ', '-'),
+        ))
+
+        plt.close('all')
+
+    def __run_options(self, point, name):
+        """ Builds the options of one run, exactly as docopt would parse them
+        from the command line of `main.py`
+
+        :param list point: the (option, value) of every parameter of the run
+        :param str name: the name of the run, which is also its report title
+
+        :return dict options: the options of the run
+        """
+
+        argv = []
+
+        if self.options.get('--debug'):
+
+            argv += ['--debug']
+
+        else:
+
+            argv += [self.database, name]
+
+        argv += [
+            '{option}={value}'.format(option=option, value=value)
+            for option, value in point
+        ]
+
+        argv += self.extra_options
+
+        return docopt(main.__doc__, argv=argv)
+
+    def __summarize(self, point, benchmark):
+        """ Picks out the results of one run that are shown in the summary
+
+        :param list point: the (option, value) of every parameter of the run
+        :param Benchmark benchmark: the benchmark that ran the point
+
+        :return dict result: the parameters and results of the run
+        """
+
+        compiled_data = benchmark.compiled_data
+
+        result = dict(
+            (label, value)
+            for (_, label, _), (_, value) in zip(self.grid, point)
+        )
+
+        metrics = dict(compiled_data.get('operation_metrics'))
+        percentiles = dict(compiled_data.get('percentiles'))
+
+        for operation in OPERATIONS:
+
+            if operation not in metrics:
+                continue
+
+            values = dict(zip(PERCENTILES, percentiles.get(operation)))
+
+            result.update({
+                operation + ' ops/sec': metrics[operation].get('throughput'),
+                operation + ' mean': metrics[operation].get('avg'),
+                operation + ' p50': values.get(50),
+                operation + ' p99': values.get(99),
+                operation + ' p99.9': values.get(99.9),
+            })
+
+        result.update(report=benchmark.reports_dir)
+
+        return result
+
+    def __save_checkpoint(self):
+        """ Saves the results of every finished run.  The checkpoint is
+        written to a new file that then replaces the old one, so it is never
+        left half written.
+        """
+
+        temporary_path = self.checkpoint_path + '.tmp'
+
+        with open(temporary_path, 'w') as outfile:
+
+            json.dump(self.results, outfile, indent=2, sort_keys=True)
+
+        os.rename(temporary_path, self.checkpoint_path)
+
+    @staticmethod
+    def __point_name(point):
+        """ :return str name: the name of a point, e.g.
+                    `trials-1000_workers-4`
+        """
+
+        return '_'.join(
+            '{option}-{value}'.format(option=option.lstrip('-'), value=value)
+            for option, value in point
+        )
+
+    @staticmethod
+    def __parse_list(values):
+        """ Parses a comma-separated list of whole numbers
+
+        :param str values: the list to parse, e.g. `1,2,4`
+
+        :return list values: the numbers of the list
+        """
+
+        try:
+
+            return [int(value) for value in str(values).split(',')]
+
+        except ValueError:
+
+            raise ValueError('The values to sweep must be comma-separated '
+                             'whole numbers, not {values!r}'.format(
+                                 values=values,
+                             ))
+
+
+if __name__ == '__main__':
+
+    doc_opt = docopt(__doc__)
+
+    Sweep(doc_opt).run()
@@ -0,0 +1,90 @@
+"""
+DB Benchmarking Application
+===========================
+
+Test_bootstrap.py
+
+Tests of the coverage of the bootstrap intervals.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+
+import unittest
+
+import numpy as np
+
+from bootstrap import bootstrap_difference, bootstrap_intervals
+from histogram import LatencyHistogram
+
+
+def histogram_of(values):
+    """ :return LatencyHistogram histogram: a histogram of some values """
+
+    histogram = LatencyHistogram(3)
+    histogram.record_many(values)
+
+    return histogram
+
+
+class BootstrapTest(unittest.TestCase):
+
+    def test_mean_coverage(self):
+        """ About 95% of the intervals of the mean hold the true mean """
+
+        random_state = np.random.RandomState(1)
+
+        covered = 0
+
+        for run in range(200):
+
+            values = random_state.exponential(10 ** 6, size=500)
+
+            low, high = bootstrap_intervals(
+                histogram_of(values), resamples=500, seed=run,
+            )['mean']
+
+            covered += low <= 10 ** 6 <= high
+
+        self.assertTrue(0.88 <= covered / 200 <= 0.99, covered)
+
+    def test_percentile_interval(self):
+
+        values = np.random.RandomState(2).exponential(10 ** 6, size=20000)
+
+        low, high = bootstrap_intervals(histogram_of(values), seed=1)[
+            'percentile'
+        ]
+
+        # The true p99 of the exponential distribution
+        p99 = -10 ** 6 * np.log(0.01)
+
+        self.assertTrue(low < high)
+        self.assertTrue(low * 0.95 <= p99 <= high * 1.05)
+
+    def test_too_few_values(self):
+
+        intervals = bootstrap_intervals(histogram_of([5]))
+
+        self.assertEqual(intervals, {'mean': None, 'percentile': None})
+
+    def test_difference(self):
+
+        random_state = np.random.RandomState(3)
+
+        baseline = histogram_of(random_state.exponential(10 ** 6, size=5000))
+        same = histogram_of(random_state.exponential(10 ** 6, size=5000))
+        slower = histogram_of(random_state.exponential(2 * 10 ** 6, size=5000))
+
+        low, high = bootstrap_difference(baseline, same, percentile=50, seed=1)
+
+        self.assertTrue(low <= 0 <= high)
+
+        low, high = bootstrap_difference(baseline, slower, percentile=50,
+                                         seed=1)
+
+        self.assertGreater(low, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
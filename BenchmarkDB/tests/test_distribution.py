@@ -0,0 +1,97 @@
+"""
+DB Benchmarking Application
+===========================
+
+Test_distribution.py
+
+Tests of the range and skew of the key distributions.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+
+import unittest
+
+import numpy as np
+
+from distribution import KeyDistribution
+
+
+class KeyDistributionTest(unittest.TestCase):
+
+    def sample(self, name, count=100000, item_count=1000, **params):
+        """ :return ndarray counts: the number of times each key was drawn """
+
+        keys = KeyDistribution(name, item_count, seed=1, **params).sample(count)
+
+        self.assertTrue(keys.min() >= 0 and keys.max() < item_count, name)
+
+        return np.bincount(keys, minlength=item_count)
+
+    def test_uniform(self):
+
+        counts = self.sample('uniform')
+
+        self.assertLess(counts.max() / counts.mean(), 1.5)
+
+    def test_zipfian_skew(self):
+        """ The popularity of key k falls as 1 / (k + 1) ** theta """
+
+        counts = self.sample('zipfian', count=200000)
+
+        self.assertEqual(int(counts.argmax()), 0)
+
+        self.assertAlmostEqual(counts[0] / counts[1], 2 ** 0.99, delta=0.15)
+
+        # The most popular 10% of the keys get most of the operations
+        self.assertGreater(counts[:100].sum() / counts.sum(), 0.6)
+
+    def test_zipfian_without_skew(self):
+
+        counts = self.sample('zipfian', theta=0)
+
+        self.assertLess(counts.max() / counts.mean(), 1.5)
+
+    def test_scrambled_zipfian(self):
+        """ The popular keys are spread out, but just as popular """
+
+        scrambled = np.sort(self.sample('scrambled-zipfian'))[::-1]
+        zipfian = np.sort(self.sample('zipfian'))[::-1]
+
+        self.assertLess(abs(scrambled[:100].sum() - zipfian[:100].sum()),
+                        0.05 * zipfian.sum())
+
+    def test_latest(self):
+
+        counts = self.sample('latest')
+
+        self.assertEqual(int(counts.argmax()), 999)
+
+    def test_hotspot(self):
+
+        counts = self.sample('hotspot', hot_keys=0.1, hot_ops=0.9)
+
+        self.assertAlmostEqual(counts[:100].sum() / counts.sum(), 0.9,
+                               delta=0.01)
+
+    def test_seed(self):
+
+        first = KeyDistribution('zipfian', 1000, seed=7).sample(100)
+        second = KeyDistribution('zipfian', 1000, seed=7).sample(100)
+
+        self.assertEqual(list(first), list(second))
+
+    def test_invalid(self):
+
+        for name, item_count, params in [('gaussian', 10, {}),
+                                         ('uniform', 0, {}),
+                                         ('zipfian', 10, {'theta': 1}),
+                                         ('hotspot', 10, {'hot_keys': 0})]:
+
+            with self.assertRaises(ValueError):
+
+                KeyDistribution(name, item_count, **params)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+"""
+DB Benchmarking Application
+===========================
+
+Test_histogram.py
+
+Tests of the bucket indexing, percentiles and merging of `LatencyHistogram`.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+
+import math
+import unittest
+
+import numpy as np
+
+from histogram import LatencyHistogram
+
+
+class LatencyHistogramTest(unittest.TestCase):
+
+    def test_counts_index(self):
+        """ With 3 significant digits, the values below 2048 have a bucket
+        each, and every bucket after that is twice as wide as the last
+        """
+
+        histogram = LatencyHistogram(3)
+
+        counts_index = histogram._LatencyHistogram__counts_index
+
+        for value, index in [(0, 0), (1, 1), (2047, 2047), (2048, 2048),
+                             (2049, 2048), (4095, 3071), (4096, 3072),
+                             (4099, 3072), (4100, 3073)]:
+
+            self.assertEqual(counts_index(value), index, value)
+
+    def test_bucket_bounds(self):
+
+        histogram = LatencyHistogram(3)
+
+        histogram.record(4097)
+
+        values, counts = histogram.buckets()
+
+        # The bucket of 4097 holds 4096 to 4099
+        self.assertEqual(values, [4097.5])
+        self.assertEqual(counts, [1])
+
+    def test_exact_percentiles(self):
+
+        histogram = LatencyHistogram(3)
+
+        for value in range(1, 1001):
+
+            histogram.record(value)
+
+        self.assertEqual(histogram.percentiles([0, 50, 99, 100]),
+                         [1, 500, 990, 1000])
+
+    def test_percentile_precision(self):
+
+        histogram = LatencyHistogram(3)
+
+        values = np.random.RandomState(1).randint(1, 10 ** 9, size=10000)
+
+        histogram.record_many(values)
+
+        ordered = np.sort(values)
+
+        for percentile in [50, 90, 99, 99.9]:
+
+            # The nearest-rank percentile, which is what the histogram finds
+            expected = ordered[int(math.ceil(percentile / 100 * len(values))) - 1]
+
+            actual = histogram.percentile(percentile)
+
+            self.assertLess(abs(actual - expected) / expected, 2e-3)
+
+    def test_record_many_matches_record(self):
+
+        values = np.random.RandomState(2).randint(0, 10 ** 10, size=5000)
+
+        one_by_one = LatencyHistogram(2)
+
+        for value in values:
+
+            one_by_one.record(value)
+
+        at_once = LatencyHistogram(2)
+        at_once.record_many(values)
+
+        self.assertEqual(list(at_once.counts), list(one_by_one.counts))
+
+        for name in ['total_count', 'total', 'total_squares', 'min', 'max']:
+
+            self.assertEqual(getattr(at_once, name), getattr(one_by_one, name))
+
+    def test_exact_mean_and_stdev(self):
+
+        values = np.random.RandomState(3).randint(0, 10 ** 6, size=1000)
+
+        histogram = LatencyHistogram(1)
+        histogram.record_many(values)
+
+        self.assertAlmostEqual(histogram.mean(), values.mean(), places=6)
+        self.assertAlmostEqual(histogram.stdev(), values.std(ddof=1), places=6)
+
+    def test_merge(self):
+
+        first = LatencyHistogram(3)
+        second = LatencyHistogram(3)
+        both = LatencyHistogram(3)
+
+        for value in [5, 50, 500]:
+
+            first.record(value)
+            both.record(value)
+
+        for value in [7, 70000, 7 * 10 ** 9]:
+
+            second.record(value)
+            both.record(value)
+
+        first.merge(second)
+
+        self.assertEqual(list(first.counts), list(both.counts))
+        self.assertEqual(first.total_count, 6)
+        self.assertEqual((first.min, first.max), (5, 7 * 10 ** 9))
+
+        with self.assertRaises(ValueError):
+
+            first.merge(LatencyHistogram(4))
+
+    def test_dict_round_trip(self):
+
+        histogram = LatencyHistogram(3)
+        histogram.record_many([1, 10, 100, 10 ** 6, 10 ** 9])
+
+        copy = LatencyHistogram.from_dict(histogram.to_dict())
+
+        self.assertEqual(list(copy.counts), list(histogram.counts))
+        self.assertEqual(copy.percentiles([50, 99]),
+                         histogram.percentiles([50, 99]))
+
+    def test_empty(self):
+
+        histogram = LatencyHistogram(3)
+
+        histogram.record_many([])
+
+        self.assertIsNone(histogram.mean())
+        self.assertEqual(histogram.percentiles([50, 99]), [None, None])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+DB Benchmarking Application
+===========================
+
+Test_payload.py
+
+Tests of the lengths, contents and reuse of the pre-generated payloads.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+
+import string
+import unittest
+
+from payload import PayloadPool
+
+
+class PayloadPoolTest(unittest.TestCase):
+
+    def test_fixed_length(self):
+
+        pool = PayloadPool(size=100, length=12, seed=1)
+
+        for index in range(100):
+
+            entry = pool.entry(index)
+
+            self.assertEqual(sorted(entry), ['Info', 'Number'])
+            self.assertEqual(len(entry['Number']), 12)
+            self.assertEqual(len(entry['Info']), 12)
+            self.assertTrue(set(entry['Number']) <= set(string.digits))
+            self.assertTrue(set(entry['Info']) <= set(string.ascii_letters))
+
+    def test_variable_length(self):
+
+        pool = PayloadPool(size=1000, length=10, min_length=1, seed=1)
+
+        lengths = set(
+            len(pool.entry(index)['Info']) for index in range(1000)
+        )
+
+        self.assertEqual(lengths, set(range(1, 11)))
+
+    def test_entries_are_reused(self):
+        """ Indexes past the end of the pool wrap around to its start """
+
+        pool = PayloadPool(size=10, length=5, seed=1)
+
+        self.assertEqual(pool.entry(3), pool.entry(13))
+        self.assertNotEqual(pool.entry(3), pool.entry(4))
+
+    def test_seed(self):
+
+        first = PayloadPool(size=50, length=8, seed=7)
+        second = PayloadPool(size=50, length=8, seed=7)
+
+        self.assertEqual(
+            [first.entry(index) for index in range(50)],
+            [second.entry(index) for index in range(50)],
+        )
+
+    def test_stats(self):
+
+        stats = PayloadPool(size=100, length=10, seed=1).stats()
+
+        self.assertEqual(stats['size'], 100)
+        self.assertEqual(stats['nbytes'], 2 * 100 * 10)
+
+    def test_invalid(self):
+
+        for size, length, min_length in [(0, 10, None), (10, 0, None),
+                                         (10, 10, 0), (10, 10, 11)]:
+
+            with self.assertRaises(ValueError):
+
+                PayloadPool(size, length, min_length)
+
+
+if __name__ == '__main__':
+    unittest.main()
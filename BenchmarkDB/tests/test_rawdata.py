@@ -0,0 +1,172 @@
+"""
+DB Benchmarking Application
+===========================
+
+Test_rawdata.py
+
+Tests of writing, loading and selecting the columns of the raw data.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from rawdata import COLUMNS, RawLog, export_csv, load_raw_data, \
+    operation_rows, write_raw_data
+
+
+class RawDataTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+
+        log = RawLog(4)
+
+        log.append('write', 100, 5, key=0, node=1)
+        log.append('read', 200, 7, corrected=9, key=3, warmup=True)
+
+        columns = write_raw_data(self.directory, [log])
+
+        self.assertEqual(sorted(columns), sorted(name for name, _ in COLUMNS))
+        self.assertEqual(list(columns['start']), [100, 200])
+        self.assertEqual(list(columns['latency']), [5, 7])
+        self.assertEqual(list(columns['corrected']), [-1, 9])
+        self.assertEqual(list(columns['key']), [0, 3])
+        self.assertEqual(list(columns['node']), [1, -1])
+        self.assertEqual(list(columns['warmup']), [False, True])
+
+        loaded = load_raw_data(self.directory)
+
+        self.assertEqual(list(loaded['operation']),
+                         list(columns['operation']))
+
+    def test_empty(self):
+
+        columns = write_raw_data(self.directory, [RawLog()])
+
+        self.assertEqual(len(columns['start']), 0)
+
+    def test_operation_rows(self):
+        """ Rows next to each other are found as a slice, and others as a
+        mask
+        """
+
+        log = RawLog()
+
+        for start, operation in enumerate(['write', 'write', 'read', 'read']):
+
+            log.append(operation, start, 1)
+
+        columns = write_raw_data(self.directory, [log])
+
+        self.assertEqual(operation_rows(columns, 'read'), slice(2, 4))
+        self.assertEqual(operation_rows(columns, 'update'), slice(0, 0))
+
+        log = RawLog()
+
+        for start, operation in enumerate(['write', 'read', 'write']):
+
+            log.append(operation, start, 1)
+
+        columns = write_raw_data(self.directory, [log])
+
+        rows = operation_rows(columns, 'write')
+
+        self.assertEqual(list(rows), [True, False, True])
+        self.assertEqual(list(columns['start'][rows]), [0, 2])
+
+    def test_export_csv(self):
+
+        log = RawLog()
+
+        log.append('write', 10 ** 9, 2 * 10 ** 9)
+        log.append('read', 3 * 10 ** 9, 10 ** 9, corrected=2 * 10 ** 9)
+
+        columns = write_raw_data(self.directory, [log])
+
+        path = os.path.join(self.directory, 'raw_data.csv')
+
+        export_csv(columns, path, chunk_size=1)
+
+        with open(path) as infile:
+
+            rows = list(csv.reader(infile))
+
+        self.assertEqual(rows[0], [name for name, _ in COLUMNS])
+        self.assertEqual(
+            [row[:4] for row in rows[1:]],
+            [['0.0', '2.0', '', 'write'], ['2.0', '1.0', '2.0', 'read']],
+        )
+
+
+    def test_log_grows(self):
+        """ A log holds more rows than its capacity, and only the recorded
+        rows are merged or pickled
+        """
+
+        log = RawLog(2)
+
+        for start in range(5000):
+
+            log.append('write', start, start)
+
+        other = RawLog(1)
+        other.append('read', 5000, 1)
+
+        log.merge(other)
+
+        self.assertEqual(len(log), 5001)
+        self.assertEqual(list(log.arrays()['start']), list(range(5001)))
+        self.assertEqual(len(log.__getstate__()['columns']['start']), 5001)
+
+    def test_interleaved_logs_are_ordered(self):
+        """ The rows of several workers are gathered in the order they were
+        started, a chunk at a time, without leaving the scratch files
+        """
+
+        random_state = np.random.RandomState(1)
+
+        logs = []
+
+        for worker in range(3):
+
+            log = RawLog()
+
+            starts = np.cumsum(random_state.randint(1, 100, size=1000))
+
+            for start in starts:
+
+                log.append('write', start, worker, key=worker)
+
+            logs.append(log)
+
+        columns = write_raw_data(self.directory, logs, chunk_size=333)
+
+        self.assertTrue(np.all(np.diff(columns['start']) >= 0))
+        self.assertEqual(list(np.bincount(columns['key'])), [1000] * 3)
+
+        # The columns of each row stay together
+        self.assertEqual(list(columns['latency']), list(columns['key']))
+
+        self.assertEqual(
+            sorted(os.listdir(self.directory)),
+            sorted(name + '.npy' for name, _ in COLUMNS),
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+"""
+DB Benchmarking Application
+===========================
+
+Test_regression.py
+
+Tests of the regression gate of `--baseline`.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from histogram import LatencyHistogram
+from regression import find_regressions, load_results, save_results
+
+
+ROWS = [('writes', 'write_times')]
+
+
+def results_of(scale, throughput, seed):
+    """ :return dict results: the results of a run with latencies around
+                `scale` ns
+    """
+
+    histogram = LatencyHistogram(3)
+    histogram.record_many(
+        np.random.RandomState(seed).normal(scale, scale / 20, size=5000)
+    )
+
+    return {
+        'histograms': {'write_times': histogram},
+        'throughputs': {'writes': throughput},
+    }
+
+
+class RegressionTest(unittest.TestCase):
+
+    def compare(self, current, threshold=0.1):
+        """ :return dict regressions: whether each metric regressed against
+                    a baseline around 1 ms at 1000 ops/sec
+        """
+
+        baseline = results_of(10 ** 6, 1000.0, seed=1)
+
+        comparisons = find_regressions(
+            baseline,
+            current['histograms'],
+            current['throughputs'],
+            ROWS,
+            threshold,
+            resamples=200,
+            seed=1,
+        )
+
+        return dict(
+            (comparison['metric'], comparison['regression'])
+            for comparison in comparisons
+        )
+
+    def test_no_change(self):
+
+        self.assertEqual(
+            self.compare(results_of(10 ** 6, 1000.0, seed=2)),
+            {'p50': False, 'p99': False, 'ops/sec': False},
+        )
+
+    def test_change_within_threshold(self):
+        """ A significant change that is smaller than the threshold passes """
+
+        self.assertEqual(
+            self.compare(results_of(1.05 * 10 ** 6, 950.0, seed=2)),
+            {'p50': False, 'p99': False, 'ops/sec': False},
+        )
+
+    def test_regression(self):
+
+        self.assertEqual(
+            self.compare(results_of(1.5 * 10 ** 6, 800.0, seed=2)),
+            {'p50': True, 'p99': True, 'ops/sec': True},
+        )
+
+        self.assertEqual(
+            self.compare(results_of(1.5 * 10 ** 6, 800.0, seed=2),
+                         threshold=0.6),
+            {'p50': False, 'p99': False, 'ops/sec': False},
+        )
+
+    def test_improvement(self):
+
+        self.assertEqual(
+            self.compare(results_of(0.5 * 10 ** 6, 2000.0, seed=2)),
+            {'p50': False, 'p99': False, 'ops/sec': False},
+        )
+
+    def test_save_and_load(self):
+
+        reports_dir = tempfile.mkdtemp()
+
+        try:
+
+            results = results_of(10 ** 6, 1000.0, seed=1)
+
+            save_results(reports_dir, results['histograms'],
+                         results['throughputs'])
+
+            loaded = load_results(reports_dir)
+
+            self.assertEqual(loaded['throughputs'], {'writes': 1000.0})
+            self.assertEqual(
+                loaded['histograms']['write_times'].percentiles([50, 99]),
+                results['histograms']['write_times'].percentiles([50, 99]),
+            )
+
+            with self.assertRaises(ValueError):
+
+                load_results(reports_dir + '/missing')
+
+        finally:
+
+            shutil.rmtree(reports_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+DB Benchmarking Application
+===========================
+
+Test_router.py
+
+Tests that every router splits the indexes completely and consistently between
+the nodes.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+
+import unittest
+
+from router import ROUTERS, create_router
+
+
+NODES = [1, 2, 3]
+
+
+class RouterTest(unittest.TestCase):
+
+    def test_partition_is_complete(self):
+        """ Every index below the count is listed for exactly one node, which
+        is the node it is routed to
+        """
+
+        for name in ROUTERS:
+
+            router = create_router(name, NODES, record_count=1000)
+
+            seen = []
+
+            for node in NODES:
+
+                indexes = list(router.indexes(node, 1000))
+
+                self.assertEqual(indexes, sorted(indexes), name)
+
+                for index in indexes:
+
+                    self.assertEqual(router.node(index), node, name)
+
+                seen += indexes
+
+            self.assertEqual(sorted(seen), list(range(1000)), name)
+
+    def test_spread(self):
+        """ No node gets much more than its fair share of the indexes """
+
+        for name in ROUTERS:
+
+            router = create_router(name, NODES, record_count=30000)
+
+            for node in NODES:
+
+                share = len(list(router.indexes(node, 30000))) / 30000
+
+                self.assertLess(abs(share - 1 / len(NODES)), 0.05, name)
+
+    def test_range_router(self):
+
+        router = create_router('range', NODES, record_count=10)
+
+        self.assertEqual([router.node(index) for index in range(12)],
+                         [1, 1, 1, 2, 2, 2, 2, 3, 3, 3, 3, 3])
+
+        # Indexes past the entries (e.g. inserts) belong to the last node
+        self.assertEqual(router.node(10 ** 6), 3)
+
+        self.assertEqual(list(router.indexes(2, 5)), [3, 4])
+        self.assertEqual(list(router.indexes(3, 5)), [])
+
+    def test_consistent_router_moves_few_entries(self):
+        """ Adding a fourth node only moves the entries it takes over """
+
+        before = create_router('consistent', NODES)
+        after = create_router('consistent', NODES + [4])
+
+        moved = [
+            index for index in range(10000)
+            if before.node(index) != after.node(index)
+        ]
+
+        self.assertTrue(all(after.node(index) == 4 for index in moved))
+        self.assertLess(len(moved), 10000 * 0.4)
+
+    def test_unknown_router(self):
+
+        with self.assertRaises(ValueError):
+
+            create_router('random', NODES)
+
+
+if __name__ == '__main__':
+    unittest.main()
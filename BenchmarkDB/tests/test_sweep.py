@@ -0,0 +1,177 @@
+"""
+DB Benchmarking Application
+===========================
+
+Test_sweep.py
+
+Tests of the parameter sweep, run against a stand-in DB module whose clients
+are kept from one point to the next.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from docopt import docopt
+
+import sweep
+
+
+# A DB module that keeps its entries in memory.  Like a SQL DB, a read leaves
+# a transaction open, and a reset cannot go ahead (it would block forever)
+# while any other client holds one.
+LOCK_MODULE = '''
+from benchmark_template import BenchmarkDatabase
+
+ENTRIES = {}
+OPEN_TRANSACTIONS = set()
+RUNS = []
+
+
+class Benchmark(BenchmarkDatabase):
+
+    def setup(self, collection):
+
+        RUNS.append(self.trials)
+
+        ENTRIES.clear()
+
+    def reset(self, collection, trials=0):
+
+        if OPEN_TRANSACTIONS - set([id(self)]):
+
+            raise RuntimeError('The reset is blocked by an open transaction')
+
+        self.trials = trials
+
+        self.setup(collection)
+
+    def write(self, data):
+
+        ENTRIES[data['Index']] = data
+
+    def read(self, index):
+
+        OPEN_TRANSACTIONS.add(id(self))
+
+        return ENTRIES.get(index)
+
+    def end_transaction(self):
+
+        OPEN_TRANSACTIONS.discard(id(self))
+'''
+
+
+class SweepTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.cwd = os.getcwd()
+        self.directory = tempfile.mkdtemp()
+
+        module_dir = os.path.join(self.directory, 'lockdb')
+
+        os.makedirs(module_dir)
+
+        for name, source in [('__init__.py', ''),
+                             ('main.py', LOCK_MODULE),
+                             ('local.py', 'NUMBER_OF_NODES = 1\n')]:
+
+            with open(os.path.join(module_dir, name), 'w') as outfile:
+
+                outfile.write(source)
+
+        sys.path.insert(0, self.directory)
+        os.chdir(self.directory)
+
+    def tearDown(self):
+
+        os.chdir(self.cwd)
+        sys.path.remove(self.directory)
+
+        for name in ['lockdb', 'lockdb.main', 'lockdb.local']:
+
+            sys.modules.pop(name, None)
+
+        shutil.rmtree(self.directory)
+
+    def sweep(self, *argv):
+        """ :return Sweep sweep: a sweep of the stand-in module, which has
+                    been run
+        """
+
+        options = docopt(sweep.__doc__, argv=[
+            'lockdb', 'test', '--options=--headless --seed=1',
+        ] + list(argv))
+
+        runner = sweep.Sweep(options)
+        runner.run()
+
+        return runner
+
+    def module(self):
+        """ :return module main: the main part of the stand-in module """
+
+        return sys.modules['lockdb.main']
+
+    def test_kept_clients_are_reset(self):
+        """ A sweep with several workers keeps their clients from point to
+        point, and ends the transactions of all of them before any is reset
+        """
+
+        runner = self.sweep('--trials=100,200', '--workers=1,2')
+
+        self.assertEqual(len(runner.results), 4)
+        self.assertEqual(len(runner.clients), 2)
+
+        # Two clients are set up, and then reset for each later point
+        self.assertEqual(self.module().RUNS,
+                         [100, 100, 100, 200, 200, 200])
+
+        with open('generated_reports/test/summary.csv') as infile:
+
+            self.assertEqual(len(infile.readlines()), 5)
+
+    def test_resume(self):
+        """ A sweep run again with the same title only runs the points that
+        were not finished, unless it is restarted
+        """
+
+        self.sweep('--trials=100')
+
+        with open('generated_reports/test/checkpoint.json') as infile:
+
+            checkpoint = json.load(infile)
+
+        self.assertEqual(len(checkpoint), 1)
+
+        runs = self.module().RUNS
+        open_transactions = self.module().OPEN_TRANSACTIONS
+
+        # Each sweep is run by its own process, whose connections close
+        # when it exits
+        del runs[:]
+        open_transactions.clear()
+
+        runner = self.sweep('--trials=100,200')
+
+        self.assertEqual(runs, [200])
+        self.assertEqual(len(runner.results), 2)
+
+        del runs[:]
+        open_transactions.clear()
+
+        self.sweep('--trials=100,200', '--restart')
+
+        self.assertEqual(runs, [100, 200])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+DB Benchmarking Application
+===========================
+
+Test_timer.py
+
+Tests of the nanosecond clock and the calibration of the timing overhead.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+
+import itertools
+import numbers
+import time
+import unittest
+
+import timer
+
+
+class TimerTest(unittest.TestCase):
+
+    def test_clock_is_monotonic_ns(self):
+
+        times = [timer.clock_ns() for _ in range(1000)]
+
+        self.assertTrue(all(isinstance(value, numbers.Integral) for value in times))
+        self.assertEqual(times, sorted(times))
+
+        start_time = timer.clock_ns()
+        time.sleep(0.01)
+        elapsed = timer.to_seconds(timer.clock_ns() - start_time)
+
+        self.assertTrue(0.009 <= elapsed < 1, elapsed)
+
+    def test_to_seconds(self):
+
+        self.assertEqual(timer.to_seconds(1500000000), 1.5)
+        self.assertIsNone(timer.to_seconds(None))
+
+    def test_calibrate_overhead(self):
+
+        overhead = timer.calibrate_overhead(1000)
+
+        self.assertTrue(0 <= overhead < 10 ** 6, overhead)
+
+    def test_calibration_takes_the_median(self):
+        """ A preempted timing or two does not move the overhead """
+
+        # Each timing takes 100 ns, apart from every tenth, which takes 1 s
+        gaps = itertools.cycle([100] * 9 + [10 ** 9])
+        now = [0]
+
+        def fake_clock():
+
+            now[0] += next(gaps)
+
+            return now[0]
+
+        clock_ns = timer.clock_ns
+        timer.clock_ns = fake_clock
+
+        try:
+
+            overhead = timer.calibrate_overhead(100)
+
+        finally:
+
+            timer.clock_ns = clock_ns
+
+        self.assertEqual(overhead, 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+DB Benchmarking Application
+===========================
+
+Test_warmup.py
+
+Tests of the parsing of warmups and of the MSER-5 cutoff.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+
+import unittest
+
+import numpy as np
+
+from warmup import parse_warmup, steady_state_start
+
+
+class WarmupTest(unittest.TestCase):
+
+    def test_parse_warmup(self):
+
+        self.assertEqual(parse_warmup(None), (None, None, False))
+        self.assertEqual(parse_warmup('500'), (500, None, False))
+        self.assertEqual(parse_warmup('2.5s'), (None, 2.5, False))
+        self.assertEqual(parse_warmup('Auto'), (None, None, True))
+
+        for warmup in ['-1', '-1s', 'soon']:
+
+            with self.assertRaises(ValueError):
+
+                parse_warmup(warmup)
+
+    def test_cold_start_is_cut(self):
+        """ A slow start of 200 samples is cut, to within a batch """
+
+        random_state = np.random.RandomState(1)
+
+        samples = np.concatenate([
+            np.linspace(10, 2, 200) + random_state.normal(0, 0.1, 200),
+            1 + random_state.normal(0, 0.1, 2000),
+        ])
+
+        start = steady_state_start(samples)
+
+        self.assertTrue(150 <= start <= 210, start)
+        self.assertEqual(start % 5, 0)
+
+    def test_steady_series_is_kept(self):
+
+        samples = 1 + np.random.RandomState(2).normal(0, 0.1, 2000)
+
+        self.assertLess(steady_state_start(samples), 100)
+
+    def test_short_series(self):
+
+        self.assertEqual(steady_state_start([5, 4, 3, 2, 1, 1, 1]), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
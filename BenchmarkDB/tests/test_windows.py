@@ -0,0 +1,91 @@
+"""
+DB Benchmarking Application
+===========================
+
+Test_windows.py
+
+Tests of the time series of windowed statistics.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+
+from windows import WindowRecorder
+
+
+class WindowRecorderTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'timeseries.csv')
+
+    def tearDown(self):
+
+        shutil.rmtree(self.directory)
+
+    def rows(self):
+        """ :return list rows: the rows of the time series, as dicts """
+
+        with open(self.path) as infile:
+
+            return list(csv.DictReader(infile))
+
+    def test_window_statistics(self):
+
+        recorder = WindowRecorder(self.path, [50, 100])
+
+        recorder.add('reads', 0, 0.0, 0.5, {
+            'read_times': [10 ** 9, 2 * 10 ** 9, 3 * 10 ** 9],
+            'read_times_corrected': [4 * 10 ** 9],
+            'write_times': [],
+        })
+
+        rows = self.rows()
+
+        self.assertEqual([row['operation'] for row in rows],
+                         ['read', 'read (corrected)'])
+
+        row = rows[0]
+
+        self.assertEqual((row['phase'], row['window']), ('reads', '0'))
+        self.assertEqual(row['count'], '3')
+        self.assertAlmostEqual(float(row['ops_per_sec']), 6.0)
+        self.assertAlmostEqual(float(row['mean']), 2.0)
+        self.assertAlmostEqual(float(row['max']), 3.0)
+        self.assertAlmostEqual(float(row['p50']), 2.0)
+        self.assertAlmostEqual(float(row['p100']), 3.0)
+
+    def test_waits_for_every_source(self):
+        """ A window is written once every worker process has handed over its
+        latencies, or when the phase is flushed
+        """
+
+        recorder = WindowRecorder(self.path, [50], sources=2)
+
+        recorder.add('writes', 0, 0.0, 1.0, {'write_times': [10 ** 9]})
+        recorder.add('writes', 1, 1.0, 1.0, {'write_times': [10 ** 9]})
+
+        self.assertEqual(self.rows(), [])
+
+        recorder.add('writes', 0, 0.0, 1.0, {'write_times': [3 * 10 ** 9]})
+
+        rows = self.rows()
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['count'], '2')
+        self.assertAlmostEqual(float(rows[0]['mean']), 2.0)
+
+        recorder.flush()
+
+        self.assertEqual([row['window'] for row in self.rows()], ['0', '1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
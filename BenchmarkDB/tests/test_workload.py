@@ -0,0 +1,79 @@
+"""
+DB Benchmarking Application
+===========================
+
+Test_workload.py
+
+Tests of the parsing of mixes and of the operations drawn for a workload.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+
+import unittest
+
+from workload import PROFILES, Workload, parse_mix
+
+
+class WorkloadTest(unittest.TestCase):
+
+    def test_parse_mix(self):
+
+        self.assertEqual(parse_mix('read:0.7, update:0.2,insert:0.1'),
+                         {'read': 0.7, 'update': 0.2, 'insert': 0.1})
+
+        for spec in ['read:0.5', 'read:0.5,delete:0.5', 'read:x',
+                     'read:1.5,update:-0.5']:
+
+            with self.assertRaises(ValueError):
+
+                parse_mix(spec)
+
+    def test_proportions(self):
+
+        workload = Workload({'read': 0.7, 'update': 0.3}, 10000, 100, seed=1)
+
+        names = [workload.operation(sequence)[0] for sequence in range(10000)]
+
+        self.assertAlmostEqual(names.count('read') / 10000, 0.7, delta=0.02)
+
+    def test_inserts_take_new_indexes(self):
+
+        mix, distribution = PROFILES['d']
+
+        workload = Workload(mix, 2000, 100, distribution, seed=1)
+
+        inserts = [
+            key for name, key, _ in map(workload.operation, range(2000))
+            if name == 'insert'
+        ]
+
+        self.assertEqual(inserts, list(range(100, 100 + len(inserts))))
+
+        # A repeat of the workload inserts after the first one
+        name, key, _ = workload.operation(2000 + 1999)
+
+        self.assertTrue(name != 'insert' or key >= 100 + len(inserts))
+
+    def test_scan_lengths(self):
+
+        mix, distribution = PROFILES['e']
+
+        workload = Workload(mix, 1000, 100, distribution, scan_length=10,
+                            seed=1)
+
+        for sequence in range(1000):
+
+            name, key, scan_length = workload.operation(sequence)
+
+            if name == 'scan':
+
+                self.assertTrue(1 <= scan_length <= 10)
+
+            else:
+
+                self.assertIsNone(scan_length)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+DB Benchmarking Application
+===========================
+
+Timer.py
+
+This file houses the clock used to time every operation.  All times are taken
+from a monotonic, high-resolution clock and kept as integer nanoseconds, which
+cannot jump with the wall clock and do not lose precision on sub-millisecond
+operations.  It also measures the overhead of the timing code itself, so that
+it can be reported and optionally subtracted from each measurement.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+
+import time
+
+from six.moves import range
+
+
+NANOSECONDS = 10 ** 9
+
+try:
+
+    # Python 3.7+
+    clock_ns = time.perf_counter_ns
+
+    CLOCK_NAME = 'perf_counter'
+
+except AttributeError:
+
+    # Python 3.3+ has a monotonic perf_counter(), older versions only time()
+    if hasattr(time, 'perf_counter'):
+        CLOCK_NAME = 'perf_counter'
+    else:
+        CLOCK_NAME = 'time'
+
+    _clock = getattr(time, CLOCK_NAME)
+
+    def clock_ns():
+        """ :return int now: the current time of the clock in nanoseconds """
+
+        return int(_clock() * NANOSECONDS)
+
+
+def to_seconds(nanoseconds):
+    """ Converts a value recorded in nanoseconds back to seconds
+
+    :param nanoseconds: the value in nanoseconds, or None
+
+    :return float seconds: the value in seconds, or None
+    """
+
+    if nanoseconds is None:
+
+        return None
+
+    return nanoseconds / NANOSECONDS
+
+
+def clock_resolution():
+    """ :return float resolution: the resolution of the clock in nanoseconds,
+                or None if it cannot be determined
+    """
+
+    if not hasattr(time, 'get_clock_info'):
+
+        return None
+
+    return time.get_clock_info(CLOCK_NAME).resolution * NANOSECONDS
+
+
+def calibrate_overhead(iterations=10000):
+    """ Measures the cost of timing an operation that does nothing at all,
+    using exactly the same steps used to time a real operation.  The median is
+    used, so the occasional preemption doesn't skew the result.
+
+    :param int iterations: the number of empty operations to time
+
+    :return int overhead: the median overhead in nanoseconds
+    """
+
+    def empty_operation(argument):
+        pass
+
+    overheads = []
+
+    for _ in range(iterations):
+
+        start_time = clock_ns()
+
+        empty_operation(None)
+
+        stop_time = clock_ns()
+
+        overheads.append(stop_time - start_time)
+
+    overheads.sort()
+
+    return overheads[len(overheads) // 2]
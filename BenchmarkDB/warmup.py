@@ -0,0 +1,98 @@
+"""
+DB Benchmarking Application
+===========================
+
+Warmup.py
+
+This file houses the warmup settings, which keep the cold start of each phase
+(connection setup, cold caches, ...) out of the reported statistics.  The
+warmup can be a number of operations or a number of seconds at the start of
+each phase, or it can be found automatically after the run from the point at
+which the latencies settle.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+
+import numpy as np
+
+
+def parse_warmup(warmup):
+    """ Parses a warmup, which is either a number of operations (e.g. `500`),
+    a number of seconds (e.g. `5s`) or `auto`
+
+    :param str warmup: the warmup to parse
+
+    :return tup warmup: the number of operations and the number of seconds of
+                the warmup (at most one of which is set), and whether the
+                warmup is automatic
+    """
+
+    if not warmup:
+
+        return None, None, False
+
+    warmup = str(warmup).strip().lower()
+
+    if warmup == 'auto':
+
+        return None, None, True
+
+    try:
+
+        if warmup.endswith('s'):
+
+            seconds = float(warmup[:-1])
+
+            if seconds < 0:
+                raise ValueError
+
+            return None, seconds, False
+
+        count = int(warmup)
+
+        if count < 0:
+            raise ValueError
+
+        return count, None, False
+
+    except ValueError:
+
+        raise ValueError('The warmup must be a number of operations, a '
+                         'number of seconds (e.g. 5s) or auto')
+
+
+def steady_state_start(samples, batch_size=5):
+    """ Finds the point at which a series of latencies has settled, with the
+    MSER-5 rule (White, 1997): the samples are averaged in batches of 5, and
+    the series is truncated where the standard error of the mean of what is
+    left is smallest.  Only the first half of the series is considered.
+
+    :param samples: the latencies, in the order they were recorded
+    :param int batch_size: the number of samples averaged into each batch
+
+    :return int start: the number of samples at the start of the series that
+                are warmup
+    """
+
+    samples = np.asarray(samples, dtype=np.float64)
+
+    batch_count = len(samples) // batch_size
+
+    if batch_count < 2:
+
+        return 0
+
+    batches = samples[:batch_count * batch_size]
+    batches = batches.reshape(batch_count, batch_size).mean(axis=1)
+
+    # The sums of the batches left after truncating each number of batches
+    remaining = np.arange(batch_count, 0, -1)
+    sums = np.cumsum(batches[::-1])[::-1]
+    squares = np.cumsum((batches ** 2)[::-1])[::-1]
+
+    errors = (squares - sums ** 2 / remaining) / remaining ** 2
+
+    truncation = int(np.argmin(errors[:batch_count // 2]))
+
+    return truncation * batch_size
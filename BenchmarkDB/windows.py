@@ -0,0 +1,150 @@
+"""
+DB Benchmarking Application
+===========================
+
+Windows.py
+
+This file houses the time series of windowed statistics.  While a phase runs,
+the latencies recorded in each window of time (e.g. every second) are handed
+over, summarized into throughput and latency percentiles, and appended to a
+CSV file straight away.  Only the latencies of the current window are ever held
+in memory, so a long soak test uses constant memory, and if the run is cut
+short the windows written so far are still usable.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+
+import csv
+
+import numpy as np
+
+
+class WindowRecorder():
+    """ Collects the latencies of each window from one or more sources (the
+    worker processes), and writes a row for every operation of a window once
+    every source has handed its latencies over.
+    """
+
+    def __init__(self, path, percentiles, sources=1, unit=10 ** 9):
+        """ __init__() creates the time series file and writes its header.
+
+        :param str path: the path of the CSV file to write
+        :param list percentiles: the latency percentiles to write
+        :param int sources: the number of sources of each window
+        :param int unit: the number of latency units (ns) in a second
+        """
+
+        self.path = path
+        self.percentiles = percentiles
+        self.sources = sources
+        self.unit = unit
+
+        self.pending = {}
+
+        header = ['phase', 'window', 'start', 'length', 'operation', 'count',
+                  'ops_per_sec', 'mean', 'max'] + [
+            'p{percentile:g}'.format(percentile=percentile)
+            for percentile in percentiles
+        ]
+
+        with open(self.path, 'w') as outfile:
+
+            csv.writer(outfile).writerow(header)
+
+    def add(self, phase, index, start, length, samples):
+        """ Hands over the latencies one source recorded in a window
+
+        :param str phase: the phase the window belongs to
+        :param int index: the position of the window in the phase
+        :param float start: the start of the window, in seconds since the
+                    start of the phase
+        :param float length: the length of the window in seconds
+        :param dict samples: the latencies of each buffer, e.g. 'read_times'
+        """
+
+        key = (phase, index)
+
+        window = self.pending.setdefault(key, {
+            'sources': 0,
+            'start': start,
+            'length': length,
+            'samples': {},
+        })
+
+        window['sources'] += 1
+        window['length'] = max(window['length'], length)
+
+        for name, latencies in samples.items():
+
+            window['samples'].setdefault(name, []).append(latencies)
+
+        if window['sources'] >= self.sources:
+
+            self.__write(key, self.pending.pop(key))
+
+    def flush(self):
+        """ Writes every window that is still waiting for some of its sources,
+        which happens to the last window of a phase
+        """
+
+        for key in sorted(self.pending):
+
+            self.__write(key, self.pending.pop(key))
+
+    def __write(self, key, window):
+        """ Appends the rows of a window to the time series file
+
+        :param tup key: the phase and position of the window
+        :param dict window: the start, length and latencies of the window
+        """
+
+        phase, index = key
+
+        rows = []
+
+        for name in sorted(window['samples']):
+
+            latencies = np.concatenate([
+                np.asarray(part, dtype=np.float64)
+                for part in window['samples'][name]
+            ]) / self.unit
+
+            if not len(latencies):
+                continue
+
+            length = window['length']
+
+            row = [
+                phase,
+                index,
+                '{0:.3f}'.format(window['start']),
+                '{0:.3f}'.format(length),
+                self.__operation(name),
+                len(latencies),
+                len(latencies) / length if length else '',
+                latencies.mean(),
+                latencies.max(),
+            ]
+
+            row += list(np.percentile(latencies, self.percentiles))
+
+            rows.append(row)
+
+        with open(self.path, 'a') as outfile:
+
+            csv.writer(outfile).writerows(rows)
+
+    @staticmethod
+    def __operation(name):
+        """ :return str operation: the operation of a buffer, e.g. 'read' or
+                    'read (corrected)'
+        """
+
+        operation = name.replace('_times', '')
+
+        if operation.endswith('_corrected'):
+
+            operation = operation[:-len('_corrected')] + ' (corrected)'
+
+        return operation.replace('_', ' ')
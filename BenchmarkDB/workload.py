@@ -0,0 +1,201 @@
+"""
+DB Benchmarking Application
+===========================
+
+Workload.py
+
+This file houses the mixed workloads, which run a blend of reads, updates,
+inserts, scans and read-modify-writes against entries loaded beforehand.  The
+core workloads of YCSB (A to F) are available by name, so results can be
+compared with published numbers, and any other blend can be given as a mix
+such as `read:0.7,update:0.2,insert:0.1`.  The operation, key and scan length
+of every step are drawn up front, so picking them during the run is only a
+lookup.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+
+import numpy as np
+
+from distribution import KeyDistribution
+
+
+# The operations a workload can be made of.  A read-modify-write (rmw) reads an
+# entry and then updates it, and is timed as a single operation.
+OPERATIONS = [
+    'read',
+    'update',
+    'insert',
+    'scan',
+    'rmw',
+]
+
+# The core workloads of YCSB, each as its mix and its key distribution
+PROFILES = {
+    'a': ({'read': 0.5, 'update': 0.5}, 'zipfian'),
+    'b': ({'read': 0.95, 'update': 0.05}, 'zipfian'),
+    'c': ({'read': 1.0}, 'zipfian'),
+    'd': ({'read': 0.95, 'insert': 0.05}, 'latest'),
+    'e': ({'scan': 0.95, 'insert': 0.05}, 'zipfian'),
+    'f': ({'read': 0.5, 'rmw': 0.5}, 'zipfian'),
+}
+
+
+def parse_mix(spec):
+    """ Parses a mix such as `read:0.7,update:0.2,insert:0.1`
+
+    :param str spec: the proportion of each operation, which must add up to 1
+
+    :return dict mix: the proportion of each operation
+    """
+
+    mix = {}
+
+    for part in spec.split(','):
+
+        operation, _, proportion = part.partition(':')
+        operation = operation.strip()
+
+        if operation not in OPERATIONS:
+
+            raise ValueError('Unknown operation {operation!r}, the operations '
+                             'are {names}'.format(
+                                 operation=operation,
+                                 names=', '.join(OPERATIONS),
+                             ))
+
+        try:
+
+            mix[operation] = mix.get(operation, 0) + float(proportion)
+
+        except ValueError:
+
+            raise ValueError('The proportion of {operation} is not a number'
+                             .format(operation=operation))
+
+    if any(proportion < 0 for proportion in mix.values()):
+
+        raise ValueError('The proportions cannot be negative')
+
+    if abs(sum(mix.values()) - 1) > 1e-6:
+
+        raise ValueError('The proportions must add up to 1')
+
+    return mix
+
+
+class Workload():
+    """ The sequence of operations of a mixed workload.  Operation `n` of the
+    sequence is found with `operation(n)`, so the sequence can be shared out
+    between workers just like the indexes of the other phases.
+    """
+
+    def __init__(self, mix, operation_count, record_count,
+                 distribution='zipfian', scan_length=100, seed=None,
+                 **distribution_params):
+        """ __init__() draws every operation of the workload.
+
+        :param dict mix: the proportion of each operation
+        :param int operation_count: the number of operations to draw
+        :param int record_count: the number of entries loaded before the
+                    workload starts
+        :param str distribution: the key distribution of the operations, see
+                    `KeyDistribution`
+        :param int scan_length: the longest scan, the length of each scan is
+                    drawn uniformly from 1 to `scan_length`
+        :param int seed: the seed of the random generator
+        :param distribution_params: the parameters of the key distribution
+        """
+
+        if scan_length < 1:
+
+            raise ValueError('The scan length must be at least 1')
+
+        self.mix = mix
+        self.operation_count = operation_count
+        self.record_count = record_count
+        self.distribution = distribution
+        self.scan_length = scan_length
+
+        random_state = np.random.RandomState(seed)
+
+        operations = [name for name in OPERATIONS if mix.get(name)]
+        proportions = np.array([mix[name] for name in operations])
+
+        self.names = operations
+
+        self.operations = random_state.choice(
+            len(operations),
+            size=operation_count,
+            p=proportions / proportions.sum(),
+        ).astype(np.uint8)
+
+        keys = KeyDistribution(
+            distribution,
+            record_count,
+            seed=random_state.randint(2 ** 31),
+            **distribution_params
+        ).sample(operation_count).astype(np.int64)
+
+        # Inserts take the next new index, after every entry that was loaded
+        # or inserted before them
+        if 'insert' in operations:
+
+            inserts = self.operations == operations.index('insert')
+            inserts_before = np.cumsum(inserts) - inserts
+
+            keys = np.where(inserts, record_count + inserts_before, keys)
+
+            # The newest entries keep moving as entries are inserted.  With
+            # several workers, one may read an entry that another is still
+            # inserting.
+            if distribution == 'latest':
+
+                keys = np.where(inserts, keys, keys + inserts_before)
+
+        self.keys = keys
+
+        self.insert_count = 0
+
+        if 'insert' in operations:
+
+            self.insert_count = int(np.sum(inserts))
+
+        self.scan_lengths = None
+
+        if 'scan' in operations:
+
+            self.scan_lengths = random_state.randint(
+                1, scan_length + 1, size=operation_count,
+            ).astype(np.int32)
+
+    def operation(self, sequence):
+        """ Looks up an operation of the workload.  Past the end of the
+        workload (with `--duration`), the workload is repeated, with the
+        inserts of each repeat moved on to new indexes.
+
+        :param int sequence: the position of the operation in the workload
+
+        :return tup operation: the name of the operation, the index of the
+                    entry it acts on, and the number of entries to scan (for
+                    scans only)
+        """
+
+        repeat, sequence = divmod(sequence, self.operation_count)
+
+        name = self.names[self.operations[sequence]]
+
+        key = int(self.keys[sequence])
+
+        if name == 'insert' or self.distribution == 'latest':
+
+            key += repeat * self.insert_count
+
+        scan_length = None
+
+        if name == 'scan':
+
+            scan_length = int(self.scan_lengths[sequence])
+
+        return name, key, scan_length
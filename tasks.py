@@ -66,6 +66,41 @@ def benchmark(database):
     run("python main.py {db}".format(db=database))
 
 
+@task
+def sweep(database, title, trials='1000', length='10', workers='1',
+          batch_size='1', concurrency='', commit_every='', options=''):
+    """ Runs the benchmark of a given DB for every combination of the given
+    comma-separated lists of parameters, and summarizes the results
+    Usage: `invoke sweep <database> <title> --trials=1000,10000 --workers=1,4`
+    """
+
+    database = check_module_naming(database)
+
+    cmd = ('cd BenchmarkDB && python sweep.py {db} {title} --trials={trials} '
+           '--length={length} --workers={workers} --batch-size={batch_size}'
+           ).format(
+        db=database,
+        title=title,
+        trials=trials,
+        length=length,
+        workers=workers,
+        batch_size=batch_size,
+    )
+
+    if concurrency:
+        cmd += ' --concurrency={concurrency}'.format(concurrency=concurrency)
+
+    if commit_every:
+        cmd += ' --commit-every={commit_every}'.format(
+            commit_every=commit_every,
+        )
+
+    if options:
+        cmd += ' --options="{options}"'.format(options=options)
+
+    run(cmd)
+
+
 @task
 def requirements():
     """ Pip installs all requirements, and if db arg is passed, the